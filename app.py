@@ -1,8 +1,28 @@
+import functools
+import os
+import sys
+import time
+from collections import deque
+
 import streamlit as st
 import pandas as pd
-import joblib
 import numpy as np
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from calibrator import calibration_path  # noqa: E402
+from features import TeamTable  # noqa: E402
+from matchup_table import ensure_table  # noqa: E402
+from sim_engine import WinTotals  # noqa: E402
+
+# --- CONFIGURATION ---
+MODEL_DIR = 'data/models/random_forest'
+TEAM_STATS_FILE = 'data/team_stats.csv'
+TABLE_FILE = 'data/matchup_table.npy'
+PROJECTIONS_FILE = 'data/projections_2025.csv'
+DISTRIBUTIONS_FILE = 'data/projections_2025.npz'
+PREDICTION_CACHE_SIZE = 4096  # (home, away, temp, wind) results memoized per server process
+LATENCY_WINDOW = 1000  # most recent reruns (across all sessions) in the latency summary
+
 TEAM_ID_MAP = {
     108: 'Los Angeles Angels', 109: 'Arizona Diamondbacks', 110: 'Baltimore Orioles',
     111: 'Boston Red Sox', 112: 'Chicago Cubs', 113: 'Cincinnati Reds',
@@ -16,25 +36,76 @@ TEAM_ID_MAP = {
     146: 'Miami Marlins', 147: 'New York Yankees', 158: 'Milwaukee Brewers'
 }
 
+ACTUAL_WINS_2025 = {
+    'Toronto Blue Jays': 94, 'New York Yankees': 94, 'Boston Red Sox': 89, 'Tampa Bay Rays': 77,
+    'Baltimore Orioles': 75,
+    'Cleveland Guardians': 88, 'Detroit Tigers': 87, 'Kansas City Royals': 82, 'Minnesota Twins': 70,
+    'Chicago White Sox': 60,
+    'Seattle Mariners': 90, 'Houston Astros': 87, 'Texas Rangers': 81, 'Oakland Athletics': 76,
+    'Los Angeles Angels': 72,
+    'Philadelphia Phillies': 96, 'New York Mets': 83, 'Miami Marlins': 79, 'Atlanta Braves': 76,
+    'Washington Nationals': 66,
+    'Milwaukee Brewers': 97, 'Chicago Cubs': 92, 'Cincinnati Reds': 83, 'St. Louis Cardinals': 78,
+    'Pittsburgh Pirates': 71,
+    'Los Angeles Dodgers': 93, 'San Diego Padres': 90, 'San Francisco Giants': 81, 'Arizona Diamondbacks': 80,
+    'Colorado Rockies': 43
+}
+
+rerun_start = time.perf_counter()
 st.set_page_config(page_title="MLB Live Predictor", page_icon="⚾", layout="wide")
 
 
+# Everything below is shared by all sessions of the server process. Loaders take the mtimes of their files as
+# arguments, so replacing a file (new stats, a retrained model, a new simulation) is picked up on the next rerun.
+
+def mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+@st.cache_resource
+def load_predictor(model_mtime, stats_mtime):
+    # every (home, away, temp, wind) the widgets allow, scored once with the calibrated model; rebuilt if the stats,
+    # the model or its calibrator changed
+    table = ensure_table(MODEL_DIR, TEAM_STATS_FILE, TABLE_FILE)
+    return functools.lru_cache(maxsize=PREDICTION_CACHE_SIZE)(table.probability)
+
+
+@st.cache_resource
+def load_teams(stats_mtime):
+    # team id -> row index for the stats, and the selector options sorted by team name
+    teams = TeamTable(pd.read_csv(TEAM_STATS_FILE))
+    sorted_ids = sorted((int(t) for t in teams.team_ids), key=lambda t: TEAM_ID_MAP.get(t, f"Team {t}"))
+    return teams, sorted_ids
+
+
+@st.cache_data
+def load_projections(projections_mtime):
+    proj_df = pd.read_csv(PROJECTIONS_FILE, index_col=0)
+    proj_df['Actual Wins'] = proj_df.index.map(ACTUAL_WINS_2025)
+    proj_df['Error'] = proj_df['Avg_Wins'] - proj_df['Actual Wins']
+    return proj_df
+
+
 @st.cache_resource
-def load_assets():
-    model = joblib.load('data/random_forest.pkl')
-    stats = pd.read_csv('data/team_stats.csv')
-    return model, stats
+def load_distributions(distributions_mtime):
+    # simulated 2025 win distributions written by simulate_2025.py, with a team id -> row index
+    totals, sim_ids = WinTotals.load(DISTRIBUTIONS_FILE)
+    return totals, {int(t): i for i, t in enumerate(sim_ids)}
+
+
+@st.cache_resource
+def rerun_latencies():
+    return deque(maxlen=LATENCY_WINDOW)
 
 
 try:
-    model, team_stats = load_assets()
+    predict = load_predictor((mtime(os.path.join(MODEL_DIR, 'manifest.json')), mtime(calibration_path(MODEL_DIR))),
+                             mtime(TEAM_STATS_FILE))
+    teams, sorted_ids = load_teams(mtime(TEAM_STATS_FILE))
 except Exception as e:
     st.error(f"Error loading files: {e}")
     st.stop()
 
-available_ids = team_stats['team_name'].unique().tolist()
-sorted_ids = sorted(available_ids, key=lambda x: TEAM_ID_MAP.get(int(x), f"Team {x}"))
-
 st.title("⚾ Live MLB Win Predictor")
 st.caption("Predictions update automatically as you change teams or weather conditions.")
 st.markdown("---")
@@ -68,22 +139,10 @@ st.sidebar.header("🕹️ Live Game Conditions")
 temp = st.sidebar.slider("Temperature (°F)", 40, 100, 72)
 wind = st.sidebar.slider("Wind Speed (mph)", 0, 30, 5)
 
-h_data = team_stats[team_stats['team_name'] == home_id].iloc[0]
-a_data = team_stats[team_stats['team_name'] == away_id].iloc[0]
-
-input_features = pd.DataFrame([{
-    'temp': float(temp),
-    'wind_speed': float(wind),
-    'diff_run_diff': float(h_data['run_diff'] - a_data['run_diff']),
-    'diff_ops': float(h_data['ops'] - a_data['ops']),
-    'diff_whip': float(h_data['whip'] - a_data['whip']),
-    'diff_wins_last_10': float(h_data['wins_last_10'] - a_data['wins_last_10']),
-    'diff_games_last_7': float(h_data['games_last_7'] - a_data['games_last_7']),
-    'park_factor': float(h_data['park_factor'])
-}])
+h_data = teams.row(home_id)
+a_data = teams.row(away_id)
 
-probabilities = model.predict_proba(input_features)[0]
-home_win_prob = probabilities[1]
+home_win_prob = predict(home_id, away_id, temp, wind)
 
 st.markdown("---")
 res_col1, res_col2 = st.columns(2)
@@ -109,33 +168,32 @@ with st.expander("📊 Analysis: Tale of the Tape"):
     ])
     st.table(comparison.set_index("Team"))
 
+with st.expander("📈 2025 Simulated Win Distributions"):
+    try:
+        totals, row_of = load_distributions(mtime(DISTRIBUTIONS_FILE))
+        picked = [int(home_id), int(away_id)]
+        dist = totals.distribution()
+        st.line_chart(pd.DataFrame({TEAM_ID_MAP.get(t): dist[row_of[t]] for t in picked}))
+
+        std = np.sqrt(totals.variance())
+        p90 = totals.prob_at_least(90)
+        st.table(pd.DataFrame([
+            {"Team": TEAM_ID_MAP.get(t), "Avg Wins": f"{totals.mean()[row_of[t]]:.1f}",
+             "Std Dev": f"{std[row_of[t]]:.1f}", "P(90+ Wins)": f"{p90[row_of[t]]:.1%}"} for t in picked
+        ]).set_index("Team"))
+        home_ahead = totals.prob_ahead()[row_of[picked[0]], row_of[picked[1]]]
+        st.caption(f"{TEAM_ID_MAP.get(picked[0])} finishes with more wins in {home_ahead:.1%} of "
+                   f"{totals.n_sims:,} simulated seasons.")
+    except (FileNotFoundError, KeyError):
+        st.info("💡 Run `simulate_2025.py` to generate `projections_2025.npz` with the full win distributions.")
+
 st.markdown("---")
 with st.expander("🎯 2025 Season Simulation Accuracy"):
     try:
-        proj_df = pd.read_csv('data/projections_2025.csv', index_col=0)
-
-        # 2. Actual results dictionary
-        actual_wins = {
-            'Toronto Blue Jays': 94, 'New York Yankees': 94, 'Boston Red Sox': 89, 'Tampa Bay Rays': 77,
-            'Baltimore Orioles': 75,
-            'Cleveland Guardians': 88, 'Detroit Tigers': 87, 'Kansas City Royals': 82, 'Minnesota Twins': 70,
-            'Chicago White Sox': 60,
-            'Seattle Mariners': 90, 'Houston Astros': 87, 'Texas Rangers': 81, 'Oakland Athletics': 76,
-            'Los Angeles Angels': 72,
-            'Philadelphia Phillies': 96, 'New York Mets': 83, 'Miami Marlins': 79, 'Atlanta Braves': 76,
-            'Washington Nationals': 66,
-            'Milwaukee Brewers': 97, 'Chicago Cubs': 92, 'Cincinnati Reds': 83, 'St. Louis Cardinals': 78,
-            'Pittsburgh Pirates': 71,
-            'Los Angeles Dodgers': 93, 'San Diego Padres': 90, 'San Francisco Giants': 81, 'Arizona Diamondbacks': 80,
-            'Colorado Rockies': 43
-        }
-
-        # 3. Process Data
-        proj_df['Actual Wins'] = proj_df.index.map(actual_wins)
-        proj_df['Error'] = proj_df['Avg_Wins'] - proj_df['Actual Wins']
+        proj_df = load_projections(mtime(PROJECTIONS_FILE))
         mae = proj_df['Error'].abs().mean()
 
-        # 4. Display Metrics & Table
+        # Display Metrics & Table
         st.write(
             "Comparing pre-season Monte Carlo simulation results (100k runs) against actual 2025 final win totals.")
         st.metric("Mean Absolute Error (MAE)", f"{mae:.2f} Wins")
@@ -162,4 +220,15 @@ st.markdown(
     </div>
     """,
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+# per-rerun latency, summarized over the latest reruns of every session
+latencies = rerun_latencies()
+latencies.append(time.perf_counter() - rerun_start)
+recent_ms = np.array(latencies) * 1000
+cache = predict.cache_info()
+with st.sidebar.expander("⏱️ Performance"):
+    st.caption(f"This rerun: {recent_ms[-1]:.1f} ms · p50 {np.percentile(recent_ms, 50):.1f} ms · "
+               f"p95 {np.percentile(recent_ms, 95):.1f} ms over the last {len(recent_ms)} reruns")
+    st.caption(f"Prediction cache: {cache.hits} hits, {cache.misses} misses, {cache.currsize}/{cache.maxsize} "
+               f"entries")
@@ -1,76 +1,58 @@
-import pandas as pd
-from collections import defaultdict
+import argparse
+import os
+
+from dataset_store import HAS_PYARROW, PARQUET_DIR, load_games
+from rolling_features import momentum_features
 
 # --- CONFIGURATION ---
 INPUT_FILE = "../data/mlb_2015_2025_dataset.csv"  # Your existing file
 OUTPUT_FILE = "../data/mlb_dataset_with_momentum.csv"  # The new improved file
 
 
-def add_momentum_features():
-    print(f"Loading {INPUT_FILE}...")
+def add_momentum_features(input_file=INPUT_FILE, output_file=OUTPUT_FILE, parquet=False):
+    """Reads the CSV input_file, or the Parquet dataset when `parquet` is set; never one in place of the other."""
+    source = PARQUET_DIR if parquet else input_file
+    print(f"Loading {source}...")
     try:
-        df = pd.read_csv(INPUT_FILE)
+        if parquet:
+            df = load_games(categorical=False)
+        else:
+            df = load_games(categorical=False, parquet_dir='', csv_path=input_file)
     except FileNotFoundError:
         print("Error: File not found. Please check the filename.")
         return
 
     # 1. Sort Chronologically (CRITICAL)
-    # We must process games in order to build correct history
+    # History must be built in game order
     print("Sorting data by date...")
-    df['date'] = pd.to_datetime(df['date'])
     df = df.sort_values(by=['date', 'game_id'])
 
-    # 2. Initialize History Tracker
-    # Dictionary mapping Team ID -> List of recent results (1=Win, 0=Loss)
-    team_history = defaultdict(list)
-
-    # Lists to hold the new column data
-    h_last_10, h_last_5 = [], []
-    a_last_10, a_last_5 = [], []
-
+    # 2-4. Wins in the previous 10/5 games for each side, computed from a
+    # long team-game table in one vectorized pass (see rolling_features.py)
     print("Calculating momentum...")
-
-    # 3. Iterate Row by Row
-    for index, row in df.iterrows():
-        home_id = row['home_team']
-        away_id = row['away_team']
-        home_win = row['home_win']  # 1 if Home Won, 0 if Away Won
-
-        # A. CALCULATE MOMENTUM (Before the game starts)
-        # Home Team
-        h_wins = team_history[home_id]
-        h_last_10.append(sum(h_wins[-10:]))  # Sums the last 10 wins (1s)
-        h_last_5.append(sum(h_wins[-5:]))
-
-        # Away Team
-        a_wins = team_history[away_id]
-        a_last_10.append(sum(a_wins[-10:]))
-        a_last_5.append(sum(a_wins[-5:]))
-
-        # B. UPDATE HISTORY (After the game ends)
-        if home_win == 1:
-            team_history[home_id].append(1)  # Win
-            team_history[away_id].append(0)  # Loss
-        else:
-            team_history[home_id].append(0)  # Loss
-            team_history[away_id].append(1)  # Win
-
-    # 4. Add Columns to DataFrame
-    df['home_wins_last_10'] = h_last_10
-    df['home_wins_last_5'] = h_last_5
-    df['away_wins_last_10'] = a_last_10
-    df['away_wins_last_5'] = a_last_5
+    momentum = momentum_features(df)
+    df[momentum.columns] = momentum
 
     # 5. Add Difference Feature (Recommended!)
     # This is the single best predictor: Is home hotter than away?
     df['diff_wins_last_10'] = df['home_wins_last_10'] - df['away_wins_last_10']
 
     # 6. Save
-    df.to_csv(OUTPUT_FILE, index=False)
-    print(f"Success! Saved updated dataset to {OUTPUT_FILE}")
+    df.to_csv(output_file, index=False)
+    print(f"Success! Saved updated dataset to {output_file}")
     print("\nPreview of new columns:")
     print(df[['date', 'home_team', 'home_wins_last_10', 'diff_wins_last_10']].tail())
 
 
 if __name__ == "__main__":
-    add_momentum_features()
+    parser = argparse.ArgumentParser(description="Add last-10/5 win momentum columns to the game dataset.")
+    parser.add_argument('--input', default=INPUT_FILE, help="dataset CSV to read")
+    parser.add_argument('--parquet', action='store_true', help=f"read the Parquet dataset in {PARQUET_DIR} instead")
+    parser.add_argument('-o', '--output', default=OUTPUT_FILE)
+    args = parser.parse_args()
+    if args.parquet and args.input != INPUT_FILE:
+        parser.error("--input and --parquet name different sources; pass one")
+    if args.parquet and not (HAS_PYARROW and os.path.isdir(PARQUET_DIR)):
+        parser.error(f"--parquet needs pyarrow and {PARQUET_DIR} (python dataset_store.py)")
+
+    add_momentum_features(args.input, args.output, args.parquet)
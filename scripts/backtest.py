@@ -0,0 +1,176 @@
+"""
+Walk-forward backtest of in-season retraining.
+
+The dataset is sorted by date once, so the training matrix at any point of the walk is a prefix of one contiguous
+float32 matrix: advancing the window appends rows by moving an index, and nothing is copied or rebuilt. Starting
+from a model fit on every game before --start, each window of --every days is scored with the current model, then
+the model is updated with that window's games:
+
+- refit: a fresh model on everything seen so far (the cost of retraining from scratch)
+- warm: RandomForest grows --add-trees new trees on everything seen so far (warm_start), dropping the oldest beyond
+  --max-trees; XGBoost continues boosting from the previous booster
+
+Per window it reports log-loss, Brier score, calibration (mean predicted vs observed home-win rate and expected
+calibration error) and fit/score wall time; the summary compares totals across the whole walk.
+
+    python backtest.py --every 7 --mode warm
+    python backtest.py --every 1 --mode refit -o daily_refit.csv
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import brier_score_loss, log_loss
+
+from calibration import calibration_table, expected_calibration_error
+from dataset_store import load_games
+from features import add_game_features, game_feature_matrix
+
+try:
+    import xgboost as xgb
+    HAS_XGBOOST = True
+except ImportError:
+    HAS_XGBOOST = False
+
+# --- CONFIGURATION ---
+PARK_FACTORS_FILE = "../data/venue_park_factors.csv"
+START_DATE = "2024-01-01"  # walk through the notebook's 2024-25 holdout
+REFIT_EVERY_DAYS = 7
+ADD_TREES = 20  # trees (or boosting rounds) added per warm update
+MAX_TREES = 200  # warm RandomForest keeps only the newest trees
+SEED = 42
+
+# the production random_forest.pkl hyperparameters
+RF_PARAMS = {'n_estimators': 100, 'max_depth': 5, 'min_samples_leaf': 100, 'min_samples_split': 50}
+XGB_PARAMS = {'n_estimators': 100, 'max_depth': 3, 'learning_rate': 0.05, 'subsample': 0.8}
+
+
+def load_walk(park_factors_file=PARK_FACTORS_FILE):
+    """(X, y, day) for every usable game, sorted by date; day is the ordinal date."""
+    df = load_games(categorical=False)
+    df = df[df['condition'] != 'Unknown']
+    df = df.sort_values(['date', 'game_id'], kind='stable')
+    df = add_game_features(df, pd.read_csv(park_factors_file))
+    day = df['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    return game_feature_matrix(df), df['home_win'].to_numpy(np.int8), day
+
+
+class Updater:
+    """Fits the first model, then updates it as the training prefix grows."""
+
+    def __init__(self, family, mode, add_trees=ADD_TREES, max_trees=MAX_TREES):
+        if family == 'xgb' and not HAS_XGBOOST:
+            raise SystemExit("xgboost is not installed")
+        self.family = family
+        self.mode = mode
+        self.add_trees = add_trees
+        self.max_trees = max_trees
+        self.model = None
+        self.updates = 0
+
+    def _new(self):
+        if self.family == 'rf':
+            return RandomForestClassifier(random_state=SEED, **RF_PARAMS)
+        return xgb.XGBClassifier(random_state=SEED, eval_metric='logloss', **XGB_PARAMS)
+
+    def fit(self, X, y):
+        if self.model is None or self.mode == 'refit':
+            self.model = self._new().fit(X, y)
+        elif self.family == 'rf':
+            # new trees see every row so far; the oldest trees age out past max_trees. warm_start seeds the new trees
+            # by skipping len(estimators_) draws, which stops growing once trees age out, so each update gets its own
+            # random_state or the same trees would be grown again
+            model = self.model
+            self.updates += 1
+            model.set_params(warm_start=True, n_estimators=len(model.estimators_) + self.add_trees,
+                             random_state=SEED + self.updates)
+            model.fit(X, y)
+            if len(model.estimators_) > self.max_trees:
+                model.estimators_ = model.estimators_[-self.max_trees:]
+                model.n_estimators = self.max_trees
+        else:
+            booster = self.model.get_booster()
+            self.model = self._new().set_params(n_estimators=self.add_trees).fit(X, y, xgb_model=booster)
+        return self.model
+
+
+def walk_forward(X, y, day, start_day, every=REFIT_EVERY_DAYS, family='rf', mode='warm', add_trees=ADD_TREES,
+                 max_trees=MAX_TREES):
+    """Per-window metrics, plus every out-of-sample (y, p) pair for the summary."""
+    first = np.searchsorted(day, start_day)
+    if first == 0 or first == len(day):
+        raise ValueError("The start date must leave games both before and after it")
+
+    # windows are aligned to the start date; days without games never form a window
+    window = (day[first:] - start_day) // every
+    bounds = first + np.flatnonzero(np.r_[True, window[1:] != window[:-1], True])
+
+    updater = Updater(family, mode, add_trees, max_trees)
+    start = time.perf_counter()
+    model = updater.fit(X[:first], y[:first])
+    rows = [{'window_start': None, 'games': 0, 'train_rows': first, 'fit_s': time.perf_counter() - start}]
+
+    all_p = np.empty(len(day) - first)
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        start = time.perf_counter()
+        p = model.predict_proba(X[lo:hi])[:, 1]
+        score_s = time.perf_counter() - start
+        all_p[lo - first:hi - first] = p
+        y_win = y[lo:hi]
+
+        start = time.perf_counter()
+        if hi < len(day):
+            model = updater.fit(X[:hi], y[:hi])  # the training matrix is the prefix up to this window's end
+        fit_s = time.perf_counter() - start
+
+        rows.append({
+            'window_start': str(np.datetime64(int(day[lo]), 'D')),
+            'games': hi - lo,
+            'train_rows': hi,
+            'log_loss': log_loss(y_win, p, labels=[0, 1]),
+            'brier': brier_score_loss(y_win, p),
+            'mean_predicted': p.mean(),
+            'observed_rate': y_win.mean(),
+            'ece': expected_calibration_error(y_win, p),
+            'score_s': score_s,
+            'fit_s': fit_s,
+        })
+    return pd.DataFrame(rows), y[first:], all_p
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest with periodic model updates.")
+    parser.add_argument('--start', default=START_DATE)
+    parser.add_argument('--every', type=int, default=REFIT_EVERY_DAYS, help="days between model updates")
+    parser.add_argument('--model', choices=['rf', 'xgb'], default='rf')
+    parser.add_argument('--mode', choices=['warm', 'refit'], default='warm')
+    parser.add_argument('--add-trees', type=int, default=ADD_TREES)
+    parser.add_argument('--max-trees', type=int, default=MAX_TREES)
+    parser.add_argument('-o', '--output', default=None, help="per-window CSV")
+    args = parser.parse_args()
+
+    X, y, day = load_walk()
+    start_day = np.datetime64(args.start, 'D').astype(np.int64)
+
+    wall = time.perf_counter()
+    windows, y_out, p_out = walk_forward(X, y, day, start_day, args.every, args.model, args.mode, args.add_trees,
+                                         args.max_trees)
+    wall = time.perf_counter() - wall
+
+    if args.output:
+        windows.to_csv(args.output, index=False)
+    scored = windows.iloc[1:]
+    print(f"{args.model} / {args.mode} every {args.every}d from {args.start}: {len(scored)} windows, "
+          f"{len(y_out):,} games scored")
+    print(f"  log-loss {log_loss(y_out, p_out):.4f}  Brier {brier_score_loss(y_out, p_out):.4f}  "
+          f"ECE {expected_calibration_error(y_out, p_out):.4f}")
+    print(f"  initial fit {windows['fit_s'].iloc[0]:.2f}s, updates {scored['fit_s'].sum():.2f}s "
+          f"(mean {scored['fit_s'].mean():.3f}s), scoring {scored['score_s'].sum():.2f}s, wall {wall:.2f}s")
+    print(calibration_table(y_out, p_out).to_string(float_format=lambda v: f"{v:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Batch scoring for the game-outcome model: a CLI and a small local HTTP service.
+
+Every entry point assembles one feature matrix for all requested matchups and makes a single predict_proba call.
+The HTTP service also micro-batches concurrent requests: requests arriving within a few milliseconds of each other
+are scored together, and per-request latency percentiles and throughput are reported at /stats. Probabilities are
+calibrated whenever the model artifact carries a calibrator (calibration.py).
+
+    python batch_predict.py score matchups.csv -o scored.csv   # columns: home_team, away_team[, temp, wind_speed]
+    python batch_predict.py grid -o grid.csv                    # all 870 ordered pairs x a temp/wind grid
+    python batch_predict.py serve --port 8765                   # POST /predict, GET /stats
+"""
+
+import argparse
+import itertools
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from features import TeamTable, check_feature_order, matchup_feature_matrix, predict_home_win
+from model_artifact import load_model
+
+# --- CONFIGURATION ---
+MODEL_FILE = "../data/models/random_forest"
+TEAM_STATS_FILE = "../data/team_stats.csv"
+DEFAULT_TEMP = 72  # same defaults as the app's sliders
+DEFAULT_WIND = 5
+MAX_BATCH = 4096  # rows scored per predict_proba call in the service
+MAX_WAIT = 0.005  # seconds a request may wait for others to join its batch
+
+
+class Scorer:
+    def __init__(self, model, team_stats):
+        check_feature_order(model)
+        self.model = model
+        self.teams = TeamTable(team_stats)
+
+    @classmethod
+    def from_files(cls, model_file=MODEL_FILE, team_stats_file=TEAM_STATS_FILE):
+        return cls(load_model(model_file), pd.read_csv(team_stats_file))
+
+    def score(self, home_ids, away_ids, temp, wind_speed):
+        """Home-win probability per matchup, one predict_proba call."""
+        same = np.asarray(home_ids) == np.asarray(away_ids)
+        if same.any():
+            raise ValueError(f"A team cannot play itself: {np.asarray(home_ids)[same]}")
+        X = matchup_feature_matrix(home_ids, away_ids, temp, wind_speed, self.teams)
+        return predict_home_win(self.model, X)
+
+    def score_frame(self, matchups):
+        """Adds home_win_prob to a frame with home_team, away_team and optional temp/wind_speed columns."""
+        matchups = matchups.copy()
+        temp = matchups['temp'] if 'temp' in matchups else DEFAULT_TEMP
+        wind = matchups['wind_speed'] if 'wind_speed' in matchups else DEFAULT_WIND
+        matchups['home_win_prob'] = self.score(matchups['home_team'], matchups['away_team'], temp, wind)
+        return matchups
+
+
+def matchup_grid(team_ids, temps, winds):
+    """Every ordered (home, away) pair crossed with every temp and wind value."""
+    rows = [(h, a, t, w) for h, a in itertools.permutations(team_ids, 2) for t in temps for w in winds]
+    return pd.DataFrame(rows, columns=['home_team', 'away_team', 'temp', 'wind_speed'])
+
+
+# --- SERVICE ---
+
+class LatencyStats:
+    """Thread-safe latency and throughput counters for the service."""
+
+    def __init__(self, window=100_000):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.window = window
+        self.rows = 0
+        self.requests = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+
+    def record_batch(self):
+        with self.lock:
+            self.batches += 1
+
+    def record(self, latency, rows):
+        with self.lock:
+            self.latencies.append(latency)
+            if len(self.latencies) > self.window:
+                del self.latencies[:len(self.latencies) - self.window]
+            self.rows += rows
+            self.requests += 1
+
+    def summary(self):
+        with self.lock:
+            lat = np.array(self.latencies) * 1000
+            elapsed = time.perf_counter() - self.started
+            out = {
+                'requests': self.requests,
+                'rows': self.rows,
+                'batches': self.batches,
+                'rows_per_sec': self.rows / elapsed if elapsed else 0.0,
+                'requests_per_sec': self.requests / elapsed if elapsed else 0.0,
+            }
+        if len(lat):
+            p50, p90, p99 = np.percentile(lat, [50, 90, 99])
+            out.update(p50_ms=p50, p90_ms=p90, p99_ms=p99, max_ms=lat.max())
+        return out
+
+
+class MicroBatcher:
+    """
+    Scores requests on one background thread. Each batch takes whatever is queued, waiting at most max_wait for
+    more, up to max_batch rows, and runs a single predict_proba over all of it.
+    """
+
+    def __init__(self, scorer, max_batch=MAX_BATCH, max_wait=MAX_WAIT, stats=None):
+        self.scorer = scorer
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = stats or LatencyStats()
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, home_ids, away_ids, temps, winds):
+        """Returns a Future resolving to the home-win probabilities of these matchups."""
+        future = Future()
+        self.queue.put((np.asarray(home_ids), np.asarray(away_ids), np.asarray(temps, dtype=np.float32),
+                        np.asarray(winds, dtype=np.float32), future, time.perf_counter()))
+        return future
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            first = self.queue.get()
+            if first is None:
+                return
+            batch = [first]
+            rows = len(first[0])
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_batch:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.queue.put(None)
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._score(batch)
+
+    def _score(self, batch):
+        home, away, temps, winds = (np.concatenate([item[k] for item in batch]) for k in range(4))
+        try:
+            probs = self.scorer.score(home, away, temps, winds)
+        except Exception as e:
+            # a bad request must not fail the rest of its batch: score requests one by one
+            if len(batch) > 1:
+                for item in batch:
+                    self._score([item])
+                return
+            batch[0][4].set_exception(ValueError(e.args[0] if e.args else str(e)))
+            return
+
+        self.stats.record_batch()
+        now = time.perf_counter()
+        offset = 0
+        for item in batch:
+            n = len(item[0])
+            item[4].set_result(probs[offset:offset + n])
+            self.stats.record(now - item[5], n)
+            offset += n
+
+
+def make_handler(batcher):
+    class PredictHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self._send(200, batcher.stats.summary())
+            elif self.path == '/health':
+                self._send(200, {'status': 'ok'})
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            """Body: {"matchups": [{"home_team": 119, "away_team": 147, "temp": 72, "wind_speed": 5}, ...]}"""
+            if self.path != '/predict':
+                self._send(404, {'error': 'not found'})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                matchups = payload['matchups']
+                home = [int(m['home_team']) for m in matchups]
+                away = [int(m['away_team']) for m in matchups]
+                temps = [float(m.get('temp', DEFAULT_TEMP)) for m in matchups]
+                winds = [float(m.get('wind_speed', DEFAULT_WIND)) for m in matchups]
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {'error': f"bad request: {e}"})
+                return
+
+            try:
+                probs = batcher.submit(home, away, temps, winds).result()
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+                return
+            self._send(200, {'home_win_prob': [float(p) for p in probs]})
+
+        def log_message(self, *args):
+            pass
+
+    return PredictHandler
+
+
+def serve(scorer, host='127.0.0.1', port=8765, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+    batcher = MicroBatcher(scorer, max_batch=max_batch, max_wait=max_wait)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher))
+    print(f"Serving predictions on http://{host}:{port}/predict (stats at /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+        print(json.dumps(batcher.stats.summary(), indent=2))
+
+
+# --- CLI ---
+
+def parse_range(spec):
+    """'40:100:10' -> [40, 50, ..., 100]; '72' -> [72]."""
+    parts = [int(p) for p in spec.split(':')]
+    if len(parts) == 1:
+        return parts
+    start, stop, step = parts if len(parts) == 3 else (*parts, 1)
+    return list(range(start, stop + 1, step))
+
+
+def timed_score(scorer, matchups):
+    start = time.perf_counter()
+    scored = scorer.score_frame(matchups)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {len(scored):,} matchups in {elapsed * 1000:.1f} ms ({len(scored) / elapsed:,.0f} rows/sec)",
+          file=sys.stderr)
+    return scored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch predictions for MLB matchups.")
+    parser.add_argument('--model', default=MODEL_FILE, help="model artifact directory, or a pickled model")
+    parser.add_argument('--team-stats', default=TEAM_STATS_FILE)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    score_cmd = sub.add_parser('score', help="score a CSV of matchups")
+    score_cmd.add_argument('matchups')
+    score_cmd.add_argument('-o', '--output', default='-')
+
+    grid_cmd = sub.add_parser('grid', help="score every ordered team pair over a weather grid")
+    grid_cmd.add_argument('--temps', default='40:100:10', help="start:stop:step, inclusive")
+    grid_cmd.add_argument('--winds', default='0:30:5', help="start:stop:step, inclusive")
+    grid_cmd.add_argument('-o', '--output', default='-')
+
+    serve_cmd = sub.add_parser('serve', help="run the local HTTP endpoint")
+    serve_cmd.add_argument('--host', default='127.0.0.1')
+    serve_cmd.add_argument('--port', type=int, default=8765)
+    serve_cmd.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    serve_cmd.add_argument('--max-wait-ms', type=float, default=MAX_WAIT * 1000)
+
+    args = parser.parse_args()
+    scorer = Scorer.from_files(args.model, args.team_stats)
+
+    if args.command == 'serve':
+        serve(scorer, args.host, args.port, args.max_batch, args.max_wait_ms / 1000)
+        return
+
+    if args.command == 'score':
+        matchups = pd.read_csv(args.matchups)
+    else:
+        matchups = matchup_grid(sorted(scorer.teams.team_ids), parse_range(args.temps), parse_range(args.winds))
+
+    scored = timed_score(scorer, matchups)
+    scored.to_csv(sys.stdout if args.output == '-' else args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmarks the flattened forest engine against sklearn's predict_proba on real game rows, and checks that their
+probabilities agree.
+"""
+
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from dataset_store import load_games
+from features import game_feature_matrix, predict_home_win
+from forest_engine import flatten_forest
+
+# --- CONFIGURATION ---
+MODEL_FILE = "../data/random_forest.pkl"
+PARK_FACTORS_FILE = "../data/venue_park_factors.csv"
+BATCH_SIZES = [1, 30, 10_000]
+
+
+def best_time(fn, repeats):
+    """Fastest of `repeats` runs, in seconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flattened forest vs sklearn predict_proba latency.")
+    parser.add_argument('--model', default=MODEL_FILE)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    forest = flatten_forest(model)
+    X = np.nan_to_num(game_feature_matrix(load_games(categorical=False), pd.read_csv(PARK_FACTORS_FILE)))
+
+    expected = predict_home_win(model, X)
+    actual = predict_home_win(forest, X)
+    print(f"Max |sklearn - flat| over {len(X):,} rows: {np.abs(expected - actual).max():.2e}")
+    assert np.allclose(expected, actual, rtol=0, atol=1e-12)
+
+    print(f"{'batch':>8} {'sklearn ms':>12} {'flat ms':>10} {'speedup':>8}")
+    for size in BATCH_SIZES:
+        batch = X[:size]
+        repeats = max(3, args.repeats // (1 + size // 1000))
+        t_sklearn = best_time(lambda: predict_home_win(model, batch), repeats)
+        t_flat = best_time(lambda: predict_home_win(forest, batch), repeats)
+        print(f"{size:>8,} {t_sklearn * 1000:>12.2f} {t_flat * 1000:>10.2f} {t_sklearn / t_flat:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
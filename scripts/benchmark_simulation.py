@@ -0,0 +1,95 @@
+"""
+Benchmarks the vectorized Monte Carlo engine against the original pandas simulation loop on the 2025 schedule.
+"""
+
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from features import TeamTable, matchup_feature_matrix, predict_home_win
+from sim_engine import DEFAULT_SEED, encode_schedule, simulate_win_totals
+
+# --- CONFIGURATION ---
+MODEL_FILE = "../data/random_forest.pkl"
+TEAM_STATS_FILE = "../data/team_stats.csv"
+DATASET_FILE = "../data/mlb_2015_2025_dataset.csv"
+
+def load_schedule():
+    model = joblib.load(MODEL_FILE)
+    team_stats = pd.read_csv(TEAM_STATS_FILE)
+    df = pd.read_csv(DATASET_FILE)
+    schedule = df[df['year'] == 2025].copy()
+
+    X = matchup_feature_matrix(schedule['home_team'], schedule['away_team'], schedule['temp'],
+                               schedule['wind_speed'], TeamTable(team_stats))
+    schedule['home_win_prob'] = predict_home_win(model, X)
+    return schedule
+
+
+def legacy_loop(schedule, n_simulations):
+    """The original simulate_2025.py loop, kept verbatim for comparison."""
+    sim_results = []
+    for i in range(n_simulations):
+        draws = np.random.rand(len(schedule))
+        schedule['sim_win'] = (schedule['home_win_prob'] > draws).astype(int)
+
+        h_wins = schedule.groupby('home_team')['sim_win'].sum()
+        a_wins = schedule.groupby('away_team')['sim_win'].apply(lambda x: (x == 0).sum())
+
+        total_wins = h_wins.add(a_wins, fill_value=0)
+        sim_results.append(total_wins)
+
+    results_df = pd.concat(sim_results, axis=1)
+    return pd.DataFrame({
+        'Avg_Wins': results_df.mean(axis=1),
+        'P10_Wins': results_df.quantile(0.1, axis=1),
+        'P90_Wins': results_df.quantile(0.9, axis=1),
+    })
+
+
+def engine(schedule, n_simulations):
+    team_ids, home_idx, away_idx = encode_schedule(schedule['home_team'], schedule['away_team'])
+    totals = simulate_win_totals(schedule['home_win_prob'].to_numpy(), home_idx, away_idx, len(team_ids),
+                                 n_simulations, seed=DEFAULT_SEED)
+    return pd.DataFrame({
+        'Avg_Wins': totals.mean(),
+        'P10_Wins': totals.quantile(0.1),
+        'P90_Wins': totals.quantile(0.9),
+    }, index=team_ids)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--legacy-sims', type=int, default=500, help="simulations to time with the pandas loop")
+    parser.add_argument('--engine-sims', type=int, default=100000, help="simulations to time with the engine")
+    args = parser.parse_args()
+
+    print("Loading 2025 schedule...")
+    schedule = load_schedule()
+
+    np.random.seed(DEFAULT_SEED)
+    legacy, legacy_secs = timed(legacy_loop, schedule, args.legacy_sims)
+    same_n, same_n_secs = timed(engine, schedule, args.legacy_sims)
+    full, full_secs = timed(engine, schedule, args.engine_sims)
+
+    print(f"\n{'':<28}{'sims':>10}{'seconds':>10}{'sims/sec':>12}")
+    print(f"{'pandas loop':<28}{args.legacy_sims:>10}{legacy_secs:>10.2f}{args.legacy_sims / legacy_secs:>12,.0f}")
+    print(f"{'engine':<28}{args.legacy_sims:>10}{same_n_secs:>10.2f}{args.legacy_sims / same_n_secs:>12,.0f}")
+    print(f"{'engine':<28}{args.engine_sims:>10}{full_secs:>10.2f}{args.engine_sims / full_secs:>12,.0f}")
+    print(f"\nSpeedup: {(legacy_secs / args.legacy_sims) / (full_secs / args.engine_sims):,.0f}x per simulation")
+
+    gap = (legacy['Avg_Wins'] - full['Avg_Wins']).abs().max()
+    print(f"Largest Avg_Wins gap between loop ({args.legacy_sims} sims) and engine: {gap:.2f} wins")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Cold-start benchmark: the pickled forest (joblib + sklearn) against the flat model artifact.
+
+Each run starts a fresh interpreter that loads the model and scores one row, which is what an autoscaled container
+pays before its first prediction. Reports the median wall time per path and whether sklearn ended up imported.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# --- CONFIGURATION ---
+MODEL_FILE = "../data/random_forest.pkl"
+ARTIFACT_DIR = "../data/models/random_forest"
+
+PICKLE_STARTUP = """
+import joblib, numpy as np, pandas as pd
+model = joblib.load({path!r})
+model.predict_proba(pd.DataFrame(np.zeros((1, model.n_features_in_)), columns=model.feature_names_in_))
+"""
+
+ARTIFACT_STARTUP = """
+import numpy as np
+from model_artifact import load_artifact
+model = load_artifact({path!r})
+model.predict_proba(np.zeros((1, model.n_features_in_)))
+"""
+
+REPORT = """
+import sys, json
+print(json.dumps({'sklearn': 'sklearn' in sys.modules}))
+"""
+
+
+def cold_start(code):
+    """Wall time of a fresh interpreter running `code`, and whether it imported sklearn."""
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code + REPORT], capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, json.loads(out.stdout.strip().splitlines()[-1])['sklearn']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start time: pickle vs flat model artifact.")
+    parser.add_argument('--model', default=MODEL_FILE)
+    parser.add_argument('--artifact', default=ARTIFACT_DIR)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = statistics.median(cold_start('pass')[0] for _ in range(args.repeats))
+    print(f"{'path':>10} {'median s':>9} {'minus bare python':>18} {'imports sklearn':>16}")
+    print(f"{'python':>10} {baseline:>9.3f} {0:>18.3f} {'-':>16}")
+    for name, code in [('pickle', PICKLE_STARTUP.format(path=args.model)),
+                       ('artifact', ARTIFACT_STARTUP.format(path=args.artifact))]:
+        runs = [cold_start(code) for _ in range(args.repeats)]
+        median = statistics.median(t for t, _ in runs)
+        print(f"{name:>10} {median:>9.3f} {median - baseline:>18.3f} {str(runs[0][1]):>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Benchmark suite with regression gates on speed and accuracy.
+
+One run times the pipeline end to end and scores the served (calibrated) model on the evaluation season:
+
+- load: the game dataset from the CSV and from the Parquet partitions (dataset_store.py)
+- features: the training feature matrix for every game (features.py)
+- predict: predict_proba latency for a single row and per row of a 10,000-row batch
+- simulation: Monte Carlo seasons per second, static (simulate_win_totals) and path-dependent (SeasonPath)
+- momentum: the add_momentum.py replay (last-10/5 records over the whole history)
+- accuracy: log-loss, Brier score, ROC-AUC and accuracy on EVALUATION_YEARS, which neither the forest nor its
+  calibrator was fit on (the run fails outright if the calibrator saw any of them)
+
+Every run is appended to a JSON history. Each metric is compared with its baseline, the median of the latest passing
+comparable runs: timings only from runs on the same host and platform, scores only from runs of the same model
+(model_sha256). A timing more than SPEED_TOLERANCE slower, or a score worse than its ACCURACY_TOLERANCE (or past the
+absolute ACCURACY_LIMITS), fails the run: the exit status is 1 and the run is recorded but never becomes a baseline.
+An intended change is accepted with --rebaseline, which records the run as the new baseline, older runs aside.
+
+    python benchmark_suite.py                           # run everything, record it, gate against the history
+    python benchmark_suite.py --only predict accuracy   # a subset
+    python benchmark_suite.py --no-save                 # gate without recording
+    python benchmark_suite.py --rebaseline              # accept this run's numbers as the baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from calibration import EVALUATION_YEARS, brier_score, holdout_predictions, log_loss
+from dataset_store import HAS_PYARROW, PARQUET_DIR, load_games
+from features import add_game_features, feature_response, game_feature_matrix
+from model_artifact import load_model, model_sha256
+from rolling_features import momentum_features
+from sim_engine import (DEFAULT_SEED, MOMENTUM_VALUES, SeasonPath, encode_schedule, simulate_path_dependent,
+                        simulate_win_totals)
+
+# --- CONFIGURATION ---
+MODEL_DIR = "../data/models/random_forest"
+PARK_FACTORS_FILE = "../data/venue_park_factors.csv"
+HISTORY_FILE = "../data/benchmark_history.json"
+REPEATS = 15  # timings are the fastest of this many runs (fewer for the simulations)
+BATCH_SIZE = 10_000
+SIMS = 20_000
+BASELINE_RUNS = 5  # baseline = median of this many latest passing runs
+SPEED_TOLERANCE = 0.50  # a timing may be 50% slower (a rate a third lower) than its baseline; shared machines are noisy
+ACCURACY_TOLERANCE = {'log_loss': 0.002, 'brier': 0.001, 'roc_auc': 0.005, 'accuracy': 0.01}
+ACCURACY_LIMITS = {'log_loss': 0.6931, 'roc_auc': 0.55}  # a coin flip's log-loss; the README's ROC-AUC range
+
+# metric -> (unit, direction): 'lower' or 'higher' is better; speed metrics are gated relatively
+METRICS = {
+    'load_csv_s': ('s', 'lower'),
+    'load_parquet_s': ('s', 'lower'),
+    'feature_matrix_s': ('s', 'lower'),
+    'predict_single_us': ('us', 'lower'),
+    'predict_batch_us_per_row': ('us', 'lower'),
+    'sims_per_sec': ('sims/s', 'higher'),
+    'path_sims_per_sec': ('sims/s', 'higher'),
+    'momentum_replay_s': ('s', 'lower'),
+    'log_loss': ('', 'lower'),
+    'brier': ('', 'lower'),
+    'roc_auc': ('', 'higher'),
+    'accuracy': ('', 'higher'),
+}
+
+
+def best_time(fn, repeats=REPEATS, number=1):
+    """Fastest of `repeats` runs of `number` calls, in seconds per call."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return min(times)
+
+
+def roc_auc(y, p):
+    """Probability that a random home win is scored above a random home loss (ties count half)."""
+    ranks = pd.Series(p).rank().to_numpy()
+    positive = np.asarray(y) == 1
+    n_pos, n_neg = positive.sum(), (~positive).sum()
+    return float((ranks[positive].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
+
+
+# --- BENCHMARKS ---
+
+def bench_load(ctx):
+    out = {'load_csv_s': best_time(lambda: load_games(categorical=False, parquet_dir=''), ctx['repeats'])}
+    if HAS_PYARROW and os.path.isdir(PARQUET_DIR):
+        out['load_parquet_s'] = best_time(lambda: load_games(categorical=False), ctx['repeats'])
+    return out
+
+
+def bench_features(ctx):
+    games, park_factors = ctx['games'], ctx['park_factors']
+    return {'feature_matrix_s': best_time(lambda: game_feature_matrix(add_game_features(games.copy(), park_factors)),
+                                          ctx['repeats'])}
+
+
+def bench_predict(ctx):
+    model, X = ctx['model'], ctx['X']
+    batch = np.resize(X, (BATCH_SIZE, X.shape[1]))
+    return {
+        'predict_single_us': best_time(lambda: model.predict_proba(X[:1]), ctx['repeats'], number=100) * 1e6,
+        'predict_batch_us_per_row': best_time(lambda: model.predict_proba(batch), ctx['repeats']) * 1e6 / BATCH_SIZE,
+    }
+
+
+def bench_simulation(ctx):
+    schedule = ctx['games'][ctx['games']['year'] == 2025]
+    X = ctx['X'][(ctx['games']['year'] == 2025).to_numpy()]
+    team_ids, home_idx, away_idx = encode_schedule(schedule['home_team'], schedule['away_team'])
+    n_teams, sims = len(team_ids), ctx['sims']
+    p = ctx['model'].predict_proba(X)[:, 1]
+    static = best_time(lambda: simulate_win_totals(p, home_idx, away_idx, n_teams, sims, seed=DEFAULT_SEED),
+                       max(2, ctx['repeats'] // 3))
+
+    # path-dependent seasons replay from an all-zero last-10 record; the response table is built once, outside
+    days = schedule['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    path = SeasonPath(days, home_idx, away_idx, n_teams)
+    response = feature_response(ctx['model'], X[path.order], 'diff_wins_last_10', MOMENTUM_VALUES)
+    bits = np.zeros(n_teams, dtype=np.uint16)
+    path_sims = max(1, sims // 10)
+    dynamic = best_time(lambda: simulate_path_dependent(response, path, bits, path_sims, seed=DEFAULT_SEED),
+                        max(2, ctx['repeats'] // 5))
+    return {'sims_per_sec': sims / static, 'path_sims_per_sec': path_sims / dynamic}
+
+
+def bench_momentum(ctx):
+    # add_momentum.py: sort the history chronologically, then last-10/5 records for both sides
+    games = ctx['games']
+    return {'momentum_replay_s': best_time(lambda: momentum_features(games.sort_values(by=['date', 'game_id'])),
+                                           ctx['repeats'])}
+
+
+def bench_accuracy(ctx):
+    model = ctx['model']
+    calibrator = getattr(model, 'calibrator', None)
+    fit_years = calibrator.meta.get('years', []) if calibrator is not None else []
+    seen = sorted(set(fit_years) & set(EVALUATION_YEARS))
+    if seen:
+        raise SystemExit(f"The calibrator was fit on {seen}: the accuracy gates need seasons it never saw")
+    p, y, _ = holdout_predictions(model, EVALUATION_YEARS)
+    return {
+        'log_loss': log_loss(y, p),
+        'brier': brier_score(y, p),
+        'roc_auc': roc_auc(y, p),
+        'accuracy': float(((p > 0.5) == (y == 1)).mean()),
+    }
+
+
+BENCHMARKS = {
+    'load': bench_load,
+    'features': bench_features,
+    'predict': bench_predict,
+    'simulation': bench_simulation,
+    'momentum': bench_momentum,
+    'accuracy': bench_accuracy,
+}
+
+
+# --- HISTORY AND GATES ---
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(history, path):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(history, f, indent=1)
+    os.replace(path + '.tmp', path)
+
+
+def comparable(run, name, current):
+    """Whether `run` can baseline `name` for the `current` run: same model for scores, same machine for timings."""
+    keys = ('model_sha256',) if name in ACCURACY_TOLERANCE else ('host', 'platform')
+    return all(run.get(key) == current[key] for key in keys)
+
+
+def baselines(history, current, runs=BASELINE_RUNS):
+    """
+    metric -> median of its values over the latest `runs` passing runs comparable to `current` that measured it.
+    A --rebaseline run counts even if it failed, and no run before it does.
+    """
+    values, closed = {}, set()
+    for run in reversed(history):
+        if not (run.get('passed') or run.get('rebaseline')):
+            continue
+        for name, value in run['metrics'].items():
+            if name in closed or not comparable(run, name, current):
+                continue
+            if len(values.setdefault(name, [])) < runs:
+                values[name].append(value)
+            if run.get('rebaseline'):
+                closed.add(name)
+    return {name: statistics.median(v) for name, v in values.items()}
+
+
+def check(name, value, baseline, speed_tolerance=SPEED_TOLERANCE):
+    """None if the metric passes its gate, else why it fails."""
+    _, direction = METRICS[name]
+    limit = ACCURACY_LIMITS.get(name)
+    if limit is not None and (value > limit if direction == 'lower' else value < limit):
+        return f"{name} {value:.4f} is past the limit {limit}"
+    if baseline is None:
+        return None
+    if name in ACCURACY_TOLERANCE:
+        tolerance = ACCURACY_TOLERANCE[name]
+        worse = value > baseline + tolerance if direction == 'lower' else value < baseline - tolerance
+    else:
+        worse = (value > baseline * (1 + speed_tolerance) if direction == 'lower'
+                 else value < baseline / (1 + speed_tolerance))
+    return f"{name} regressed: {value:.4g} vs baseline {baseline:.4g}" if worse else None
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speed and accuracy benchmarks gated against their history.")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--model', default=MODEL_DIR)
+    parser.add_argument('--history', default=HISTORY_FILE)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--sims', type=int, default=SIMS, help="static seasons per timing (path-dependent: a tenth)")
+    parser.add_argument('--speed-tolerance', type=float, default=SPEED_TOLERANCE)
+    parser.add_argument('--no-save', action='store_true', help="gate against the history without recording this run")
+    parser.add_argument('--rebaseline', action='store_true',
+                        help="record this run as the new baseline even if it regresses (an intended change)")
+    args = parser.parse_args()
+
+    park_factors = pd.read_csv(PARK_FACTORS_FILE)
+    games = load_games(categorical=False)
+    ctx = {
+        'model': load_model(args.model),
+        'games': games,
+        'park_factors': park_factors,
+        'X': np.nan_to_num(game_feature_matrix(games, park_factors)),
+        'repeats': args.repeats,
+        'sims': args.sims,
+    }
+
+    metrics = {}
+    for name in args.only:
+        start = time.perf_counter()
+        metrics.update(BENCHMARKS[name](ctx))
+        print(f"  {name:<12} done in {time.perf_counter() - start:.1f}s")
+
+    run = {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'model_sha256': model_sha256(args.model),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+    }
+    history = load_history(args.history)
+    base = baselines(history, run)
+    failures = []
+    print(f"\n{'metric':<26}{'value':>12}{'baseline':>12}{'change':>9}  unit")
+    for name, value in metrics.items():
+        unit, _ = METRICS[name]
+        baseline = base.get(name)
+        shown, change = (f"{baseline:.4g}", f"{value / baseline - 1:+.1%}") if baseline else ('-', '')
+        failure = check(name, value, baseline, args.speed_tolerance)
+        if failure:
+            failures.append(failure)
+        print(f"{name:<26}{value:>12.4g}{shown:>12}{change:>9}  {unit}{'  FAIL' if failure else ''}")
+
+    run.update(metrics=metrics, passed=not failures, failures=failures, rebaseline=args.rebaseline)
+    if not args.no_save:
+        save_history(history + [run], args.history)
+        print(f"\nRecorded in {args.history} ({len(history) + 1} runs)")
+
+    if failures and args.rebaseline:
+        print("\nAccepted as the new baseline:\n  " + "\n  ".join(failures))
+        return
+    if failures:
+        print("\nREGRESSIONS:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nNo regressions" + ("" if base else " (first run: this is the baseline)"))
+
+
+if __name__ == "__main__":
+    main()
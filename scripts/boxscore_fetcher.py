@@ -0,0 +1,140 @@
+"""
+Concurrent, rate-limited boxscore fetching for the MLB miner.
+
+Boxscores are pulled by a bounded thread pool sharing one token bucket, with exponential backoff and full jitter on
+transient failures (timeouts, connection errors, 429 and 5xx responses); any other failure gives up on that game
+only. Each worker thread keeps its own keep-alive requests.Session. Results are handed back strictly in the order the
+game ids were given, so the caller can keep applying tracker updates chronologically. With a ResponseCache, cached
+games skip the pool and the rate limit entirely and fresh responses are written back.
+"""
+
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+
+# --- CONFIGURATION ---
+STATSAPI_BASE_URL = "https://statsapi.mlb.com/api/v1.1"
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 10.0
+MAX_RETRIES = 5
+BASE_DELAY = 0.5
+MAX_DELAY = 30.0
+RETRY_STATUSES = {429}  # plus every 5xx
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+
+def make_session_fetch(base_url=STATSAPI_BASE_URL, timeout=30):
+    """
+    Returns fetch(game_pk) -> dict, equivalent to statsapi.get("game", {"gamePk": game_pk}) but reusing one
+    connection per thread. Point base_url at a local fake server to test without the network.
+    """
+    local = threading.local()
+
+    def fetch(game_pk):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        resp = session.get(f"{base_url}/game/{game_pk}/feed/live", timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    return fetch
+
+
+def backoff_delay(attempt, base=BASE_DELAY, cap=MAX_DELAY):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def is_transient(exc):
+    """Whether a failed request is worth retrying: a timeout, a dropped connection, a 429 or a 5xx."""
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+        return True
+    status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    return isinstance(exc, requests.HTTPError) and status is not None and (status in RETRY_STATUSES or status >= 500)
+
+
+def fetch_with_retry(fetch, game_pk, bucket, retries=MAX_RETRIES, sleep=time.sleep):
+    """
+    Returns the boxscore, or None once every retry has failed or the fetch failed for good (e.g. a 404, or any error
+    from a pluggable fetcher), so one bad game never aborts the scrape.
+    """
+    for attempt in range(retries):
+        bucket.acquire()
+        try:
+            return fetch(game_pk)
+        except Exception as exc:
+            if not is_transient(exc):
+                print(f"gamePk {game_pk}: {type(exc).__name__}: {exc}")
+                return None
+            if attempt < retries - 1:
+                sleep(backoff_delay(attempt))
+    print(f"gamePk {game_pk}: giving up after {retries} attempts")
+    return None
+
+
+def _resolved(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def iter_boxscores(game_pks, fetch=None, max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND, retries=MAX_RETRIES,
+                   max_in_flight=None, cache=None):
+    """
+    Yields (game_pk, box) in the same order as game_pks, fetching up to max_in_flight games ahead of the consumer.
+    box is None when the game could not be fetched (or is not cached, in offline mode).
+    """
+    if fetch is None:
+        fetch = make_session_fetch()
+    bucket = TokenBucket(rate)
+    max_in_flight = max_in_flight or max_workers * 4
+    game_pks = iter(game_pks)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Cache reads and writes stay on this thread; workers only do network I/O.
+        def submit(pk):
+            if cache is not None:
+                box = cache.get_game(pk)
+                if box is not None or cache.offline:
+                    return pk, _resolved(box), False
+            return pk, pool.submit(fetch_with_retry, fetch, pk, bucket, retries), True
+
+        pending = deque(submit(pk) for pk in itertools.islice(game_pks, max_in_flight))
+        while pending:
+            pk, future, fetched = pending.popleft()
+            box = future.result()
+            if fetched and box is not None and cache is not None:
+                cache.put_game(pk, box)
+            for next_pk in itertools.islice(game_pks, 1):
+                pending.append(submit(next_pk))
+            yield pk, box
@@ -0,0 +1,200 @@
+"""
+Probability calibration for the game-outcome model.
+
+The forest is fit on seasons before 2024, so its raw home-win probabilities are mapped through a calibrator fit on
+the held-out 2024 games: isotonic regression (pool-adjacent-violators) or Platt scaling (a logistic fit on the
+raw log-odds). Either way the calibrator is stored as a knot array, increasing raw probabilities x and calibrated
+values y, and applied with one np.interp: a lookup of well under a microsecond per row, vectorized over any batch.
+
+The knots live next to the model artifact (calibration.json), and load_model() wraps the forest in a CalibratedModel
+(calibrator.py, which only needs NumPy) when they are present, so the app's matchup table, batch scoring and the
+simulators all get calibrated probabilities through the same predict_proba call.
+
+Whether it helps is measured on 2025, which neither the forest nor the calibrator saw; a report on seasons the
+calibrator was fit on is marked in-sample.
+
+    python calibration.py fit                     # Platt scaling on 2024, stored with the model artifact
+    python calibration.py fit --method isotonic
+    python calibration.py report                  # reliability curve, raw vs calibrated, on 2025
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from calibrator import Calibrator, calibration_path
+from dataset_store import load_games
+from features import add_game_features, game_feature_matrix, predict_home_win
+from model_artifact import load_model
+
+# --- CONFIGURATION ---
+MODEL_DIR = "../data/models/random_forest"
+PARK_FACTORS_FILE = "../data/venue_park_factors.csv"
+HOLDOUT_YEARS = [2024, 2025]  # seasons the forest never saw
+CALIBRATION_YEARS = [2024]  # the calibrator is fit on these...
+EVALUATION_YEARS = [2025]  # ...and judged on these, which nothing was fit on
+PLATT_KNOTS = 201  # Platt scaling is sampled on an even grid over [0, 1]
+CALIBRATION_BINS = 10
+EPS = 1e-6
+
+
+# --- METRICS ---
+
+def log_loss(y, p):
+    p = np.clip(p, EPS, 1 - EPS)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def brier_score(y, p):
+    return float(np.mean((p - y) ** 2))
+
+
+def expected_calibration_error(y, p, bins=CALIBRATION_BINS):
+    """Row-weighted mean |observed - predicted| over equal-width probability bins."""
+    which = np.minimum((p * bins).astype(int), bins - 1)
+    count = np.bincount(which, minlength=bins)
+    gap = np.abs(np.bincount(which, y, bins) - np.bincount(which, p, bins))
+    return gap.sum() / max(1, count.sum())
+
+
+def calibration_table(y, p, bins=CALIBRATION_BINS):
+    which = np.minimum((p * bins).astype(int), bins - 1)
+    frame = pd.DataFrame({'bin': which, 'predicted': p, 'observed': y})
+    table = frame.groupby('bin').agg(games=('observed', 'size'), predicted=('predicted', 'mean'),
+                                     observed=('observed', 'mean'))
+    table.index = [f"{b / bins:.1f}-{(b + 1) / bins:.1f}" for b in table.index]
+    return table
+
+
+# --- FITTING ---
+
+def fit_isotonic(p, y):
+    """Knots of the non-decreasing step fit of y on p (pool adjacent violators), two per pooled block."""
+    order = np.argsort(p, kind='stable')
+    p, y = np.asarray(p, dtype=np.float64)[order], np.asarray(y, dtype=np.float64)[order]
+    # ties in p start as one block, as a step function cannot separate them
+    x, first = np.unique(p, return_index=True)
+    total = np.add.reduceat(y, first)
+    weight = np.diff(np.r_[first, len(p)]).astype(np.float64)
+
+    # stack of blocks: (mean, weight, first x, last x)
+    means, weights, lo, hi = [], [], [], []
+    for k in range(len(x)):
+        mean, w, start = total[k] / weight[k], weight[k], k
+        while means and means[-1] >= mean:
+            mean = (means[-1] * weights[-1] + mean * w) / (weights[-1] + w)
+            w += weights.pop()
+            means.pop()
+            hi.pop()
+            start = lo.pop()
+        means.append(mean)
+        weights.append(w)
+        lo.append(start)
+        hi.append(k)
+
+    knots_x = np.ravel(np.column_stack([x[lo], x[hi]]))
+    knots_y = np.repeat(means, 2)
+    keep = np.r_[True, np.diff(knots_x) > 0]  # single-value blocks give duplicate knots
+    return knots_x[keep], knots_y[keep]
+
+
+def fit_platt(p, y, iterations=50):
+    """Knots of sigmoid(a * logit(p) + b), fit by Newton's method on the log-loss."""
+    z = np.log(np.clip(p, EPS, 1 - EPS) / (1 - np.clip(p, EPS, 1 - EPS)))
+    y = np.asarray(y, dtype=np.float64)
+    Z = np.column_stack([z, np.ones_like(z)])
+    w = np.array([1.0, 0.0])
+    for _ in range(iterations):
+        q = 1 / (1 + np.exp(-Z @ w))
+        hessian = Z.T @ (Z * (q * (1 - q))[:, None]) + 1e-9 * np.eye(2)
+        step = np.linalg.solve(hessian, Z.T @ (q - y))
+        w -= step
+        if np.abs(step).max() < 1e-10:
+            break
+    x = np.linspace(0, 1, PLATT_KNOTS)
+    zx = np.log(np.clip(x, EPS, 1 - EPS) / (1 - np.clip(x, EPS, 1 - EPS)))
+    return x, 1 / (1 + np.exp(-(w[0] * zx + w[1]))), {'slope': float(w[0]), 'intercept': float(w[1])}
+
+
+def fit_calibrator(p, y, method='isotonic', **meta):
+    """A Calibrator of raw probabilities p to outcomes y."""
+    if method == 'isotonic':
+        x, v = fit_isotonic(p, y)
+    elif method == 'platt':
+        x, v, params = fit_platt(p, y)
+        meta.update(params)
+    else:
+        raise ValueError(f"Unknown calibration method: {method}")
+    return Calibrator(x, v, method, dict(meta, games=int(len(p))))
+
+
+# --- HELD-OUT GAMES ---
+
+def holdout_predictions(model, years=HOLDOUT_YEARS, park_factors_file=PARK_FACTORS_FILE):
+    """(raw home-win probability, home_win, year) for every usable game of the held-out seasons."""
+    df = load_games(categorical=False, years=years)
+    df = df[df['condition'] != 'Unknown']
+    df = add_game_features(df, pd.read_csv(park_factors_file))
+    p = predict_home_win(model, game_feature_matrix(df))
+    return p, df['home_win'].to_numpy(np.int8), df['year'].to_numpy()
+
+
+def score_line(y, p):
+    return (f"log-loss {log_loss(y, p):.4f} | Brier {brier_score(y, p):.4f} | "
+            f"ECE {expected_calibration_error(y, p):.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit or report the model's probability calibration.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    fit_cmd = sub.add_parser('fit', help="fit a calibrator on held-out seasons and store it with the model")
+    fit_cmd.add_argument('--method', choices=['isotonic', 'platt'], default='platt')
+    fit_cmd.add_argument('--years', type=int, nargs='+', default=CALIBRATION_YEARS)
+    report_cmd = sub.add_parser('report', help="reliability curves of the raw and calibrated probabilities")
+    report_cmd.add_argument('--years', type=int, nargs='+', default=EVALUATION_YEARS)
+    report_cmd.add_argument('-o', '--output', default=None, help="also write the reliability table as CSV")
+    for cmd in (fit_cmd, report_cmd):
+        cmd.add_argument('--model', default=MODEL_DIR)
+    args = parser.parse_args()
+    model = load_model(args.model, calibrated=False)
+
+    if args.command == 'fit':
+        p, y, year = holdout_predictions(model, args.years)
+        calibrator = fit_calibrator(p, y, args.method, years=[int(v) for v in np.unique(year)])
+        calibrator.save(calibration_path(args.model))
+        print(f"Wrote {calibration_path(args.model)}: {args.method}, {len(calibrator.x)} knots, "
+              f"fit on {len(p):,} games of {args.years}")
+        # the check that counts is on seasons the calibrator did not see
+        unseen = [v for v in EVALUATION_YEARS if v not in args.years]
+        if unseen:
+            p, y, _ = holdout_predictions(model, unseen)
+            print(f"{unseen}, not in the fit:")
+            print(f"  raw        {score_line(y, p)}")
+            print(f"  calibrated {score_line(y, calibrator(p))}")
+        return
+
+    calibrator = Calibrator.load(calibration_path(args.model))
+    fit_years = calibrator.meta.get('years', [])
+    p, y, year = holdout_predictions(model, args.years)
+    q = calibrator(p)
+    print(f"Calibrator: {calibrator.method}, {len(calibrator.x)} knots, fit on {fit_years}")
+    tables = []
+    for label, mask in [(str(v), year == v) for v in np.unique(year)] + [('all', np.ones(len(y), dtype=bool))]:
+        seen = sorted(set(np.unique(year[mask]).tolist()) & set(fit_years))
+        note = f" IN-SAMPLE: the calibrator was fit on {seen}" if seen else ""
+        print(f"\n--- {label} ({mask.sum():,} games) ---{note}")
+        print(f"raw        {score_line(y[mask], p[mask])}")
+        print(f"calibrated {score_line(y[mask], q[mask])}")
+        raw = calibration_table(y[mask], p[mask])
+        cal = calibration_table(y[mask], q[mask])
+        table = raw.join(cal, how='outer', lsuffix='_raw', rsuffix='_calibrated')
+        print(table.to_string(float_format=lambda v: f"{v:.3f}"))
+        tables.append(table.assign(seasons=label))
+    if args.output:
+        pd.concat(tables).rename_axis('bin').to_csv(args.output)
+        print(f"\nWritten to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Applying a fitted probability calibrator (see calibration.py for fitting and reports).
+
+A calibrator is a knot array, increasing raw probabilities x and calibrated values y, stored as calibration.json in
+the model artifact directory and applied with one np.interp. This module needs nothing but NumPy, so loading a
+calibrated model costs no more imports than loading the forest.
+"""
+
+import json
+import os
+
+import numpy as np
+
+# --- CONFIGURATION ---
+CALIBRATION_FILE = "calibration.json"  # inside the model artifact directory
+
+
+def calibration_path(model_dir):
+    return os.path.join(model_dir, CALIBRATION_FILE)
+
+
+class Calibrator:
+    """Piecewise-linear map of raw to calibrated probabilities; constant beyond the outer knots."""
+
+    def __init__(self, x, y, method, meta=None):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.method = method
+        self.meta = meta or {}
+
+    def __call__(self, p):
+        return np.interp(p, self.x, self.y)
+
+    def save(self, path):
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'method': self.method, **self.meta, 'x': self.x.round(6).tolist(),
+                       'y': self.y.round(6).tolist()}, f)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            spec = json.load(f)
+        x, y, method = spec.pop('x'), spec.pop('y'), spec.pop('method')
+        return cls(x, y, method, spec)
+
+
+class CalibratedModel:
+    """A fitted model whose predict_proba goes through a Calibrator; everything else is the model's."""
+
+    def __init__(self, model, calibrator):
+        self.model = model
+        self.calibrator = calibrator
+
+    def predict_proba(self, X):
+        p = self.calibrator(self.model.predict_proba(X)[:, 1])
+        return np.column_stack([1 - p, p])
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
@@ -0,0 +1,133 @@
+"""
+Columnar storage for the mined game dataset.
+
+The schema is declared once here. `python dataset_store.py` converts mlb_2015_2025_dataset.csv into a Parquet
+dataset partitioned by year, and load_games() reads it back with column projection and year predicates pushed down
+to the files, already typed (downcast numerics, parsed dates, optional categories). Without pyarrow or the Parquet
+files, load_games() falls back to the CSV and applies the same schema.
+"""
+
+import argparse
+import os
+import shutil
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# --- CONFIGURATION ---
+DATASET_CSV = "../data/mlb_2015_2025_dataset.csv"
+PARQUET_DIR = "../data/games"
+
+SCHEMA = {
+    'game_id': 'int32',
+    'year': 'int16',
+    'date': 'datetime64[ns]',
+    'home_team': 'int16',
+    'away_team': 'int16',
+    'venue_id': 'int32',
+    'temp': 'int16',
+    'wind_speed': 'int16',
+    'condition': 'object',
+    'home_rest': 'int16',
+    'away_rest': 'int16',
+    'home_games_last_7': 'int8',
+    'away_games_last_7': 'int8',
+    'home_win_pct': 'float32',
+    'home_ops': 'float32',
+    'home_avg': 'float32',
+    'home_run_diff': 'float32',
+    'away_win_pct': 'float32',
+    'away_ops': 'float32',
+    'away_avg': 'float32',
+    'away_run_diff': 'float32',
+    'home_starter_era': 'float32',
+    'home_starter_whip': 'float32',
+    'away_starter_era': 'float32',
+    'away_starter_whip': 'float32',
+    'home_score': 'int8',
+    'away_score': 'int8',
+    'home_win': 'int8',
+    'home_wins_last_10': 'int8',
+    'home_wins_last_5': 'int8',
+    'away_wins_last_10': 'int8',
+    'away_wins_last_5': 'int8',
+    'diff_wins_last_10': 'int8',
+}
+
+# ids and weather conditions are labels, not quantities
+CATEGORY_COLUMNS = ['home_team', 'away_team', 'venue_id', 'condition']
+
+
+def apply_schema(df, categorical=True):
+    """Casts known columns to their declared dtypes; unknown columns are left alone."""
+    for col, dtype in SCHEMA.items():
+        if col not in df.columns:
+            continue
+        if dtype.startswith('datetime'):
+            df[col] = pd.to_datetime(df[col])
+        elif dtype == 'object':
+            df[col] = df[col].astype(str)
+        else:
+            df[col] = df[col].astype(dtype)
+
+    if categorical:
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+    return df
+
+
+def load_games(columns=None, years=None, categorical=True, parquet_dir=PARQUET_DIR, csv_path=DATASET_CSV):
+    """
+    Loads the game dataset, typed per SCHEMA.
+
+    columns: subset of columns to read (default: all).
+    years: iterable of seasons to keep (default: all). With Parquet, other partitions are never opened.
+    categorical: convert team/venue ids and conditions to pandas categories.
+    """
+    columns = list(dict.fromkeys(columns)) if columns is not None else None
+    years = sorted(set(int(y) for y in years)) if years is not None else None
+
+    if HAS_PYARROW and os.path.isdir(parquet_dir):
+        filters = [('year', 'in', years)] if years is not None else None
+        df = pd.read_parquet(parquet_dir, engine='pyarrow', columns=columns, filters=filters)
+        # the partition column comes back last; restore the CSV's column order
+        order = columns or [c for c in SCHEMA if c in df.columns] + [c for c in df.columns if c not in SCHEMA]
+        df = df[order]
+    else:
+        usecols = columns if columns is None or years is None else list(dict.fromkeys(columns + ['year']))
+        df = pd.read_csv(csv_path, usecols=usecols)
+        if years is not None:
+            df = df[df['year'].isin(years)].reset_index(drop=True)
+        if columns is not None:
+            df = df[columns]
+
+    return apply_schema(df, categorical)
+
+
+def convert_csv_to_parquet(csv_path=DATASET_CSV, parquet_dir=PARQUET_DIR):
+    df = apply_schema(pd.read_csv(csv_path), categorical=False)
+    if os.path.isdir(parquet_dir):
+        shutil.rmtree(parquet_dir)
+    df.to_parquet(parquet_dir, engine='pyarrow', partition_cols=['year'], index=False)
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the game dataset CSV to year-partitioned Parquet.")
+    parser.add_argument('--csv', default=DATASET_CSV)
+    parser.add_argument('--out', default=PARQUET_DIR)
+    args = parser.parse_args()
+
+    if not HAS_PYARROW:
+        raise SystemExit("pyarrow is required to write Parquet: pip install pyarrow")
+
+    start = time.perf_counter()
+    games = convert_csv_to_parquet(args.csv, args.out)
+    print(f"Wrote {len(games)} games to {args.out} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,97 @@
+"""
+Point-in-time team features for whole schedules at once.
+
+FeatureStore takes the team-state log (team_state.py) and sorts its snapshots by (team, day) into flat columns with
+a single int64 key, dense team index << 32 | ordinal day. An as-of join for any number of (team, date) pairs is then
+one searchsorted over that key: the snapshot just before the key of (team, date) is the team's state after its last
+game before that date, and it belongs to the same team only if the team had one. Games are therefore scored with
+the stats the teams actually had entering them, never with end-of-season values.
+
+    store = FeatureStore.load()
+    X = store.matchup_feature_matrix(games['home_team'], games['away_team'], games['date'], games['temp'],
+                                     games['wind_speed'])
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import snapshot_feature_matrix
+from team_state import PARK_FACTORS_FILE, STATE_FILE, TeamStateStore, load_final_games, state_columns
+
+
+def _days(dates):
+    return pd.to_datetime(pd.Series(dates)).to_numpy().astype('datetime64[D]').astype(np.int64)
+
+
+class FeatureStore:
+    def __init__(self, state):
+        n = state.size
+        team = state.log['team'][:n]
+        day = state.log['day'][:n]
+        order = np.lexsort((np.arange(n), day, team))  # same-day games stay in the order they were applied
+
+        self.log = {col: values[:n][order] for col, values in state.log.items()}
+        self.recent_days = state.recent_days[:n][order]
+        self.team_ids = np.unique(team)
+        self.index_of = np.full(self.team_ids.max() + 1, -1, dtype=np.int64)
+        self.index_of[self.team_ids] = np.arange(len(self.team_ids))
+        self.key = (self.index_of[self.log['team']] << 32) | self.log['day']
+
+    @classmethod
+    def load(cls, state_file=STATE_FILE):
+        """From the saved team state, brought up to date with the dataset (built from scratch if missing)."""
+        if os.path.exists(state_file):
+            state = TeamStateStore.load(state_file)
+        else:
+            state = TeamStateStore(pd.read_csv(PARK_FACTORS_FILE))
+        if state.apply_games(load_final_games()):
+            state.save(state_file)
+        return cls(state)
+
+    def rows(self, team_ids, days):
+        """Snapshot row of each team's last game strictly before each ordinal day; -1 where there is none."""
+        team_ids = np.asarray(team_ids, dtype=np.int64)
+        team = np.full(len(team_ids), -1, dtype=np.int64)
+        known = (team_ids >= 0) & (team_ids < self.index_of.size)  # a negative id would wrap around index_of
+        team[known] = self.index_of[team_ids[known]]
+
+        key = (np.maximum(team, 0) << 32) | np.asarray(days, dtype=np.int64)
+        rows = np.searchsorted(self.key, key, side='left') - 1
+        found = (team >= 0) & (rows >= 0)
+        found[found] = (self.key[rows[found]] >> 32) == team[found]
+        return np.where(found, rows, -1)
+
+    def lookup(self, team_ids, dates):
+        """team_stats.csv columns for every (team, date) pair, entering that date; NaN where a team has no history."""
+        days = _days(dates)
+        rows = self.rows(team_ids, days)
+        season = days.astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970
+        stats = state_columns(self.log, self.recent_days, np.maximum(rows, 0), days, season)
+        missing = rows < 0
+        return {col: np.where(missing, np.nan, values) for col, values in stats.items()}
+
+    def win_bits(self, team_ids, dates):
+        """Each team's last-10 results as a bit field (newest in bit 0) entering each date; 0 without history."""
+        rows = self.rows(team_ids, _days(dates))
+        return np.where(rows >= 0, self.log['win_bits'][np.maximum(rows, 0)], 0).astype(np.uint16)
+
+    def matchup_feature_matrix(self, home_ids, away_ids, dates, temp, wind_speed):
+        """FEATURES matrix for games scored with both teams' stats as of each game's date."""
+        return snapshot_feature_matrix(self.lookup(home_ids, dates), self.lookup(away_ids, dates), temp, wind_speed)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    store = FeatureStore.load()
+    print(f"{len(store.key):,} snapshots for {len(store.team_ids)} teams ready in {time.perf_counter() - start:.2f}s")
+
+    rng = np.random.default_rng(0)
+    n = 2_000_000
+    teams = rng.choice(store.team_ids, n)
+    days = rng.integers(store.log['day'].min(), store.log['day'].max() + 1, n)
+    start = time.perf_counter()
+    store.lookup(teams, days.astype('datetime64[D]'))
+    print(f"{n:,} as-of lookups in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,163 @@
+"""
+Shared feature pipeline for the game-outcome models.
+
+FEATURES is the column-order contract the models were trained on. Training (a frame of mined games) and scoring
+(home/away team ids plus weather, looked up in team_stats.csv) both build the same contiguous float32 matrix in one
+vectorized pass. Differences are taken in the source dtype and stored as float32, which is what the tree models use
+internally, so predictions match the old per-script code exactly.
+"""
+
+import numpy as np
+import pandas as pd
+
+FEATURES = [
+    'temp', 'wind_speed', 'diff_run_diff', 'diff_ops',
+    'diff_whip', 'diff_wins_last_10', 'diff_games_last_7', 'park_factor'
+]
+
+# diff feature -> (home column, away column) in the games dataset
+GAME_DIFFS = {
+    'diff_wins_last_5': ('home_wins_last_5', 'away_wins_last_5'),
+    'diff_run_diff': ('home_run_diff', 'away_run_diff'),  # difference in run differentials
+    'diff_avg': ('home_avg', 'away_avg'),  # difference in batting average
+    'diff_ops': ('home_ops', 'away_ops'),  # difference in OPS
+    'diff_era': ('home_starter_era', 'away_starter_era'),  # difference in starter ERA
+    'diff_whip': ('home_starter_whip', 'away_starter_whip'),  # difference in starter WHIP
+    'diff_rest': ('home_rest', 'away_rest'),  # difference in rest days
+    'diff_games_last_7': ('home_games_last_7', 'away_games_last_7'),  # difference in games in last 7 days
+    'diff_win_pct': ('home_win_pct', 'away_win_pct'),  # difference in win percentage
+    'diff_wins_last_10': ('home_wins_last_10', 'away_wins_last_10'),
+}
+
+# diff feature -> team_stats.csv column
+TEAM_STAT_DIFFS = {
+    'diff_run_diff': 'run_diff',
+    'diff_ops': 'ops',
+    'diff_whip': 'whip',
+    'diff_wins_last_10': 'wins_last_10',
+    'diff_games_last_7': 'games_last_7',
+}
+
+NEUTRAL_PARK_FACTOR = 100
+
+
+def check_feature_order(model):
+    """Raises ValueError if a fitted model expects a different feature order than FEATURES."""
+    names = getattr(model, 'feature_names_in_', None)
+    if names is not None and list(names) != FEATURES:
+        raise ValueError(f"Model was trained on {list(names)}, expected {FEATURES}")
+
+
+def predict_home_win(model, X):
+    """Home-win probabilities for a FEATURES-ordered matrix."""
+    return model.predict_proba(pd.DataFrame(X, columns=FEATURES, copy=False))[:, 1]
+
+
+def feature_response(model, X, feature, values):
+    """
+    (n x len(values)) home-win probabilities of every row of X with `feature` set to each of `values` in turn,
+    scored in one predict call.
+    """
+    j = FEATURES.index(feature)
+    values = np.asarray(values)
+    grid = np.repeat(X[:, None, :], len(values), axis=1)
+    grid[:, :, j] = values
+    return predict_home_win(model, grid.reshape(-1, len(FEATURES))).reshape(len(X), len(values))
+
+
+# --- TRAINING: MINED GAMES ---
+
+def park_factors_for(venue_ids, park_factors):
+    """Park factor per venue, normalized to be centered around 1.0; unknown venues are neutral."""
+    lookup = pd.Series(park_factors['park_factor'].to_numpy(), index=park_factors['venue_id'].astype('int64'))
+    values = pd.Series(np.asarray(venue_ids, dtype='int64')).map(lookup).fillna(NEUTRAL_PARK_FACTOR)
+    return values.to_numpy() / 100
+
+
+def add_game_features(df, park_factors):
+    """Adds park_factor and every diff_* column to a frame of mined games (the Modeling notebook's prep)."""
+    df['park_factor'] = park_factors_for(df['venue_id'], park_factors)
+
+    # ensure "last 7" can't be greater than 7
+    df['home_games_last_7'] = df['home_games_last_7'].clip(upper=7)
+    df['away_games_last_7'] = df['away_games_last_7'].clip(upper=7)
+
+    for feature, (home_col, away_col) in GAME_DIFFS.items():
+        df[feature] = df[home_col] - df[away_col]
+    return df
+
+
+def game_feature_matrix(df, park_factors=None):
+    """
+    (n_games x len(FEATURES)) float32 matrix from a frame of mined games. Uses df['park_factor'] when present,
+    otherwise looks venues up in park_factors.
+    """
+    X = np.empty((len(df), len(FEATURES)), dtype=np.float32)
+    for j, feature in enumerate(FEATURES):
+        if feature == 'park_factor':
+            X[:, j] = df['park_factor'] if 'park_factor' in df else park_factors_for(df['venue_id'], park_factors)
+        elif feature in GAME_DIFFS:
+            home_col, away_col = GAME_DIFFS[feature]
+            home, away = df[home_col].to_numpy(), df[away_col].to_numpy()
+            if feature == 'diff_games_last_7':
+                home, away = np.minimum(home, 7), np.minimum(away, 7)
+            X[:, j] = home - away
+        else:
+            X[:, j] = df[feature]
+    return X
+
+
+# --- SCORING: TEAM SNAPSHOTS ---
+
+class TeamTable:
+    """team_stats.csv as NumPy columns with an O(1) team id -> row index."""
+
+    def __init__(self, team_stats):
+        ids = team_stats['team_name'].to_numpy().astype(np.int64)
+        self.team_ids = ids
+        self.row_of = np.full(ids.max() + 1, -1, dtype=np.int64)
+        self.row_of[ids] = np.arange(len(ids))
+        self.columns = {col: team_stats[col].to_numpy() for col in team_stats.columns if col != 'team_name'}
+
+    def rows(self, team_ids):
+        ids = np.asarray(team_ids, dtype=np.int64)
+        known = (ids >= 0) & (ids < len(self.row_of))  # a negative id would wrap around the index
+        rows = np.full(ids.shape, -1, dtype=np.int64)
+        rows[known] = self.row_of[ids[known]]
+        if (rows < 0).any():
+            raise KeyError(f"Teams missing from team stats: {np.asarray(team_ids)[rows < 0]}")
+        return rows
+
+    def row(self, team_id):
+        """One team's stats as a dict."""
+        i = self.rows([team_id])[0]
+        return {col: values[i] for col, values in self.columns.items()}
+
+
+def snapshot_feature_matrix(home, away, temp, wind_speed):
+    """
+    (n x len(FEATURES)) float32 matrix from home/away team snapshots: mappings of team_stats.csv columns to arrays
+    aligned with the games. temp/wind may be scalars.
+    """
+    n = len(home['park_factor'])
+    X = np.empty((n, len(FEATURES)), dtype=np.float32)
+    for j, feature in enumerate(FEATURES):
+        if feature == 'temp':
+            X[:, j] = temp
+        elif feature == 'wind_speed':
+            X[:, j] = wind_speed
+        elif feature == 'park_factor':
+            X[:, j] = home['park_factor']
+        else:
+            col = TEAM_STAT_DIFFS[feature]
+            X[:, j] = home[col] - away[col]
+    return X
+
+
+def matchup_feature_matrix(home_ids, away_ids, temp, wind_speed, teams):
+    """(n x len(FEATURES)) float32 matrix for matchups scored from a TeamTable; temp/wind may be scalars."""
+    h = teams.rows(home_ids)
+    a = teams.rows(away_ids)
+    home = {col: values[h] for col, values in teams.columns.items()}
+    away = {col: values[a] for col, values in teams.columns.items()}
+    return snapshot_feature_matrix(home, away, temp, wind_speed)
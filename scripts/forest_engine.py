@@ -0,0 +1,204 @@
+"""
+Flattened random-forest inference in plain NumPy.
+
+flatten_forest() turns every tree of a fitted RandomForestClassifier into contiguous node arrays (split feature,
+threshold, children, missing-value direction and leaf probability, one shared node space for all trees);
+model_artifact.py saves them to disk.
+
+FlatForest scores a whole batch against all trees at once without walking them node by node. compile_tables() turns
+the node arrays into, per feature, the sorted split thresholds and a prefix-AND table of leaf bitmasks: a split that
+sends a row right rules out every leaf of its left subtree, and a row sends right exactly the splits whose threshold
+is below its value, i.e. a prefix of the sorted thresholds found with searchsorted. ANDing the prefixes of all
+features leaves, in each tree, the exit leaf as the lowest set bit. Scoring is therefore a few searchsorted calls and
+(rows x trees) integer ops, with no per-tree Python dispatch, which is where sklearn's small-batch latency goes.
+
+It follows sklearn's decision rule exactly (float32 inputs, `x <= threshold` goes left, NaN follows the learned
+direction), so probabilities match predict_proba to float rounding. It exposes predict_proba, feature_names_in_ and
+classes_, so it can stand in for the fitted model anywhere in the scripts.
+"""
+
+import numpy as np
+
+# --- CONFIGURATION ---
+CHUNK_ROWS = 2048  # rows scored at once; keeps the (rows x trees) masks cache-sized
+
+# 2**k % m is distinct for every bit k < the mask width, so `lowest_bit % m` indexes a small per-tree leaf table
+MASK_TYPES = [(32, np.uint32, 37), (64, np.uint64, 67)]
+
+
+def flatten_forest(model):
+    """Concatenates the trees of a fitted binary RandomForestClassifier into one node space."""
+    if model.n_outputs_ != 1 or len(model.classes_) != 2:
+        raise ValueError("Only single-output binary classifiers can be flattened")
+
+    feature, threshold, left, right, missing_left, value, roots = [], [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        leaf = tree.children_left < 0
+        feature.append(np.where(leaf, -1, tree.feature))
+        threshold.append(np.where(leaf, np.nan, tree.threshold))
+        left.append(np.where(leaf, -1, tree.children_left + offset))
+        right.append(np.where(leaf, -1, tree.children_right + offset))
+        missing = getattr(tree, 'missing_go_to_left', None)
+        missing_left.append(np.zeros(tree.node_count, dtype=bool) if missing is None else missing.astype(bool))
+        proba = tree.value[:, 0, :]
+        value.append(proba[:, 1] / proba.sum(axis=1))
+        roots.append(offset)
+        offset += tree.node_count
+
+    return FlatForest(
+        feature=np.concatenate(feature).astype(np.int32),
+        threshold=np.concatenate(threshold).astype(np.float64),
+        left=np.concatenate(left).astype(np.int32),
+        right=np.concatenate(right).astype(np.int32),
+        missing_left=np.concatenate(missing_left),
+        value=np.concatenate(value).astype(np.float64),
+        roots=np.asarray(roots, dtype=np.int32),
+        n_features=model.n_features_in_,
+        classes=model.classes_,
+        feature_names=getattr(model, 'feature_names_in_', None),
+    )
+
+
+def _leaf_masks(root, left, right):
+    """
+    For one tree: the in-order position of every leaf, and for every internal node the bitmask of the leaves in its
+    left subtree.
+    """
+    leaf_pos, left_mask, span = {}, {}, {}
+    stack = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        if left[node] < 0:
+            leaf_pos[node] = len(leaf_pos)
+            span[node] = (leaf_pos[node], leaf_pos[node] + 1)
+        elif not visited:
+            # children are pushed right-first so leaves are numbered left to right
+            stack += [(node, True), (right[node], False), (left[node], False)]
+        else:
+            lo, mid = span[left[node]]
+            span[node] = (lo, span[right[node]][1])
+            left_mask[node] = ((1 << (mid - lo)) - 1) << lo
+    return leaf_pos, left_mask
+
+
+def compile_tables(feature, threshold, left, right, missing_left, value, roots, n_features):
+    """
+    The lookup tables FlatForest scores with, as flat arrays (so they can be saved and memory-mapped too):
+    leaf_table (trees x modulus), split_thresholds/prefix_masks concatenated over features with their offsets,
+    and nan_masks (features x trees).
+    """
+    n_trees = len(roots)
+    trees = [_leaf_masks(root, left, right) for root in roots]
+    max_leaves = max(len(leaf_pos) for leaf_pos, _ in trees)
+    for width, dtype, modulus in MASK_TYPES:
+        if max_leaves <= width:
+            break
+    else:
+        raise ValueError(f"Trees with {max_leaves} leaves do not fit a 64-bit leaf mask (use max_depth <= 6)")
+    all_leaves = np.iinfo(dtype).max
+
+    # leaf probability by tree and (lowest set bit % modulus)
+    leaf_table = np.zeros((n_trees, modulus))
+    tree_of, masks = {}, {}
+    for t, (leaf_pos, left_mask) in enumerate(trees):
+        for node, pos in leaf_pos.items():
+            leaf_table[t, (1 << pos) % modulus] = value[node]
+        for node, mask in left_mask.items():
+            tree_of[node] = t
+            masks[node] = all_leaves ^ mask
+
+    # per feature: sorted thresholds, prefix-AND of their masks, and the mask applied to NaN
+    thresholds, prefix_masks = [], []
+    nan_masks = np.full((n_features, n_trees), all_leaves, dtype=dtype)
+    internal = np.flatnonzero(feature >= 0)
+    for f in range(n_features):
+        nodes = internal[feature[internal] == f]
+        nodes = nodes[np.argsort(threshold[nodes], kind='stable')]
+        table = np.full((len(nodes) + 1, n_trees), all_leaves, dtype=dtype)
+        for k, node in enumerate(nodes):
+            table[k + 1, tree_of[node]] = masks[node]
+        thresholds.append(threshold[nodes])
+        prefix_masks.append(np.bitwise_and.accumulate(table, axis=0))
+        for node in nodes[~missing_left[nodes]]:
+            nan_masks[f, tree_of[node]] &= masks[node]
+
+    return {
+        'leaf_table': leaf_table,
+        'split_thresholds': np.concatenate(thresholds),
+        'split_offsets': np.r_[0, np.cumsum([len(t) for t in thresholds])].astype(np.int64),
+        'prefix_masks': np.concatenate(prefix_masks),
+        'prefix_offsets': np.r_[0, np.cumsum([len(m) for m in prefix_masks])].astype(np.int64),
+        'nan_masks': nan_masks,
+    }
+
+
+class FlatForest:
+    """
+    A flattened forest; predict_proba matches the RandomForestClassifier it came from. Pass `tables` (from
+    compile_tables, e.g. memory-mapped from a model artifact) to skip compiling them.
+    """
+
+    ARRAYS = ['feature', 'threshold', 'left', 'right', 'missing_left', 'value', 'roots', 'classes']
+    TABLES = ['leaf_table', 'split_thresholds', 'split_offsets', 'prefix_masks', 'prefix_offsets', 'nan_masks']
+
+    def __init__(self, feature, threshold, left, right, missing_left, value, roots, n_features, classes,
+                 feature_names=None, tables=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.n_features_in_ = int(n_features)
+        self.classes_ = np.asarray(classes)
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+        if tables is None:
+            tables = compile_tables(feature, threshold, left, right, missing_left, value, roots, n_features)
+        self.tables = tables
+        n_trees, modulus = tables['leaf_table'].shape
+        self._modulus = tables['prefix_masks'].dtype.type(modulus)
+        self._leaf_value = tables['leaf_table'].reshape(-1)
+        self._tree_base = np.arange(n_trees) * modulus
+        so, po = tables['split_offsets'], tables['prefix_offsets']
+        self._thresholds = [tables['split_thresholds'][so[f]:so[f + 1]] for f in range(self.n_features_in_)]
+        self._prefix_masks = [tables['prefix_masks'][po[f]:po[f + 1]] for f in range(self.n_features_in_)]
+        self._nan_masks = tables['nan_masks']
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def arrays(self):
+        """Every node array and lookup table by name."""
+        nodes = {name: getattr(self, 'classes_' if name == 'classes' else name) for name in self.ARRAYS}
+        return dict(nodes, **self.tables)
+
+    def _tree_values(self, X):
+        """(rows x trees) leaf probabilities for a float64 matrix."""
+        mask = None
+        for f in range(self.n_features_in_):
+            x = X[:, f]
+            m = self._prefix_masks[f][np.searchsorted(self._thresholds[f], x, side='left')]
+            nan = np.isnan(x)
+            if nan.any():
+                m[nan] = self._nan_masks[f]
+            mask = m if mask is None else np.bitwise_and(mask, m, out=mask)
+        lowest = mask & (0 - mask)
+        return self._leaf_value[self._tree_base + (lowest % self._modulus).astype(np.intp)]
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected a (n, {self.n_features_in_}) matrix, got {X.shape}")
+
+        p1 = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS].astype(np.float64)
+            p1[start:start + CHUNK_ROWS] = self._tree_values(chunk).sum(axis=1)
+        p1 /= self.n_estimators
+        return np.column_stack([1 - p1, p1])
@@ -0,0 +1,171 @@
+"""
+Precomputed home-win probabilities for every input the app can produce.
+
+The app's inputs are discrete: an ordered pair of teams, a whole-degree temperature and a whole-mph wind speed.
+`python matchup_table.py` scores that entire grid in one batched pass and saves it as a
+(home, away, temp, wind) float32 (or float16) .npy array, with a JSON manifest holding the axes and the sha256 of the
+team stats file and model artifact it was built from. MatchupTable memory-maps the array and answers lookups by index,
+so no model code runs per request. A table whose hashes or axes no longer match its inputs, or that fails to load, is
+stale and gets rebuilt.
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import TeamTable, check_feature_order, matchup_feature_matrix, predict_home_win
+from model_artifact import file_sha256, load_model, model_sha256
+
+# --- CONFIGURATION ---
+MODEL_FILE = "../data/models/random_forest"
+TEAM_STATS_FILE = "../data/team_stats.csv"
+TABLE_FILE = "../data/matchup_table.npy"
+TEMPS = range(40, 101)  # the app's slider ranges, inclusive
+WINDS = range(0, 31)
+DTYPE = 'float32'
+
+
+def manifest_path(table_file):
+    return os.path.splitext(table_file)[0] + '.json'
+
+
+def build_table(model, team_stats, temps=TEMPS, winds=WINDS, dtype=DTYPE):
+    """
+    Scores every ordered team pair over the weather grid with one predict_proba call.
+    Returns (table, team_ids); table[h, a, t, w] is the home-win probability, NaN where h == a.
+    """
+    check_feature_order(model)
+    teams = TeamTable(team_stats)
+    team_ids = np.sort(teams.team_ids)
+    temps, winds = np.asarray(temps), np.asarray(winds)
+    n, n_temp, n_wind = len(team_ids), len(temps), len(winds)
+
+    # grid in C order of the final table, minus the diagonal
+    h, a, t, w = np.meshgrid(np.arange(n), np.arange(n), np.arange(n_temp), np.arange(n_wind), indexing='ij')
+    keep = (h != a).ravel()
+    h, a, t, w = (x.ravel()[keep] for x in (h, a, t, w))
+
+    X = matchup_feature_matrix(team_ids[h], team_ids[a], temps[t], winds[w], teams)
+    table = np.full(n * n * n_temp * n_wind, np.nan, dtype=dtype)
+    table[keep] = predict_home_win(model, X)
+    return table.reshape(n, n, n_temp, n_wind), team_ids
+
+
+def axis_spec(values):
+    """[start, step] of an evenly spaced axis; lookups are arithmetic, not searches."""
+    return [int(values[0]), int(values[1] - values[0])]
+
+
+def save_table(table, team_ids, manifest, table_file=TABLE_FILE):
+    """
+    Writes the array and its manifest. The old manifest is removed before the array is replaced and the new one goes
+    last, so a rebuild cut short leaves a table without a manifest, never an array paired with the wrong manifest.
+    """
+    tmp = table_file + '.tmp.npy'
+    np.save(tmp, table)
+    if os.path.exists(manifest_path(table_file)):
+        os.remove(manifest_path(table_file))
+    os.replace(tmp, table_file)
+    manifest = dict(manifest, team_ids=[int(i) for i in team_ids], shape=list(table.shape), dtype=str(table.dtype))
+    with open(manifest_path(table_file) + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path(table_file) + '.tmp', manifest_path(table_file))
+
+
+def source_hashes(model_file=MODEL_FILE, team_stats_file=TEAM_STATS_FILE):
+    return {'model_sha256': model_sha256(model_file), 'team_stats_sha256': file_sha256(team_stats_file)}
+
+
+class MatchupTable:
+    """Memory-mapped matchup table with O(1) lookups by team id, temperature and wind speed."""
+
+    def __init__(self, table_file=TABLE_FILE):
+        with open(manifest_path(table_file)) as f:
+            self.manifest = json.load(f)
+        self.table = np.load(table_file, mmap_mode='r')
+        if list(self.table.shape) != self.manifest['shape']:
+            raise ValueError(f"{table_file} does not match its manifest")
+
+        ids = np.asarray(self.manifest['team_ids'], dtype=np.int64)
+        self.team_ids = ids
+        self.index_of = np.full(ids.max() + 1, -1, dtype=np.int64)
+        self.index_of[ids] = np.arange(len(ids))
+        self.temp_start, self.temp_step = self.manifest['temps'][0], self.manifest['temps'][1]
+        self.wind_start, self.wind_step = self.manifest['winds'][0], self.manifest['winds'][1]
+
+    def is_current(self, hashes, temps=TEMPS, winds=WINDS, dtype=DTYPE):
+        """Built from these inputs, over these axes, in this dtype."""
+        return (all(self.manifest.get(k) == v for k, v in hashes.items())
+                and self.manifest['temps'] == axis_spec(temps) and self.manifest['winds'] == axis_spec(winds)
+                and self.table.shape[2:] == (len(temps), len(winds)) and self.table.dtype == np.dtype(dtype))
+
+    def _teams(self, ids):
+        """Dense indexes of team ids, -1 for unknown ones (a negative id would wrap around index_of)."""
+        known = (ids >= 0) & (ids < len(self.index_of))
+        idx = np.full(ids.shape, -1, dtype=np.int64)
+        idx[known] = self.index_of[ids[known]]
+        return idx
+
+    def _axis(self, values, start, step, size, name):
+        idx, rem = np.divmod(np.asarray(values, dtype=np.int64) - start, step)
+        if (rem != 0).any() or (idx < 0).any() or (idx >= size).any():
+            raise KeyError(f"{name} outside the precomputed grid: {values}")
+        return idx
+
+    def lookup(self, home_ids, away_ids, temp, wind_speed):
+        """Home-win probabilities for arrays of matchups (temp/wind may be scalars); no model code runs."""
+        home_ids, away_ids = np.asarray(home_ids, dtype=np.int64), np.asarray(away_ids, dtype=np.int64)
+        h, a = self._teams(home_ids), self._teams(away_ids)
+        if (h < 0).any() or (a < 0).any() or (h == a).any():
+            raise KeyError(f"Matchups outside the precomputed table: {home_ids}, {away_ids}")
+        _, _, n_temp, n_wind = self.table.shape
+        t = self._axis(temp, self.temp_start, self.temp_step, n_temp, 'Temperature')
+        w = self._axis(wind_speed, self.wind_start, self.wind_step, n_wind, 'Wind speed')
+        return self.table[h, a, t, w].astype(np.float64)
+
+    def probability(self, home_id, away_id, temp, wind_speed):
+        return float(self.lookup([home_id], [away_id], temp, wind_speed)[0])
+
+
+def ensure_table(model_file=MODEL_FILE, team_stats_file=TEAM_STATS_FILE, table_file=TABLE_FILE,
+                 temps=TEMPS, winds=WINDS, dtype=DTYPE, model=None):
+    """Returns a current MatchupTable, rebuilding it first if it is missing or its inputs changed."""
+    hashes = source_hashes(model_file, team_stats_file)
+    if os.path.exists(table_file) and os.path.exists(manifest_path(table_file)):
+        try:
+            table = MatchupTable(table_file)
+            if table.is_current(hashes, temps, winds, dtype):
+                return table
+        except (OSError, ValueError, KeyError) as e:
+            # e.g. an array from an interrupted rebuild next to an older manifest: stale, not fatal
+            print(f"{table_file} failed to load ({e}), rebuilding")
+
+    model = model if model is not None else load_model(model_file)
+    values, team_ids = build_table(model, pd.read_csv(team_stats_file), temps, winds, dtype)
+    manifest = dict(hashes, temps=axis_spec(temps), winds=axis_spec(winds))
+    save_table(values, team_ids, manifest, table_file)
+    return MatchupTable(table_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the app's matchup probability table.")
+    parser.add_argument('--model', default=MODEL_FILE)
+    parser.add_argument('--team-stats', default=TEAM_STATS_FILE)
+    parser.add_argument('--out', default=TABLE_FILE)
+    parser.add_argument('--dtype', choices=['float32', 'float16'], default=DTYPE)
+    parser.add_argument('--force', action='store_true', help="rebuild even if the table is current")
+    args = parser.parse_args()
+
+    if args.force:
+        for path in (args.out, manifest_path(args.out)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    start = time.perf_counter()
+    table = ensure_table(args.model, args.team_stats, args.out, dtype=args.dtype)
+    print(f"{args.out}: {table.table.shape} {table.table.dtype}, {table.table.nbytes / 1e6:.1f} MB "
+          f"(ready in {time.perf_counter() - start:.2f}s)")
@@ -2,158 +2,46 @@
 MLB Data Miner for Machine Learning (2015-2025)
 """
 
+import argparse
+import os
+import pickle
 import statsapi
 import pandas as pd
 import time
 from datetime import datetime, timedelta
 
+from boxscore_fetcher import iter_boxscores
+from pitcher_log import LAST_N_STARTS, PitcherLog, pitching_lines
+from response_cache import CACHE_FILE, ResponseCache
+from team_tracker import TeamTracker
+
 # --- CONFIGURATION ---
 START_YEAR = 2015
 END_YEAR = 2025
 OUTPUT_FILE = "../data/mlb_2015_2025_dataset2.csv"
-
-
-# --- HELPER CLASSES ---
-
-class TeamTracker:
-    def __init__(self):
-        self.games_played = 0
-        self.wins = 0
-        self.runs_scored = 0
-        self.runs_allowed = 0
-        self.hits = 0
-        self.at_bats = 0
-        self.walks = 0
-        self.total_bases = 0
-        self.strikeouts = 0
-        self.last_game_date = None
-        self.recent_games = []  # Tracks dates for fatigue
-        self.recent_results = []  # Tracks Wins (True/False) for momentum
-
-    def update_stats(self, bat_stats, runs_scored, runs_allowed, game_date, win):
-        self.games_played += 1
-        self.runs_scored += runs_scored
-        self.runs_allowed += runs_allowed
-        if win: self.wins += 1
-
-        # Safe Stat Extraction
-        def get_stat(key):
-            try:
-                return int(bat_stats.get(key, 0) or 0)
-            except:
-                return 0
-
-        self.hits += get_stat('hits')
-        self.at_bats += get_stat('atBats')
-        self.walks += get_stat('baseOnBalls')
-        self.strikeouts += get_stat('strikeOuts')
-
-        h = get_stat('hits')
-        d = get_stat('doubles')
-        t = get_stat('triples')
-        hr = get_stat('homeRuns')
-        singles = h - (d + t + hr)
-        self.total_bases += singles + (2 * d) + (3 * t) + (4 * hr)
-
-        # Update History
-        self.last_game_date = game_date
-
-        # 1. Fatigue History (Dates)
-        self.recent_games.append(game_date)
-        self.recent_games = self.recent_games[-10:]
-
-        # 2. Momentum History (Wins)
-        self.recent_results.append(1 if win else 0)
-        self.recent_results = self.recent_results[-10:]  # Keep last 10 games
-
-    def get_features(self):
-        if self.at_bats == 0:
-            avg = 0.0
-            slg = 0.0
-        else:
-            avg = self.hits / self.at_bats
-            slg = self.total_bases / self.at_bats
-
-        obp_denom = self.at_bats + self.walks
-        obp = (self.hits + self.walks) / obp_denom if obp_denom > 0 else 0.0
-        ops = obp + slg
-        win_pct = self.wins / self.games_played if self.games_played > 0 else 0.0
-
-        return {
-            'win_pct': round(win_pct, 3),
-            'avg': round(avg, 3),
-            'ops': round(ops, 3),
-            'run_diff': round((self.runs_scored - self.runs_allowed) / max(1, self.games_played), 2)
-        }
-
-    def get_momentum(self):
-        """Returns wins in last 5 and last 10 games"""
-        # Sum the 1s in the recent_results list
-        wins_10 = sum(self.recent_results)
-        wins_5 = sum(self.recent_results[-5:])  # Last 5 only
-
-        return {
-            'wins_last_10': wins_10,
-            'wins_last_5': wins_5
-        }
-
-    def get_recent_fatigue(self, current_date_obj):
-        if not self.recent_games: return 0
-        count = 0
-        for d_str in self.recent_games:
-            try:
-                d = datetime.strptime(d_str, "%Y-%m-%d")
-                if 0 < (current_date_obj - d).days <= 7:
-                    count += 1
-            except:
-                continue
-        return count
-
-
-class PitcherTracker:
-    def __init__(self):
-        self.innings_pitched = 0.0
-        self.earned_runs = 0
-        self.walks = 0
-        self.hits = 0
-
-    def update_stats(self, p_stats):
-        try:
-            ip_raw = str(p_stats.get('inningsPitched', '0'))
-            if '.' in ip_raw:
-                whole, part = ip_raw.split('.')
-                ip = int(whole) + (int(part) * 0.333)
-            else:
-                ip = float(ip_raw)
-
-            self.innings_pitched += ip
-            self.earned_runs += int(p_stats.get('earnedRuns', 0) or 0)
-            self.walks += int(p_stats.get('baseOnBalls', 0) or 0)
-            self.hits += int(p_stats.get('hits', 0) or 0)
-        except:
-            pass
-
-    def get_career_features(self):
-        if self.innings_pitched == 0:
-            return {'era': 4.50, 'whip': 1.35}
-        era = 9 * (self.earned_runs / self.innings_pitched)
-        whip = (self.walks + self.hits) / self.innings_pitched
-        return {'era': round(era, 2), 'whip': round(whip, 2)}
+FETCH_WORKERS = 8  # concurrent boxscore requests
+REQUESTS_PER_SECOND = 10.0  # shared rate limit across fetch workers
+PARTITION_DIR = "../data/mined"  # incremental builds: one CSV partition + checkpoint per season
+CHECKPOINT_EVERY = 100  # games between checkpoints
+CHECKPOINT_VERSION = 1
 
 
 # --- EXTRACTORS ---
 
-def get_days_rest(last_date_str, current_date_str):
-    if not last_date_str: return 5
-    try:
-        d1 = datetime.strptime(last_date_str, "%Y-%m-%d")
-        d2 = datetime.strptime(current_date_str, "%Y-%m-%d")
-        return max(0, (d2 - d1).days - 1)
-    except:
-        return 0
+def fetch_schedule_chunk(s_str, e_str):
+    retry = 0
+    chunk = None
+    while retry < 3 and chunk is None:
+        try:
+            chunk = statsapi.schedule(start_date=s_str, end_date=e_str, sportId=1)
+        except:
+            retry += 1
+            time.sleep(1 * retry)
+    time.sleep(0.1)
+    return chunk
 
 
-def get_schedule_chunked(year):
+def get_schedule_chunked(year, cache=None):
     all_games = []
     current_date = datetime(year, 3, 20)
     end_date = datetime(year, 11, 5)
@@ -164,18 +52,13 @@ def get_schedule_chunked(year):
         s_str = current_date.strftime("%m/%d/%Y")
         e_str = next_date.strftime("%m/%d/%Y")
 
-        retry = 0
-        chunk = None
-        while retry < 3 and chunk is None:
-            try:
-                chunk = statsapi.schedule(start_date=s_str, end_date=e_str, sportId=1)
-            except:
-                retry += 1
-                time.sleep(1 * retry)
+        if cache is not None:
+            chunk = cache.schedule(s_str, e_str, lambda: fetch_schedule_chunk(s_str, e_str))
+        else:
+            chunk = fetch_schedule_chunk(s_str, e_str)
 
         if chunk: all_games.extend(chunk)
         current_date = next_date
-        time.sleep(0.1)
 
     unique_games = {g['game_id']: g for g in all_games}
     return list(unique_games.values())
@@ -196,163 +79,155 @@ def extract_weather_and_venue(box):
     return data
 
 
-def find_pitcher_stats_in_box(box_players, probable_id):
-    p_key = f"ID{probable_id}"
-    if p_key in box_players:
-        return box_players[p_key].get('stats', {}).get('pitching', {})
+# --- MAIN ---
 
-    for pid, p_data in box_players.items():
-        try:
-            stats = p_data.get('stats', {}).get('pitching', {})
-            if stats and 'inningsPitched' in stats:
-                return stats
-        except:
-            continue
-    return {}
+def get_season_schedule(year, cache=None):
+    """Final regular/postseason games of a season, in date order."""
+    schedule = get_schedule_chunked(year, cache)
+    schedule.sort(key=lambda x: x['game_date'])
 
+    valid_types = ['R', 'F', 'D', 'L', 'W']
+    return [g for g in schedule if g.get('game_type') in valid_types and g['status'] == 'Final']
 
-# --- MAIN ---
 
-def scrape_mlb_data():
-    all_rows = []
+def process_game(game, box, year, team_history, pitcher_history):
+    """
+    Builds the pre-game feature row for one final game, then applies its result to the trackers.
+    Returns None when the boxscore is missing.
+    """
+    game_id = game['game_id']
+    home_id = game['home_id']
+    away_id = game['away_id']
+    game_date = game['game_date']
 
-    for year in range(START_YEAR, END_YEAR + 1):
-        print(f"\n=== PROCESSING {year} ===")
-        team_history = {}
-        pitcher_history = {}
+    # --- 1. PRE-GAME FEATURES ---
 
-        schedule = get_schedule_chunked(year)
-        schedule.sort(key=lambda x: x['game_date'])
+    h_feats = team_history.get_features(home_id)
+    a_feats = team_history.get_features(away_id)
 
-        valid_types = ['R', 'F', 'D', 'L', 'W']
-        schedule = [g for g in schedule if g.get('game_type') in valid_types]
-        print(f"Games to Process: {len(schedule)}")
+    # MOMENTUM (New!)
+    h_mom = team_history.get_momentum(home_id)
+    a_mom = team_history.get_momentum(away_id)
 
-        for i, game in enumerate(schedule):
-            if game['status'] != 'Final': continue
-
-            game_id = game['game_id']
-            home_id = game['home_id']
-            away_id = game['away_id']
-            game_date = game['game_date']
-
-            if home_id not in team_history: team_history[home_id] = TeamTracker()
-            if away_id not in team_history: team_history[away_id] = TeamTracker()
-
-            # --- 1. PRE-GAME FEATURES ---
-
-            h_feats = team_history[home_id].get_features()
-            a_feats = team_history[away_id].get_features()
-
-            # MOMENTUM (New!)
-            h_mom = team_history[home_id].get_momentum()
-            a_mom = team_history[away_id].get_momentum()
-
-            curr_date_obj = datetime.strptime(game_date, "%Y-%m-%d")
-            h_rest = get_days_rest(team_history[home_id].last_game_date, game_date)
-            a_rest = get_days_rest(team_history[away_id].last_game_date, game_date)
-            h_fatigue = team_history[home_id].get_recent_fatigue(curr_date_obj)
-            a_fatigue = team_history[away_id].get_recent_fatigue(curr_date_obj)
-
-            retry = 0
-            box = None
-            while retry < 5 and box is None:
-                try:
-                    box = statsapi.get("game", {"gamePk": game_id})
-                except:
-                    retry += 1
-                    time.sleep(0.5 * retry)
-
-            if not box: continue
-
-            try:
-                h_prob = box['gameData']['probablePitchers']['home']['id']
-                a_prob = box['gameData']['probablePitchers']['away']['id']
-            except:
-                h_prob, a_prob = None, None
-
-            h_p_stats = pitcher_history.get(h_prob, PitcherTracker()).get_career_features()
-            a_p_stats = pitcher_history.get(a_prob, PitcherTracker()).get_career_features()
-
-            env = extract_weather_and_venue(box)
-
-            # --- RECORD ROW ---
-            row = {
-                "game_id": game_id,
-                "year": year,
-                "date": game_date,
-                "home_team": home_id,
-                "away_team": away_id,
-                "venue_id": env['venue_id'],
-
-                # Conditions
-                "temp": env['temp'],
-                "wind_speed": env['wind_speed'],
-                "condition": env['condition'],
-
-                # Fatigue/Rest
-                "home_rest": h_rest,
-                "away_rest": a_rest,
-                "home_games_last_7": h_fatigue,
-                "away_games_last_7": a_fatigue,
-
-                # Momentum (New Columns)
-                "home_wins_last_5": h_mom['wins_last_5'],
-                "home_wins_last_10": h_mom['wins_last_10'],
-                "away_wins_last_5": a_mom['wins_last_5'],
-                "away_wins_last_10": a_mom['wins_last_10'],
-
-                # Team Stats
-                "home_win_pct": h_feats['win_pct'],
-                "home_ops": h_feats['ops'],
-                "home_avg": h_feats['avg'],
-                "home_run_diff": h_feats['run_diff'],
-                "away_win_pct": a_feats['win_pct'],
-                "away_ops": a_feats['ops'],
-                "away_avg": a_feats['avg'],
-                "away_run_diff": a_feats['run_diff'],
-
-                # Pitching
-                "home_starter_era": h_p_stats['era'],
-                "home_starter_whip": h_p_stats['whip'],
-                "away_starter_era": a_p_stats['era'],
-                "away_starter_whip": a_p_stats['whip'],
-
-                # Targets
-                "home_score": game['home_score'],
-                "away_score": game['away_score'],
-                "home_win": 1 if game['home_score'] > game['away_score'] else 0
-            }
-            all_rows.append(row)
+    h_rest = team_history.get_days_rest(home_id, game_date)
+    a_rest = team_history.get_days_rest(away_id, game_date)
+    h_fatigue = team_history.get_recent_fatigue(home_id, game_date)
+    a_fatigue = team_history.get_recent_fatigue(away_id, game_date)
+
+    if not box: return None
+
+    try:
+        h_prob = box['gameData']['probablePitchers']['home']['id']
+        a_prob = box['gameData']['probablePitchers']['away']['id']
+    except:
+        h_prob, a_prob = None, None
+
+    # season-to-date and last-N-starts rates from the starters' logs, O(1) each
+    h_p_stats = pitcher_history.features(h_prob, year)
+    a_p_stats = pitcher_history.features(a_prob, year)
+
+    env = extract_weather_and_venue(box)
+
+    # --- RECORD ROW ---
+    row = {
+        "game_id": game_id,
+        "year": year,
+        "date": game_date,
+        "home_team": home_id,
+        "away_team": away_id,
+        "venue_id": env['venue_id'],
+
+        # Conditions
+        "temp": env['temp'],
+        "wind_speed": env['wind_speed'],
+        "condition": env['condition'],
+
+        # Fatigue/Rest
+        "home_rest": h_rest,
+        "away_rest": a_rest,
+        "home_games_last_7": h_fatigue,
+        "away_games_last_7": a_fatigue,
+
+        # Momentum (New Columns)
+        "home_wins_last_5": h_mom['wins_last_5'],
+        "home_wins_last_10": h_mom['wins_last_10'],
+        "away_wins_last_5": a_mom['wins_last_5'],
+        "away_wins_last_10": a_mom['wins_last_10'],
+
+        # Team Stats
+        "home_win_pct": h_feats['win_pct'],
+        "home_ops": h_feats['ops'],
+        "home_avg": h_feats['avg'],
+        "home_run_diff": h_feats['run_diff'],
+        "away_win_pct": a_feats['win_pct'],
+        "away_ops": a_feats['ops'],
+        "away_avg": a_feats['avg'],
+        "away_run_diff": a_feats['run_diff'],
+
+        # Pitching
+        "home_starter_era": h_p_stats['era'],
+        "home_starter_whip": h_p_stats['whip'],
+        "away_starter_era": a_p_stats['era'],
+        "away_starter_whip": a_p_stats['whip'],
+        f"home_starter_era_last_{LAST_N_STARTS}": h_p_stats[f'era_last_{LAST_N_STARTS}'],
+        f"home_starter_whip_last_{LAST_N_STARTS}": h_p_stats[f'whip_last_{LAST_N_STARTS}'],
+        f"away_starter_era_last_{LAST_N_STARTS}": a_p_stats[f'era_last_{LAST_N_STARTS}'],
+        f"away_starter_whip_last_{LAST_N_STARTS}": a_p_stats[f'whip_last_{LAST_N_STARTS}'],
+
+        # Targets
+        "home_score": game['home_score'],
+        "away_score": game['away_score'],
+        "home_win": 1 if game['home_score'] > game['away_score'] else 0
+    }
+
+    # --- 2. UPDATE HISTORY ---
+    try:
+        teams_box = box['liveData']['boxscore']['teams']
+        h_bat = teams_box['home']['teamStats']['batting']
+        a_bat = teams_box['away']['teamStats']['batting']
+
+        team_history.update_stats(home_id, h_bat, game['home_score'], game['away_score'], game_date,
+                                  row['home_win'])
+        team_history.update_stats(away_id, a_bat, game['away_score'], game['home_score'], game_date,
+                                  not row['home_win'])
+
+        # one id index over both teams' pitchers; a starter missing from it records no start
+        pitching = pitching_lines(teams_box)
+        if h_prob: pitcher_history.record_start(h_prob, game_date, year, pitching.get(int(h_prob)))
+        if a_prob: pitcher_history.record_start(a_prob, game_date, year, pitching.get(int(a_prob)))
+    except:
+        pass
 
-            # --- 2. UPDATE HISTORY ---
-            try:
-                teams_box = box['liveData']['boxscore']['teams']
-                h_bat = teams_box['home']['teamStats']['batting']
-                a_bat = teams_box['away']['teamStats']['batting']
+    return row
 
-                team_history[home_id].update_stats(h_bat, game['home_score'], game['away_score'], game_date,
-                                                   row['home_win'])
-                team_history[away_id].update_stats(a_bat, game['away_score'], game['home_score'], game_date,
-                                                   not row['home_win'])
 
-                all_players = teams_box['home']['players']
-                all_players.update(teams_box['away']['players'])
+def scrape_mlb_data(fetch=None, cache=None):
+    """
+    fetch(game_pk) -> boxscore dict overrides the HTTP fetcher, e.g. with a stub for testing.
+    cache is an optional ResponseCache; in offline mode the features are rebuilt from cached responses only.
+    """
+    all_rows = []
 
-                if h_prob:
-                    stats = find_pitcher_stats_in_box(teams_box['home']['players'], h_prob)
-                    if h_prob not in pitcher_history: pitcher_history[h_prob] = PitcherTracker()
-                    pitcher_history[h_prob].update_stats(stats)
+    for year in range(START_YEAR, END_YEAR + 1):
+        print(f"\n=== PROCESSING {year} ===")
+        team_history = TeamTracker()
+        pitcher_history = PitcherLog()
+
+        schedule = get_season_schedule(year, cache)
+        print(f"Games to Process: {len(schedule)}")
 
-                if a_prob:
-                    stats = find_pitcher_stats_in_box(teams_box['away']['players'], a_prob)
-                    if a_prob not in pitcher_history: pitcher_history[a_prob] = PitcherTracker()
-                    pitcher_history[a_prob].update_stats(stats)
-            except:
-                pass
+        # Boxscores are fetched concurrently but come back in schedule order, so the
+        # tracker updates below still run in strict date order.
+        boxes = iter_boxscores([g['game_id'] for g in schedule], fetch=fetch, max_workers=FETCH_WORKERS,
+                               rate=REQUESTS_PER_SECOND, cache=cache)
+
+        for i, (game, (_, box)) in enumerate(zip(schedule, boxes)):
+            row = process_game(game, box, year, team_history, pitcher_history)
+            if row is None: continue
+            all_rows.append(row)
 
             if i % 50 == 0:
-                print(f" {i}/{len(schedule)} | {game_date} | Rows: {len(all_rows)}")
+                print(f" {i}/{len(schedule)} | {game['game_date']} | Rows: {len(all_rows)}")
 
         df = pd.DataFrame(all_rows)
         if not df.empty:
@@ -360,5 +235,120 @@ def scrape_mlb_data():
             print(f"Saved {year}")
 
 
+# --- INCREMENTAL BUILDS ---
+
+def partition_path(year):
+    return os.path.join(PARTITION_DIR, f"season={year}.csv")
+
+
+def checkpoint_path(year):
+    return os.path.join(PARTITION_DIR, f"season={year}.checkpoint.pkl")
+
+
+def save_checkpoint(year, team_history, pitcher_history, processed):
+    """
+    The team tracker is stored as its snapshot buffer and the pitcher log as arrays, so checkpoints don't depend on
+    how this module was imported.
+    """
+    part = partition_path(year)
+    state = {
+        'version': CHECKPOINT_VERSION,
+        'teams': team_history.snapshot(),
+        'pitcher_log': pitcher_history.state(),
+        'processed': processed,
+        'partition_bytes': os.path.getsize(part) if os.path.exists(part) else 0,
+    }
+    tmp = checkpoint_path(year) + ".tmp"
+    with open(tmp, 'wb') as f:
+        pickle.dump(state, f)
+    os.replace(tmp, checkpoint_path(year))
+
+
+def load_checkpoint(year):
+    """
+    Returns (team_history, pitcher_history, processed). Rows appended after the last checkpoint are truncated away,
+    since those games will be processed again. A checkpoint of any other format is refused.
+    """
+    part = partition_path(year)
+    if not os.path.exists(checkpoint_path(year)):
+        if os.path.exists(part): os.remove(part)
+        return TeamTracker(), PitcherLog(), set()
+
+    with open(checkpoint_path(year), 'rb') as f:
+        state = pickle.load(f)
+
+    if not isinstance(state, dict) or state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"{checkpoint_path(year)} is not a version {CHECKPOINT_VERSION} checkpoint; "
+                         f"delete it and its partition to rebuild {year}")
+
+    if os.path.exists(part) and os.path.getsize(part) > state['partition_bytes']:
+        with open(part, 'r+b') as f:
+            f.truncate(state['partition_bytes'])
+
+    team_history = TeamTracker.restore(state['teams'])
+    pitcher_history = PitcherLog.from_state(state['pitcher_log'])
+    return team_history, pitcher_history, state['processed']
+
+
+def append_rows(year, rows):
+    if not rows: return
+    part = partition_path(year)
+    header = not os.path.exists(part) or os.path.getsize(part) == 0
+    pd.DataFrame(rows).to_csv(part, mode='a', header=header, index=False)
+
+
+def scrape_incremental(years, fetch=None, cache=None, checkpoint_every=CHECKPOINT_EVERY):
+    """
+    Resumable build into one CSV partition per season. Only games missing from a season's checkpoint are processed,
+    so a nightly run picks up just the newest final games. A season stops at its first game without a boxscore: the
+    trackers must see every game in date order, so the checkpoint stays at the last good game and the next run
+    resumes from the failed one.
+    """
+    os.makedirs(PARTITION_DIR, exist_ok=True)
+
+    for year in years:
+        team_history, pitcher_history, processed = load_checkpoint(year)
+        schedule = [g for g in get_season_schedule(year, cache) if g['game_id'] not in processed]
+        print(f"\n=== {year}: {len(processed)} games done, {len(schedule)} new ===")
+
+        boxes = iter_boxscores([g['game_id'] for g in schedule], fetch=fetch, max_workers=FETCH_WORKERS,
+                               rate=REQUESTS_PER_SECOND, cache=cache)
+        rows = []
+        for i, (game, (_, box)) in enumerate(zip(schedule, boxes), 1):
+            row = process_game(game, box, year, team_history, pitcher_history)
+            if row is None:
+                print(f" {game['game_date']} | no boxscore for gamePk {game['game_id']}, stopping {year} here")
+                break
+            rows.append(row)
+            processed.add(game['game_id'])
+
+            if i % checkpoint_every == 0 or i == len(schedule):
+                append_rows(year, rows)
+                rows = []
+                save_checkpoint(year, team_history, pitcher_history, processed)
+                print(f" {i}/{len(schedule)} | {game['game_date']} | checkpoint at gamePk {game['game_id']}")
+        boxes.close()
+
+        if rows:
+            append_rows(year, rows)
+            save_checkpoint(year, team_history, pitcher_history, processed)
+
+
 if __name__ == "__main__":
-    scrape_mlb_data()
+    parser = argparse.ArgumentParser(description="Mine MLB games into a feature dataset.")
+    parser.add_argument('--cache', default=CACHE_FILE, help="sqlite cache of raw statsapi responses")
+    parser.add_argument('--no-cache', action='store_true', help="always hit the API")
+    parser.add_argument('--offline', action='store_true', help="replay cached responses only, no network")
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"resume from checkpoints and append new games to {PARTITION_DIR}")
+    parser.add_argument('--years', type=int, nargs='+', help="seasons for --incremental (default: all)")
+    args = parser.parse_args()
+
+    response_cache = None if args.no_cache else ResponseCache(args.cache, offline=args.offline)
+    if args.incremental:
+        scrape_incremental(args.years or range(START_YEAR, END_YEAR + 1), cache=response_cache)
+    else:
+        scrape_mlb_data(cache=response_cache)
+    if response_cache is not None:
+        print(f"Cache hits: {response_cache.hits} | misses: {response_cache.misses}")
+        response_cache.close()
@@ -0,0 +1,174 @@
+"""
+Versioned on-disk format for the trained forest.
+
+An artifact is a directory holding one .npy per array (the flattened node arrays and the compiled lookup tables from
+forest_engine.py) and a manifest.json describing them: format version, feature order, classes, training window,
+model parameters, the sha256 of every array and of the pickle it was exported from. load_artifact() memory-maps the
+arrays read-only, so worker processes loading the same artifact share its pages, and imports neither sklearn nor
+joblib: a cold start costs NumPy and a few file opens instead of unpickling every estimator.
+
+    python model_artifact.py export   # ../data/random_forest.pkl -> ../data/models/random_forest/
+    python model_artifact.py verify   # re-hash every array against the manifest
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from calibrator import CalibratedModel, Calibrator, calibration_path
+from forest_engine import FlatForest, flatten_forest
+
+# --- CONFIGURATION ---
+MODEL_FILE = "../data/random_forest.pkl"
+ARTIFACT_DIR = "../data/models/random_forest"
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+TRAINING_WINDOW = {'start_year': 2015, 'end_year': 2023}  # Modeling.ipynb trains on year < 2024
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def array_sha256(array):
+    return hashlib.sha256(np.ascontiguousarray(array).data).hexdigest()
+
+
+def model_sha256(path):
+    """
+    Content hash of a model: the manifest of an artifact directory (it hashes every array), combined with its
+    calibrator when it has one, or a pickle file.
+    """
+    if not os.path.isdir(path):
+        return file_sha256(path)
+    digest = file_sha256(os.path.join(path, MANIFEST_FILE))
+    if os.path.exists(calibration_path(path)):
+        digest = hashlib.sha256((digest + file_sha256(calibration_path(path))).encode()).hexdigest()
+    return digest
+
+
+def _json_params(model):
+    """The estimator's hyperparameters that survive a JSON round trip."""
+    return {k: v for k, v in model.get_params().items() if v is None or isinstance(v, (bool, int, float, str))}
+
+
+def export_artifact(model, out_dir=ARTIFACT_DIR, source_file=None, training_window=TRAINING_WINDOW):
+    """Writes a fitted RandomForestClassifier as an artifact directory and returns its manifest."""
+    forest = flatten_forest(model)
+    tmp_dir = out_dir.rstrip('/') + '.tmp'
+    if os.path.isdir(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    arrays = {}
+    for name, array in forest.arrays().items():
+        array = np.ascontiguousarray(array)
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+        arrays[name] = {'file': f"{name}.npy", 'dtype': str(array.dtype), 'shape': list(array.shape),
+                        'sha256': array_sha256(array)}
+
+    names = getattr(model, 'feature_names_in_', None)
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        # the version changes whenever any array does
+        'version': hashlib.sha256(''.join(a['sha256'] for a in arrays.values()).encode()).hexdigest()[:16],
+        'model_type': type(model).__name__,
+        'params': _json_params(model),
+        'features': None if names is None else [str(n) for n in names],
+        'classes': [int(c) for c in model.classes_],
+        'n_features': int(model.n_features_in_),
+        'n_estimators': forest.n_estimators,
+        'training_window': training_window,
+        'source': None if source_file is None else {'file': os.path.basename(source_file),
+                                                    'sha256': file_sha256(source_file)},
+        'arrays': arrays,
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # swap the whole directory so readers never see a half-written artifact
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.replace(tmp_dir, out_dir)
+    return manifest
+
+
+def read_manifest(path=ARTIFACT_DIR):
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported artifact format {manifest.get('format_version')}, "
+                         f"expected {FORMAT_VERSION}")
+    return manifest
+
+
+def verify_artifact(path=ARTIFACT_DIR):
+    """Raises ValueError if any array on disk differs from the manifest."""
+    manifest = read_manifest(path)
+    for name, spec in manifest['arrays'].items():
+        array = np.load(os.path.join(path, spec['file']), mmap_mode='r')
+        if list(array.shape) != spec['shape'] or str(array.dtype) != spec['dtype'] \
+                or array_sha256(array) != spec['sha256']:
+            raise ValueError(f"{path}: array '{name}' does not match the manifest")
+    return manifest
+
+
+def load_artifact(path=ARTIFACT_DIR, mmap=True):
+    """A FlatForest backed by the artifact's arrays (read-only memory maps unless mmap=False)."""
+    manifest = read_manifest(path)
+    arrays = {}
+    for name, spec in manifest['arrays'].items():
+        arrays[name] = np.load(os.path.join(path, spec['file']), mmap_mode='r' if mmap else None)
+        if list(arrays[name].shape) != spec['shape']:
+            raise ValueError(f"{path}: array '{name}' does not match the manifest")
+
+    nodes = {name: arrays[name] for name in FlatForest.ARRAYS}
+    tables = {name: arrays[name] for name in FlatForest.TABLES}
+    forest = FlatForest(**nodes, n_features=manifest['n_features'], feature_names=manifest['features'],
+                        tables=tables)
+    forest.manifest = manifest
+    return forest
+
+
+def load_model(path, calibrated=True):
+    """
+    A FlatForest from an artifact directory, wrapped in its calibrator (calibrator.py) when the directory has one
+    and `calibrated`, or a fitted model from a pickle.
+    """
+    if os.path.isdir(path):
+        forest = load_artifact(path)
+        if calibrated and os.path.exists(calibration_path(path)):
+            return CalibratedModel(forest, Calibrator.load(calibration_path(path)))
+        return forest
+    import joblib  # only the pickle path needs joblib (and, through the pickle, sklearn)
+    return joblib.load(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or verify the flat model artifact.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    export_cmd = sub.add_parser('export', help="export a pickled forest as an artifact")
+    export_cmd.add_argument('--model', default=MODEL_FILE)
+    export_cmd.add_argument('--out', default=ARTIFACT_DIR)
+    export_cmd.add_argument('--train-start', type=int, default=TRAINING_WINDOW['start_year'])
+    export_cmd.add_argument('--train-end', type=int, default=TRAINING_WINDOW['end_year'])
+    verify_cmd = sub.add_parser('verify', help="check every array against the manifest")
+    verify_cmd.add_argument('--path', default=ARTIFACT_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        import joblib
+        window = {'start_year': args.train_start, 'end_year': args.train_end}
+        manifest = export_artifact(joblib.load(args.model), args.out, args.model, window)
+        print(f"Wrote {args.out} (version {manifest['version']}, {manifest['n_estimators']} trees)")
+    else:
+        manifest = verify_artifact(args.path)
+        print(f"{args.path}: version {manifest['version']} OK ({len(manifest['arrays'])} arrays)")
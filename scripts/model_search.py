@@ -0,0 +1,216 @@
+"""
+Scripted hyperparameter search for the game-outcome models (the Modeling notebook's searches, minus the notebook).
+
+Folds are time-aware: each validation season is scored by a model trained only on the seasons before it, inside the
+notebook's training window (year < 2024). Fold matrices are built once and cached on disk with joblib.Memory, so
+repeated runs and parallel workers reuse them (memory-mapped) instead of recomputing features.
+
+Each model family runs a successive-halving search over the notebook's parameter space: every candidate is first
+scored on the most recent fold only, the best 1/eta advance and are scored on more folds, and so on until the
+survivors have seen every fold. Fold scores are kept between rounds, so no (candidate, fold) pair is fit twice, and
+every round's fits are spread across all cores. The leaderboard lists each candidate's cross-validated ROC-AUC,
+accuracy and fit time; the best candidate per family is refit on the whole window and scored on the 2024-25
+holdout.
+
+    python model_search.py                        # all families
+    python model_search.py --models rf xgb --jobs 4
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Memory, Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from dataset_store import DATASET_CSV, PARQUET_DIR, load_games
+from features import add_game_features, game_feature_matrix
+
+try:
+    import xgboost as xgb
+    HAS_XGBOOST = True
+except ImportError:
+    HAS_XGBOOST = False
+
+# --- CONFIGURATION ---
+PARK_FACTORS_FILE = "../data/venue_park_factors.csv"
+CACHE_DIR = "../data/.search_cache"
+LEADERBOARD_FILE = "../data/leaderboard.csv"
+TEST_START_YEAR = 2024  # train on year < 2024, hold out 2024-2025 (as in Modeling.ipynb)
+FOLD_YEARS = [2019, 2021, 2022, 2023]  # validation seasons; 2020's 60-game season only ever trains
+ETA = 3  # keep the best 1/ETA candidates each round
+SEED = 42
+
+# family -> (estimator factory, parameter space, number of sampled candidates or None for the full grid)
+SEARCH_SPACES = {
+    'log_reg': (
+        lambda **p: make_pipeline(StandardScaler(), LogisticRegression(random_state=SEED, **p)),
+        {'C': [0.001, 0.01, 0.1, 1, 10, 100], 'penalty': ['l1', 'l2'], 'solver': ['liblinear', 'saga'],
+         'max_iter': [1000]},
+        None,
+    ),
+    'tree': (
+        lambda **p: DecisionTreeClassifier(random_state=SEED, **p),
+        {'max_depth': [3, 5, 7, 10, None], 'min_samples_split': [50, 100, 200], 'min_samples_leaf': [25, 50, 100],
+         'criterion': ['gini', 'entropy']},
+        None,
+    ),
+    'rf': (
+        lambda **p: RandomForestClassifier(random_state=SEED, **p),
+        {'n_estimators': [100, 200, 300], 'max_depth': [5, 10, 15, None], 'min_samples_split': [50, 100, 200],
+         'min_samples_leaf': [25, 50, 100], 'max_features': ['sqrt', 'log2']},
+        20,
+    ),
+    'xgb': (
+        lambda **p: xgb.XGBClassifier(random_state=SEED, eval_metric='logloss', n_jobs=1, **p),
+        {'n_estimators': [100, 200, 300], 'max_depth': [3, 5, 7, 10], 'learning_rate': [0.01, 0.05, 0.1, 0.2],
+         'subsample': [0.6, 0.8, 1.0], 'colsample_bytree': [0.6, 0.8, 1.0], 'min_child_weight': [1, 3, 5],
+         'gamma': [0, 0.1, 0.2]},
+        30,
+    ),
+}
+
+
+# --- DATA AND FOLDS ---
+
+def dataset_version(parquet_dir=PARQUET_DIR, csv_path=DATASET_CSV, park_factors_file=PARK_FACTORS_FILE):
+    """Changes whenever an input file does, so cached folds are never reused across datasets."""
+    paths = [park_factors_file, csv_path]
+    if os.path.isdir(parquet_dir):
+        paths += sorted(os.path.join(root, f) for root, _, files in os.walk(parquet_dir) for f in files)
+    return [(p, os.path.getsize(p), os.path.getmtime(p)) for p in paths if os.path.exists(p)]
+
+
+def build_matrices(version):
+    """(X, y, year) for every usable game; `version` only keys the cache."""
+    df = load_games(categorical=False)
+    df = df[df['condition'] != 'Unknown']
+    df = add_game_features(df, pd.read_csv(PARK_FACTORS_FILE))
+    return game_feature_matrix(df), df['home_win'].to_numpy(np.int8), df['year'].to_numpy(np.int16)
+
+
+def build_folds(version, fold_years=tuple(FOLD_YEARS), test_start=TEST_START_YEAR):
+    """Expanding-window folds inside the training window, plus the full window and the holdout."""
+    X, y, year = build_matrices(version)
+    folds = [(X[year < v], y[year < v], X[year == v], y[year == v]) for v in fold_years]
+    train, test = year < test_start, year >= test_start
+    return folds, (X[train], y[train], X[test], y[test])
+
+
+# --- SEARCH ---
+
+def candidates(family, n_candidates=None):
+    factory, space, n_iter = SEARCH_SPACES[family]
+    n_iter = n_candidates or n_iter
+    params = list(ParameterGrid(space)) if n_iter is None else list(ParameterSampler(space, n_iter, random_state=SEED))
+    return factory, params
+
+
+def fit_and_score(factory, params, X_train, y_train, X_val, y_val):
+    start = time.perf_counter()
+    model = factory(**params).fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+    proba = model.predict_proba(X_val)[:, 1]
+    return roc_auc_score(y_val, proba), accuracy_score(y_val, proba > 0.5), fit_time
+
+
+def successive_halving(factory, params, folds, eta=ETA, n_jobs=-1):
+    """
+    Scores candidates on the most recent folds first, keeping the best 1/eta by mean ROC-AUC after each round, until
+    the survivors have been scored on every fold. Returns one result dict per candidate.
+    """
+    order = list(reversed(range(len(folds))))  # newest validation season first
+    n_rounds = max(1, math.ceil(math.log(len(params), eta))) if len(params) > 1 else 1
+    # folds per round grow by eta and end at all of them; rounds that would not add a fold are merged
+    fold_counts = sorted({max(1, round(len(folds) * eta ** (r - n_rounds + 1))) for r in range(n_rounds)}
+                         | {len(folds)})
+
+    scores = {}  # (candidate, fold) -> (roc_auc, accuracy, fit_time)
+    alive = list(range(len(params)))
+    rounds_reached = {}
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for r, n_folds in enumerate(fold_counts):
+            tasks = [(c, f) for c in alive for f in order[:n_folds] if (c, f) not in scores]
+            results = parallel(delayed(fit_and_score)(factory, params[c], *folds[f]) for c, f in tasks)
+            scores.update(zip(tasks, results))
+            for c in alive:
+                rounds_reached[c] = r + 1
+
+            mean_auc = {c: np.mean([scores[c, f][0] for f in order[:n_folds]]) for c in alive}
+            if r < len(fold_counts) - 1:
+                alive = sorted(alive, key=mean_auc.get, reverse=True)[:max(1, len(alive) // eta)]
+
+    rows = []
+    for c, p in enumerate(params):
+        seen = [scores[c, f] for f in order if (c, f) in scores]
+        rows.append({
+            'params': json.dumps(p, sort_keys=True, default=str),
+            'rounds': rounds_reached[c],
+            'folds': len(seen),
+            'roc_auc': np.mean([s[0] for s in seen]),
+            'accuracy': np.mean([s[1] for s in seen]),
+            'fit_time': np.mean([s[2] for s in seen]),
+        })
+    return rows
+
+
+def search(families, n_jobs=-1, eta=ETA, n_candidates=None, cache_dir=CACHE_DIR):
+    memory = Memory(cache_dir, mmap_mode='r', verbose=0)
+    folds, (X_train, y_train, X_test, y_test) = memory.cache(build_folds)(dataset_version())
+
+    board = []
+    for family in families:
+        factory, params = candidates(family, n_candidates)
+        start = time.perf_counter()
+        rows = successive_halving(factory, params, folds, eta, n_jobs)
+        search_time = time.perf_counter() - start
+
+        # the winner is the best of the candidates that saw every fold
+        finalists = [row for row in rows if row['folds'] == len(folds)]
+        best = max(finalists, key=lambda row: row['roc_auc'])
+        roc_auc, accuracy, fit_time = fit_and_score(factory, json.loads(best['params']), X_train, y_train,
+                                                    X_test, y_test)
+        best.update(test_roc_auc=roc_auc, test_accuracy=accuracy, refit_time=fit_time)
+        print(f"{family}: {len(params)} candidates, {sum(r['folds'] for r in rows)} fold fits in {search_time:.1f}s; "
+              f"best CV ROC-AUC {best['roc_auc']:.4f}, test ROC-AUC {roc_auc:.4f}, test accuracy {accuracy:.4f}")
+        board += [dict(model=family, **row) for row in rows]
+
+    board = pd.DataFrame(board).sort_values(['model', 'folds', 'roc_auc'], ascending=[True, False, False])
+    return board.reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-aware successive-halving search over the notebook's models.")
+    parser.add_argument('--models', nargs='+', choices=list(SEARCH_SPACES), default=list(SEARCH_SPACES))
+    parser.add_argument('--jobs', type=int, default=-1, help="parallel fits (-1: all cores)")
+    parser.add_argument('--eta', type=int, default=ETA)
+    parser.add_argument('--candidates', type=int, default=None, help="sampled candidates per family")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('-o', '--output', default=LEADERBOARD_FILE)
+    args = parser.parse_args()
+
+    families = args.models
+    if 'xgb' in families and not HAS_XGBOOST:
+        print("xgboost is not installed; skipping the xgb search")
+        families = [f for f in families if f != 'xgb']
+
+    board = search(families, args.jobs, args.eta, args.candidates, args.cache_dir)
+    board.to_csv(args.output, index=False)
+    best = board.dropna(subset=['test_roc_auc'])
+    print(best[['model', 'roc_auc', 'accuracy', 'fit_time', 'test_roc_auc', 'test_accuracy', 'params']]
+          .to_string(index=False))
+    print(f"Leaderboard written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Per-start pitching logs for the miner's starter features.
+
+Every start a pitcher makes is appended to one columnar log: the game date, season, and the exact outs recorded
+("6.2" innings is 20 outs, not 6.666), earned runs, walks and hits. Each row also carries the pitcher's running
+totals through that start, so any window of consecutive starts (career, season to date, last N) is the difference
+of two rows: O(1) per query, however long the history. Rates use exact outs: ERA = 27 * ER / outs,
+WHIP = 3 * (BB + H) / outs.
+
+Boxscore pitching lines are found through pitching_lines(), a direct player id index over both teams that leaves the
+boxscore untouched.
+"""
+
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+DEFAULT_ERA = 4.50  # reported for pitchers without an out recorded yet
+DEFAULT_WHIP = 1.35
+LAST_N_STARTS = 5
+INITIAL_CAPACITY = 1024
+
+# log column -> dtype; TOTALS columns also get a running per-pitcher sum, cum_<column>
+LOG_COLUMNS = {
+    'pitcher': np.int64,
+    'day': np.int64,
+    'season': np.int16,
+    'outs': np.int32,
+    'earned_runs': np.int32,
+    'walks': np.int32,
+    'hits': np.int32,
+}
+TOTALS = ['outs', 'earned_runs', 'walks', 'hits']
+
+# statsapi pitching stat -> log column
+BOX_STATS = {'earnedRuns': 'earned_runs', 'baseOnBalls': 'walks', 'hits': 'hits'}
+
+
+def innings_to_outs(innings):
+    """Exact outs from statsapi's inningsPitched ("6.2" is 6 innings and 2 outs); 0 when missing or malformed."""
+    try:
+        whole, _, part = str(innings or '0').partition('.')
+        return 3 * int(whole or 0) + int(part or 0)
+    except ValueError:
+        return 0
+
+
+def pitching_lines(teams_box):
+    """{player id: pitching stats} for everyone who pitched on either side of a boxscore's teams section."""
+    lines = {}
+    for side in ('home', 'away'):
+        for key, player in teams_box.get(side, {}).get('players', {}).items():
+            stats = player.get('stats', {}).get('pitching', {})
+            if not stats:
+                continue
+            pid = player.get('person', {}).get('id') or (key[2:] if key.startswith('ID') else None)
+            if pid is not None:
+                lines[int(pid)] = stats
+    return lines
+
+
+def rates(outs, earned_runs, walks, hits):
+    if outs <= 0:
+        return DEFAULT_ERA, DEFAULT_WHIP
+    return 27 * earned_runs / outs, 3 * (walks + hits) / outs
+
+
+class PitcherLog:
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.size = 0
+        self.log = {col: np.zeros(capacity, dtype=dtype) for col, dtype in LOG_COLUMNS.items()}
+        self.log.update({f"cum_{col}": np.zeros(capacity, dtype=np.int64) for col in TOTALS})
+        self.rows_of = {}  # pitcher id -> log rows of its starts, oldest first
+        self.season_first = {}  # pitcher id -> (season, position in rows_of of its first start that season)
+
+    # --- UPDATES ---
+
+    def _grow(self):
+        capacity = 2 * len(self.log['pitcher'])
+        for col, values in self.log.items():
+            self.log[col] = np.resize(values, capacity)
+
+    def add_start(self, pitcher_id, date, season, outs, earned_runs, walks, hits):
+        if self.size == len(self.log['pitcher']):
+            self._grow()
+        pitcher_id = int(pitcher_id)
+        rows = self.rows_of.setdefault(pitcher_id, [])
+        if self.season_first.get(pitcher_id, (None,))[0] != season:
+            self.season_first[pitcher_id] = (season, len(rows))
+
+        i = self.size
+        log = self.log
+        log['pitcher'][i] = pitcher_id
+        log['day'][i] = np.datetime64(pd.Timestamp(date).date(), 'D').astype(np.int64)
+        log['season'][i] = season
+        for col, value in zip(TOTALS, (outs, earned_runs, walks, hits)):
+            log[col][i] = value
+            log[f"cum_{col}"][i] = value + (log[f"cum_{col}"][rows[-1]] if rows else 0)
+
+        rows.append(i)
+        self.size += 1
+
+    def record_start(self, pitcher_id, date, season, stats):
+        """Appends a start from a statsapi pitching line; a missing line records nothing."""
+        if not stats:
+            return
+        counts = {col: int(stats.get(key, 0) or 0) for key, col in BOX_STATS.items()}
+        self.add_start(pitcher_id, date, season, innings_to_outs(stats.get('inningsPitched')), **counts)
+
+    # --- QUERIES ---
+
+    def window_totals(self, pitcher_id, first):
+        """(outs, earned_runs, walks, hits) over a pitcher's starts from position `first` of its log to the latest."""
+        rows = self.rows_of.get(pitcher_id)
+        if not rows or first >= len(rows):
+            return 0, 0, 0, 0
+        totals = [self.log[f"cum_{col}"] for col in TOTALS]
+        last = rows[-1]
+        if first == 0:
+            return tuple(int(c[last]) for c in totals)
+        before = rows[first - 1]
+        return tuple(int(c[last] - c[before]) for c in totals)
+
+    def career(self, pitcher_id):
+        return rates(*self.window_totals(pitcher_id, 0))
+
+    def season_to_date(self, pitcher_id, season):
+        first_season, first = self.season_first.get(pitcher_id, (None, 0))
+        if first_season != season:
+            return DEFAULT_ERA, DEFAULT_WHIP
+        return rates(*self.window_totals(pitcher_id, first))
+
+    def last_n(self, pitcher_id, n=LAST_N_STARTS):
+        starts = len(self.rows_of.get(pitcher_id, ()))
+        return rates(*self.window_totals(pitcher_id, max(0, starts - n)))
+
+    def features(self, pitcher_id, season, n=LAST_N_STARTS):
+        """Pre-start features: season-to-date and last-n-starts ERA/WHIP, rounded as the dataset stores them."""
+        era, whip = self.season_to_date(pitcher_id, season)
+        era_n, whip_n = self.last_n(pitcher_id, n)
+        return {'era': round(era, 2), 'whip': round(whip, 2),
+                f'era_last_{n}': round(era_n, 2), f'whip_last_{n}': round(whip_n, 2)}
+
+    # --- PERSISTENCE ---
+
+    def state(self):
+        """Plain arrays for checkpoints; the per-pitcher indexes are rebuilt from them."""
+        return {col: values[:self.size].copy() for col, values in self.log.items()}
+
+    @classmethod
+    def from_state(cls, state):
+        log = cls(capacity=max(INITIAL_CAPACITY, len(state['pitcher'])))
+        log.size = len(state['pitcher'])
+        for col, values in state.items():
+            log.log[col][:log.size] = values
+        for i, (pid, season) in enumerate(zip(log.log['pitcher'][:log.size].tolist(),
+                                              log.log['season'][:log.size].tolist())):
+            rows = log.rows_of.setdefault(pid, [])
+            if log.season_first.get(pid, (None,))[0] != season:
+                log.season_first[pid] = (season, len(rows))
+            rows.append(i)
+        return log
@@ -0,0 +1,272 @@
+"""
+Playoff odds from the actual results to date.
+
+Games before --date count as played, with their real results; every regular-season game from --date on is simulated
+path-dependently (sim_engine.SeasonPath), scored with the teams' stats entering --date (feature_store.py). Each
+chunk of simulated seasons keeps a (sims x 30) win matrix and a (sims x 30 x 30) head-to-head matrix, and the
+standings of every sim in the chunk are resolved at once:
+
+- every team gets one integer sort key per sim: wins, then win% against the other teams of its league on the same
+  win total (head-to-head for two-way ties, combined for more), then win% within its division, then a coin flip
+- one argsort over the (sims x 30) keys ranks the league; division winners, wild cards and byes are counted from
+  pairwise "ranked ahead of" masks, with no per-sim Python code
+
+The playoff format follows the season: one division winner and two wild cards per league up to 2021 (two and two
+in 2020), one division winner and three wild cards from 2022, when the two best division winners also get a bye.
+The tiebreaks are the post-2022 rules, which replaced tiebreaker games.
+
+The season's games come from the statsapi schedule (through the response cache), so games not yet played are there
+to simulate; the mined dataset only holds final games, and its results and weather are merged in by game_id. Without
+statsapi, or offline without a cached schedule, only the dataset's games are known: enough for a completed season.
+
+    python playoff_odds.py --date 2025-08-01
+    python playoff_odds.py --date 2025-07-01 --sims 20000 -o odds_july.csv
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import load_games
+from feature_store import FeatureStore
+from features import FEATURES, check_feature_order, feature_response
+from model_artifact import load_model
+from response_cache import CACHE_FILE, ResponseCache
+from sim_engine import DEFAULT_SEED, MOMENTUM_VALUES, SeasonPath, encode_schedule, iter_path_batches
+from simulate_2025 import TEAM_ID_MAP
+
+# --- CONFIGURATION ---
+MODEL_FILE = "../data/models/random_forest"
+OUTPUT_FILE = "../data/playoff_odds.csv"
+YEAR = 2025
+N_SIMS = 100000
+CHUNK_SIZE = 2000  # sims resolved together; the head-to-head matrix is chunk x 30 x 30
+FULL_DAY_GAMES = 8  # regular-season days have more games than this, postseason days never do
+PLAYED_STATUSES = {'Final', 'Game Over', 'Completed Early'}
+DROPPED_STATUSES = {'Postponed', 'Cancelled'}  # a postponed game is listed again on its new date
+DEFAULT_WEATHER = {'temp': 70, 'wind_speed': 0}  # what the miner records for a game without a weather report
+
+DIVISIONS = {
+    'AL East': [110, 111, 147, 139, 141],
+    'AL Central': [145, 114, 116, 118, 142],
+    'AL West': [117, 108, 133, 136, 140],
+    'NL East': [144, 146, 121, 143, 120],
+    'NL Central': [112, 113, 158, 134, 138],
+    'NL West': [109, 115, 119, 135, 137],
+}
+
+SCHEDULE_COLUMNS = ['game_id', 'date', 'home_team', 'away_team', 'temp', 'wind_speed', 'home_score', 'away_score']
+
+
+def playoff_format(year):
+    """(division spots, wild cards, byes) per league."""
+    if year == 2020:
+        return 2, 2, 0
+    if year < 2022:
+        return 1, 2, 0
+    return 1, 3, 2
+
+
+def regular_season(games):
+    """Drops the postseason: everything after the last day with more than FULL_DAY_GAMES games."""
+    per_day = games['date'].value_counts()
+    return games[games['date'] <= per_day[per_day > FULL_DAY_GAMES].index.max()]
+
+
+def fetch_regular_season(year, cache=None):
+    """Every regular-season game of the statsapi schedule, played or not; scores only for the played ones."""
+    from mlb_miner import get_schedule_chunked  # imports statsapi, which only the schedule needs
+
+    games = [g for g in get_schedule_chunked(year, cache)
+             if g.get('game_type') == 'R' and g.get('status') not in DROPPED_STATUSES]
+    if not games:
+        return None
+    schedule = pd.DataFrame({
+        'game_id': [g['game_id'] for g in games],
+        'date': pd.to_datetime([g['game_date'] for g in games]),
+        'home_team': [g['home_id'] for g in games],
+        'away_team': [g['away_id'] for g in games],
+    })
+    played = pd.Series([g['status'] in PLAYED_STATUSES for g in games])
+    for side in ('home', 'away'):
+        score = pd.to_numeric(pd.Series([g.get(f'{side}_score') for g in games]), errors='coerce')
+        schedule[f'{side}_score'] = score.where(played)
+    return schedule
+
+
+def load_schedule(year, cache=None):
+    """The regular season: the statsapi schedule, with the dataset's results and weather merged in by game_id."""
+    results = load_games(SCHEDULE_COLUMNS, years=[year], categorical=False)
+    try:
+        schedule = fetch_regular_season(year, cache)
+    except ImportError:
+        schedule = None
+    if schedule is None:
+        print(f"No {year} schedule from statsapi or the cache: using the dataset's final games only")
+        return regular_season(results)
+
+    mined = results.set_index('game_id')[['temp', 'wind_speed', 'home_score', 'away_score']]
+    schedule = schedule.join(mined, on='game_id', rsuffix='_mined')
+    for col in ('home_score', 'away_score'):
+        # the dataset's score where the game was mined, the schedule's for games final since the last mining run
+        schedule[col] = schedule.pop(col + '_mined').fillna(schedule[col])
+    schedule = schedule.fillna(DEFAULT_WEATHER)
+    return schedule[SCHEDULE_COLUMNS].sort_values(['date', 'game_id'], kind='stable').reset_index(drop=True)
+
+
+def team_layout(team_ids):
+    """(league, division) masks between dense team indexes: (n_teams x n_teams) bools, False on the diagonal."""
+    names = {team: name for name, teams in DIVISIONS.items() for team in teams}
+    division = np.array([names[t] for t in team_ids])
+    league = np.array([d.split()[0] for d in division])
+    off_diagonal = ~np.eye(len(team_ids), dtype=bool)
+    return (league[:, None] == league) & off_diagonal, (division[:, None] == division) & off_diagonal
+
+
+def tiebreak_keys(wins, h2h, games_vs, same_league, same_division, rng):
+    """(sims x n_teams) int64 sort keys: higher ranks ahead. h2h[s, i, j] counts sim s wins of team i over team j."""
+    tied = (wins[:, :, None] == wins[:, None, :]) & same_league
+    tied_wins = (h2h * tied).sum(axis=2)
+    tied_games = (games_vs * tied).sum(axis=2)
+    tied_pct = np.where(tied_games > 0, tied_wins / np.maximum(tied_games, 1), 0.5)
+
+    division_games = (games_vs * same_division).sum(axis=1)
+    division_pct = (h2h * same_division).sum(axis=2) / np.maximum(division_games, 1)
+
+    key = wins.astype(np.int64) * 1001 + np.rint(tied_pct * 1000).astype(np.int64)
+    key = key * 1001 + np.rint(division_pct * 1000).astype(np.int64)
+    return key * 1024 + rng.integers(0, 1024, size=wins.shape)
+
+
+def qualify(keys, same_league, same_division, fmt):
+    """(division winner, wild card, bye) bool matrices, each (sims x n_teams)."""
+    division_spots, wildcards, byes = fmt
+    sims, n_teams = keys.shape
+    order = np.argsort(-keys, axis=1)
+    rank = np.empty_like(order)
+    rank[np.arange(sims)[:, None], order] = np.arange(n_teams)
+    ahead = rank[:, None, :] < rank[:, :, None]  # ahead[s, i, j]: team j ranks ahead of team i in sim s
+
+    winner = (ahead & same_division).sum(axis=2) < division_spots
+    wildcard = ~winner & ((ahead & same_league & ~winner[:, None, :]).sum(axis=2) < wildcards)
+    bye = winner & ((ahead & same_league & winner[:, None, :]).sum(axis=2) < byes)
+    return winner, wildcard, bye
+
+
+def simulate_playoff_odds(schedule, date, model, store, n_sims=N_SIMS, chunk_size=CHUNK_SIZE, seed=DEFAULT_SEED):
+    """One row per team: record to date, projected wins and division / wild card / playoff / bye probabilities."""
+    year = pd.Timestamp(date).year
+    cutoff_date = np.datetime64(pd.Timestamp(date).date(), 'D')
+    team_ids, home_idx, away_idx = encode_schedule(schedule['home_team'], schedule['away_team'])
+    n_teams = len(team_ids)
+    same_league, same_division = team_layout(team_ids)
+    fmt = playoff_format(year)
+
+    days = schedule['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    path = SeasonPath(days, home_idx, away_idx, n_teams)
+    start = path.start_batch(cutoff_date.astype(np.int64))
+    first = path.bounds[start]
+
+    # real results before the cutoff (games without a final score there were never played)
+    played = schedule.iloc[path.order[:first]].dropna(subset=['home_score', 'away_score'])
+    home_won = (played['home_score'] > played['away_score']).to_numpy()
+    played_home = np.searchsorted(team_ids, played['home_team'].to_numpy())
+    played_away = np.searchsorted(team_ids, played['away_team'].to_numpy())
+    winners = np.where(home_won, played_home, played_away)
+    losers = np.where(home_won, played_away, played_home)
+    wins_to_date = np.bincount(winners, minlength=n_teams)
+    losses_to_date = np.bincount(losers, minlength=n_teams)
+    h2h_to_date = np.zeros((n_teams, n_teams), dtype=np.int16)
+    np.add.at(h2h_to_date, (winners, losers), 1)
+    games_vs = np.zeros((n_teams, n_teams), dtype=np.int16)
+    np.add.at(games_vs, (home_idx, away_idx), 1)
+    np.add.at(games_vs, (away_idx, home_idx), 1)
+
+    # remaining games, scored with each team's state entering the cutoff
+    remaining = schedule.iloc[path.order[first:]]
+    response = np.zeros((len(days), len(MOMENTUM_VALUES)), dtype=np.float32)
+    if len(remaining):
+        X = store.matchup_feature_matrix(remaining['home_team'], remaining['away_team'],
+                                         np.full(len(remaining), cutoff_date), remaining['temp'],
+                                         remaining['wind_speed'])
+        X = np.nan_to_num(X, nan=0.0)
+        X[:, FEATURES.index('diff_games_last_7')] = path.home_games_last_7[first:] - path.away_games_last_7[first:]
+        response[first:] = feature_response(model, X, 'diff_wins_last_10', MOMENTUM_VALUES)
+    initial_bits = store.win_bits(team_ids, np.full(n_teams, cutoff_date))
+
+    rng = np.random.default_rng(seed)
+    total_wins = np.zeros(n_teams)
+    counts = {name: np.zeros(n_teams, dtype=np.int64) for name in ('division', 'wildcard', 'bye')}
+    done = 0
+    while done < n_sims:
+        size = min(chunk_size, n_sims - done)
+        bits = np.tile(initial_bits, (size, 1))
+        wins = np.tile(wins_to_date.astype(np.int16), (size, 1))
+        h2h = np.tile(h2h_to_date, (size, 1, 1))
+        for lo, hi, home_win in iter_path_batches(response, path, bits, rng, start):
+            home, away = path.home_idx[lo:hi], path.away_idx[lo:hi]
+            wins[:, home] += home_win
+            wins[:, away] += ~home_win
+            h2h[:, home, away] += home_win
+            h2h[:, away, home] += ~home_win
+
+        keys = tiebreak_keys(wins, h2h, games_vs, same_league, same_division, rng)
+        for name, qualified in zip(('division', 'wildcard', 'bye'), qualify(keys, same_league, same_division, fmt)):
+            counts[name] += qualified.sum(axis=0)
+        total_wins += wins.sum(axis=0)
+        done += size
+
+    names = {team: name for name, teams in DIVISIONS.items() for team in teams}
+    odds = pd.DataFrame({
+        'team': [TEAM_ID_MAP.get(t, t) for t in team_ids],
+        'division': [names[t] for t in team_ids],
+        'W': wins_to_date,
+        'L': losses_to_date,
+        'Avg_Wins': total_wins / n_sims,
+        'P_Division': counts['division'] / n_sims,
+        'P_Wildcard': counts['wildcard'] / n_sims,
+        'P_Playoffs': (counts['division'] + counts['wildcard']) / n_sims,
+    })
+    if fmt[2]:
+        odds['P_Bye'] = counts['bye'] / n_sims
+    return odds.sort_values(['division', 'Avg_Wins'], ascending=[True, False]).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Playoff odds: real results to a date, the rest simulated.")
+    parser.add_argument('--date', default=None,
+                        help="first simulated day (default: the day after the newest final game of --year)")
+    parser.add_argument('--year', type=int, default=YEAR)
+    parser.add_argument('--sims', type=int, default=N_SIMS)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('-o', '--output', default=OUTPUT_FILE)
+    parser.add_argument('--cache', default=CACHE_FILE, help="sqlite cache of raw statsapi responses")
+    parser.add_argument('--no-cache', action='store_true', help="always hit the API for the schedule")
+    parser.add_argument('--offline', action='store_true', help="cached schedule only, no network")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = load_model(MODEL_FILE)
+    check_feature_order(model)
+    store = FeatureStore.load()
+    response_cache = None if args.no_cache else ResponseCache(args.cache, offline=args.offline)
+    schedule = load_schedule(args.year, response_cache)
+    if response_cache is not None:
+        response_cache.close()
+    if args.date is None:
+        final = schedule.dropna(subset=['home_score'])
+        args.date = str((final['date'].max() + pd.Timedelta(days=1)).date())
+    if pd.Timestamp(args.date).year != args.year:
+        parser.error(f"--date must fall in {args.year}")
+
+    odds = simulate_playoff_odds(schedule, args.date, model, store, args.sims, seed=args.seed)
+    odds.to_csv(args.output, index=False)
+    print(f"--- {args.year} PLAYOFF ODDS ENTERING {args.date} ({args.sims} sims) ---")
+    print(odds.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"\nWritten to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Single-pass feature rebuild from stored game records, without the network.
+
+Games are streamed in date order, from the raw boxscores in the response cache (read offline) or from the scores in
+the stored dataset, through a set of feature extractors. Each extractor names the shared state it reads (STATES):
+
+- 'teams': a TeamTracker reset every season (records, batting, rest and games in the last 7 days, as the miner)
+- 'history': a TeamTracker never reset, for results carried across seasons (add_momentum.py)
+- 'pitchers': a PitcherLog reset every season, fed by the starters' boxscore lines
+
+For every game, each extractor reads its pre-game values from the states; then every state declared by any extractor
+applies the game's result once. Only declared states are built, so a run costs what its extractors need. A new rolling
+stat is one Extractor subclass (plus a State, if no existing one holds what it needs) added to EXTRACTORS.
+
+Games without a cached boxscore are skipped when any extractor or state reads boxscores, as the miner skips them;
+the dataset source has no boxscores, so only score-based extractors run on it.
+
+    python replay.py --source dataset --check                   # rest, fatigue, momentum, records from the scores
+    python replay.py --source cache --years 2024 2025 -o replayed.csv
+    python replay.py --source dataset --extractors momentum avg_runs
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import load_games
+from pitcher_log import LAST_N_STARTS, PitcherLog, pitching_lines
+from response_cache import CACHE_FILE, ResponseCache
+from team_tracker import TeamTracker, ordinal_day
+
+# --- CONFIGURATION ---
+START_YEAR = 2015
+END_YEAR = 2025
+OUTPUT_FILE = "../data/replayed_features.csv"
+CHECK_TOLERANCE = 0.006  # the dataset stores rates rounded to 2-3 decimals
+
+# identifying columns of every emitted row, ahead of the extractors' columns
+GAME_COLUMNS = ['game_id', 'year', 'date', 'home_team', 'away_team', 'home_score', 'away_score', 'home_win']
+
+
+# --- GAME RECORDS ---
+
+def _record(game_id, year, game_date, home, away, home_score, away_score, box=None):
+    return {
+        'game_id': int(game_id), 'year': int(year), 'date': game_date, 'day': ordinal_day(game_date),
+        'home_team': int(home), 'away_team': int(away), 'home_score': int(home_score), 'away_score': int(away_score),
+        'home_win': int(home_score > away_score), 'box': box,
+    }
+
+
+def cached_games(years, cache):
+    """Final games of each season from cached schedules and boxscores; box is None where none was cached."""
+    from mlb_miner import get_season_schedule  # imports statsapi, which --source dataset must not need
+
+    for year in years:
+        for g in get_season_schedule(year, cache):
+            yield _record(g['game_id'], year, g['game_date'], g['home_id'], g['away_id'], g['home_score'],
+                          g['away_score'], cache.get_game(g['game_id']))
+
+
+def dataset_games(years=None):
+    """Games of the stored dataset in date order (stable, so same-day games keep their mined order), no boxscores."""
+    df = load_games(GAME_COLUMNS[:-1], years=years, categorical=False).sort_values('date', kind='stable')
+    records = zip(df['game_id'].tolist(), df['year'].tolist(), df['date'].dt.strftime('%Y-%m-%d').tolist(),
+                  df['home_team'].tolist(), df['away_team'].tolist(), df['home_score'].tolist(),
+                  df['away_score'].tolist())
+    for record in records:
+        yield _record(*record)
+
+
+def starters(box):
+    """(home, away) probable pitcher ids of a boxscore, None where missing."""
+    probable = (box or {}).get('gameData', {}).get('probablePitchers', {})
+    return probable.get('home', {}).get('id'), probable.get('away', {}).get('id')
+
+
+def batting(box, side):
+    try:
+        return box['liveData']['boxscore']['teams'][side]['teamStats']['batting']
+    except (KeyError, TypeError):
+        return {}
+
+
+# --- STATES ---
+
+class State:
+    """Shared state read by extractors; apply() folds in one final game after every extractor has read it."""
+    per_season = True  # rebuilt at the start of every season
+    needs_box = False
+
+    def apply(self, game):
+        raise NotImplementedError
+
+
+class TeamState(State):
+    """The miner's TeamTracker: season records, batting (from the boxscore, when there is one), rest and fatigue."""
+
+    def __init__(self):
+        self.tracker = TeamTracker()
+
+    def apply(self, game):
+        home_win = game['home_win']
+        self.tracker.update_stats(game['home_team'], batting(game['box'], 'home'), game['home_score'],
+                                  game['away_score'], game['date'], home_win)
+        self.tracker.update_stats(game['away_team'], batting(game['box'], 'away'), game['away_score'],
+                                  game['home_score'], game['date'], not home_win)
+
+
+class HistoryState(TeamState):
+    """A TeamTracker across every season, for results that carry over (last-10 records)."""
+    per_season = False
+
+
+class PitcherState(State):
+    needs_box = True
+
+    def __init__(self):
+        self.log = PitcherLog()
+
+    def apply(self, game):
+        lines = pitching_lines(game['box'].get('liveData', {}).get('boxscore', {}).get('teams', {}))
+        for pid in starters(game['box']):
+            if pid:
+                self.log.record_start(pid, game['date'], game['year'], lines.get(int(pid)))
+
+
+STATES = {
+    'teams': TeamState,
+    'history': HistoryState,
+    'pitchers': PitcherState,
+}
+
+
+# --- EXTRACTORS ---
+
+class Extractor:
+    """
+    Pre-game feature columns of one game. `state` names the STATES read; extract() returns one value per column, in
+    order, and must not change the states. A game is a dict of GAME_COLUMNS (date as "YYYY-MM-DD"), 'day' (ordinal
+    days since 1970) and 'box' (the raw boxscore, or None).
+    """
+    columns = ()
+    state = ()
+    needs_box = False
+
+    def extract(self, game, state):
+        raise NotImplementedError
+
+
+class Rest(Extractor):
+    columns = ('home_rest', 'away_rest', 'home_games_last_7', 'away_games_last_7')
+    state = ('teams',)
+
+    def extract(self, game, state):
+        tracker, home, away, game_date = state['teams'].tracker, game['home_team'], game['away_team'], game['date']
+        return (tracker.get_days_rest(home, game_date), tracker.get_days_rest(away, game_date),
+                tracker.get_recent_fatigue(home, game_date), tracker.get_recent_fatigue(away, game_date))
+
+
+class Momentum(Extractor):
+    columns = ('home_wins_last_10', 'home_wins_last_5', 'away_wins_last_10', 'away_wins_last_5', 'diff_wins_last_10')
+    state = ('history',)
+
+    def extract(self, game, state):
+        tracker = state['history'].tracker
+        home, away = tracker.get_momentum(game['home_team']), tracker.get_momentum(game['away_team'])
+        return (home['wins_last_10'], home['wins_last_5'], away['wins_last_10'], away['wins_last_5'],
+                home['wins_last_10'] - away['wins_last_10'])
+
+
+class Record(Extractor):
+    columns = ('home_win_pct', 'home_run_diff', 'away_win_pct', 'away_run_diff')
+    state = ('teams',)
+
+    def extract(self, game, state):
+        tracker = state['teams'].tracker
+        home, away = tracker.get_features(game['home_team']), tracker.get_features(game['away_team'])
+        return home['win_pct'], home['run_diff'], away['win_pct'], away['run_diff']
+
+
+class AvgRunsComingIn(Extractor):
+    columns = ('home_avg_runs_coming_in', 'away_avg_runs_coming_in')
+    state = ('teams',)
+
+    def extract(self, game, state):
+        tracker = state['teams'].tracker
+        out = []
+        for team in (game['home_team'], game['away_team']):
+            i = tracker.index(team)
+            out.append(tracker.runs_scored[i] / max(1, tracker.games_played[i]))
+        return tuple(out)
+
+
+class Batting(Extractor):
+    columns = ('home_ops', 'home_avg', 'away_ops', 'away_avg')
+    state = ('teams',)
+    needs_box = True
+
+    def extract(self, game, state):
+        tracker = state['teams'].tracker
+        home, away = tracker.get_features(game['home_team']), tracker.get_features(game['away_team'])
+        return home['ops'], home['avg'], away['ops'], away['avg']
+
+
+class StarterRates(Extractor):
+    columns = tuple(f'{side}_starter_{stat}' for side in ('home', 'away')
+                    for stat in ('era', 'whip', f'era_last_{LAST_N_STARTS}', f'whip_last_{LAST_N_STARTS}'))
+    state = ('pitchers',)
+    needs_box = True
+
+    def extract(self, game, state):
+        log = state['pitchers'].log
+        out = []
+        for pid in starters(game['box']):
+            stats = log.features(pid, game['year'])
+            out += [stats['era'], stats['whip'], stats[f'era_last_{LAST_N_STARTS}'],
+                    stats[f'whip_last_{LAST_N_STARTS}']]
+        return tuple(out)
+
+
+class Conditions(Extractor):
+    columns = ('venue_id', 'temp', 'wind_speed', 'condition')
+    needs_box = True
+
+    def __init__(self):
+        from mlb_miner import extract_weather_and_venue  # only boxscore replays (--source cache) read conditions
+        self.weather_and_venue = extract_weather_and_venue
+
+    def extract(self, game, state):
+        env = self.weather_and_venue(game['box'])
+        return env['venue_id'], env['temp'], env['wind_speed'], env['condition']
+
+
+EXTRACTORS = {
+    'rest': Rest,
+    'momentum': Momentum,
+    'record': Record,
+    'avg_runs': AvgRunsComingIn,
+    'batting': Batting,
+    'starters': StarterRates,
+    'conditions': Conditions,
+}
+
+
+# --- PIPELINE ---
+
+class Replay:
+    def __init__(self, extractors):
+        self.extractors = list(extractors)
+        self.columns = [col for e in self.extractors for col in e.columns]
+        if len(set(self.columns)) != len(self.columns):
+            raise ValueError("Extractors emit overlapping columns")
+        unknown = {name for e in self.extractors for name in e.state} - set(STATES)
+        if unknown:
+            raise ValueError(f"Unknown states: {sorted(unknown)}")
+        self.state_names = list(dict.fromkeys(name for e in self.extractors for name in e.state))
+        self.needs_box = (any(e.needs_box for e in self.extractors)
+                          or any(STATES[name].needs_box for name in self.state_names))
+
+    def run(self, games):
+        """One pass over games in date order: a frame of GAME_COLUMNS + every extractor column, one row per game."""
+        state = {name: STATES[name]() for name in self.state_names}
+        applied = list(state.values())
+        rows, season, self.skipped = [], None, 0
+        for game in games:
+            if game['year'] != season:
+                season = game['year']
+                for name in self.state_names:
+                    if STATES[name].per_season:
+                        state[name] = STATES[name]()
+                applied = list(state.values())
+            if self.needs_box and not game['box']:
+                self.skipped += 1
+                continue
+
+            row = [game[col] for col in GAME_COLUMNS]
+            for extractor in self.extractors:
+                row.extend(extractor.extract(game, state))
+            rows.append(row)
+            for s in applied:
+                s.apply(game)
+
+        df = pd.DataFrame(rows, columns=GAME_COLUMNS + self.columns)
+        df['date'] = pd.to_datetime(df['date'])
+        return df
+
+
+def check_against_dataset(replayed, years=None):
+    """Share of games whose replayed value matches the stored dataset, per column the dataset has."""
+    stored = load_games(categorical=False, years=years)
+    common = [c for c in replayed.columns if c in stored.columns and c not in GAME_COLUMNS]
+    merged = replayed[['game_id'] + common].merge(stored[['game_id'] + common], on='game_id',
+                                                  suffixes=('', '_stored'))
+    out = {}
+    for col in common:
+        if merged[col].dtype == object:
+            out[col] = (merged[col].astype(str) == merged[f'{col}_stored'].astype(str)).mean()
+        else:
+            out[col] = np.isclose(merged[col].astype(float), merged[f'{col}_stored'].astype(float),
+                                  atol=CHECK_TOLERANCE).mean()
+    return pd.Series(out, name='match'), len(merged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild feature columns in one pass over stored game records.")
+    parser.add_argument('--source', choices=['cache', 'dataset'], default='cache',
+                        help="raw boxscores from the response cache (offline) or scores from the stored dataset")
+    parser.add_argument('--cache', default=CACHE_FILE)
+    parser.add_argument('--years', type=int, nargs='+', default=None,
+                        help=f"seasons to replay (default: {START_YEAR}-{END_YEAR})")
+    parser.add_argument('--extractors', nargs='+', choices=sorted(EXTRACTORS), default=None,
+                        help="default: all, or every score-based one with --source dataset")
+    parser.add_argument('--check', action='store_true', help="compare the replayed columns with the stored dataset")
+    parser.add_argument('-o', '--output', default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    years = args.years or list(range(START_YEAR, END_YEAR + 1))
+    names = args.extractors or [name for name, cls in EXTRACTORS.items()
+                                if args.source == 'cache' or not cls.needs_box]
+    replay = Replay(EXTRACTORS[name]() for name in names)
+    if args.source == 'dataset' and replay.needs_box:
+        parser.error("the dataset source has no boxscores; drop the boxscore-based extractors")
+
+    start = time.perf_counter()
+    if args.source == 'cache':
+        cache = ResponseCache(args.cache, offline=True)
+        df = replay.run(cached_games(years, cache))
+        cache.close()
+    else:
+        df = replay.run(dataset_games(years))
+    elapsed = time.perf_counter() - start
+
+    df.to_csv(args.output, index=False)
+    print(f"Replayed {len(df):,} games through {', '.join(names)} in {elapsed:.2f}s "
+          f"({len(replay.columns)} columns, {replay.skipped} games without a boxscore skipped)")
+    print(f"Written to {args.output}")
+
+    if args.check:
+        match, n = check_against_dataset(df, years)
+        print(f"\nMatch with the stored dataset over {n:,} games:")
+        print(match.to_string(float_format=lambda v: f"{v:.2%}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Persistent, content-addressed cache of raw statsapi responses for the MLB miner.
+
+Responses are stored once as zlib-compressed canonical JSON in a sqlite file, addressed by the sha256 of that JSON.
+Request keys (a game's gamePk, a schedule chunk's date range) point at a blob. Final games and schedule chunks whose
+games are all settled never expire; anything still in progress is refetched once it is older than the TTL. In
+offline mode the network is never touched and misses simply come back as None.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from datetime import datetime, timedelta
+
+# --- CONFIGURATION ---
+CACHE_FILE = "../data/statsapi_cache.sqlite"
+IN_PROGRESS_TTL = 6 * 60 * 60  # seconds before a non-final response is refetched
+SETTLED_STATUSES = {'Final', 'Game Over', 'Completed Early', 'Postponed', 'Cancelled'}
+
+
+def game_key(game_pk):
+    return f"game:{game_pk}"
+
+
+def schedule_key(start_date, end_date):
+    return f"schedule:{start_date}:{end_date}"
+
+
+def is_final_box(box):
+    return box.get('gameData', {}).get('status', {}).get('abstractGameState') == 'Final'
+
+
+def is_settled_schedule(games, end_date):
+    """A schedule chunk is immutable once its date range has passed and every game in it is settled."""
+    if datetime.strptime(end_date, "%m/%d/%Y") >= datetime.now() - timedelta(days=1):
+        return False
+    return all(g.get('status') in SETTLED_STATUSES for g in games)
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_FILE, ttl=IN_PROGRESS_TTL, offline=False):
+        self.path = path
+        self.ttl = ttl
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                data BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                digest TEXT NOT NULL REFERENCES blobs(digest),
+                fetched_at REAL NOT NULL,
+                immutable INTEGER NOT NULL
+            );
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    # --- RAW ACCESS ---
+
+    def get(self, key):
+        """Returns the cached response, or None if missing or expired. Offline mode ignores the TTL."""
+        row = self.conn.execute(
+            "SELECT b.data, e.fetched_at, e.immutable FROM entries e JOIN blobs b ON b.digest = e.digest "
+            "WHERE e.key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        data, fetched_at, immutable = row
+        if not immutable and not self.offline and time.time() - fetched_at > self.ttl:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(zlib.decompress(data))
+
+    def put(self, key, obj, immutable):
+        payload = json.dumps(obj, sort_keys=True, separators=(',', ':')).encode()
+        digest = hashlib.sha256(payload).hexdigest()
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO blobs (digest, data) VALUES (?, ?)",
+                              (digest, zlib.compress(payload, 6)))
+            self.conn.execute("INSERT OR REPLACE INTO entries (key, digest, fetched_at, immutable) VALUES (?, ?, ?, ?)",
+                              (key, digest, time.time(), int(bool(immutable))))
+
+    # --- STATSAPI RESPONSES ---
+
+    def get_game(self, game_pk):
+        return self.get(game_key(game_pk))
+
+    def put_game(self, game_pk, box):
+        self.put(game_key(game_pk), box, immutable=is_final_box(box))
+
+    def schedule(self, start_date, end_date, fetch):
+        """Cached schedule chunk; fetch() is only called on a miss and never in offline mode."""
+        key = schedule_key(start_date, end_date)
+        games = self.get(key)
+        if games is not None or self.offline:
+            return games
+
+        games = fetch()
+        if games is not None:
+            self.put(key, games, immutable=is_settled_schedule(games, end_date))
+        return games
@@ -0,0 +1,128 @@
+"""
+Vectorized rolling team features (momentum, fatigue, rest, runs coming in).
+
+Games are melted into a long team-game table sorted by team and processing order, and every feature is a lagged
+window over that table computed with cumulative sums and searchsorted, with no Python loop over games. Each
+function reproduces the semantics of the loop that originally produced the column:
+
+- wins_last_5/10: add_momentum.py, over the whole history ordered by (date, game_id)
+- rest, games_last_7: the miner's TeamTracker (team_tracker.py), reset every season
+- avg_runs_coming_in: fix_avg_runs_coming_in.py, reset every season, ordered by (year, date)
+"""
+
+import numpy as np
+import pandas as pd
+
+NO_HISTORY_REST = 5  # days of rest reported before a team's first game of the season
+FATIGUE_WINDOW = 7  # days counted by games_last_7
+FATIGUE_HISTORY = 10  # TeamTracker only remembers its last 10 game dates
+
+
+# --- LONG TEAM-GAME TABLE ---
+
+def _ordinal_days(dates):
+    return pd.to_datetime(pd.Series(dates)).to_numpy().astype('datetime64[D]').astype(np.int64)
+
+
+def team_game_table(df, order, by_season=False):
+    """
+    Melts games into one row per (game, team), sorted by team (and season) then processing order.
+
+    order: positions of df rows in processing order.
+    Returns a dict of NumPy columns: row (df position), is_home, group, start (first index of the row's group),
+    date (ordinal days), win, runs.
+    """
+    n = len(df)
+    rank = np.empty(n, dtype=np.int64)
+    rank[np.asarray(order)] = np.arange(n)
+
+    home_win = df['home_win'].to_numpy().astype(np.int64)
+    team = np.concatenate([df['home_team'].to_numpy(), df['away_team'].to_numpy()]).astype(np.int64)
+    season = np.tile(df['year'].to_numpy().astype(np.int64), 2) if by_season else np.zeros(2 * n, dtype=np.int64)
+    rank2 = np.tile(rank, 2)
+
+    idx = np.lexsort((rank2, season, team))
+    team, season = team[idx], season[idx]
+    new_group = np.r_[True, (team[1:] != team[:-1]) | (season[1:] != season[:-1])]
+    group = np.cumsum(new_group) - 1
+    starts = np.flatnonzero(new_group)
+
+    return {
+        'row': np.tile(np.arange(n), 2)[idx],
+        'is_home': np.r_[np.ones(n, dtype=bool), np.zeros(n, dtype=bool)][idx],
+        'group': group,
+        'start': starts[group],
+        'date': np.tile(_ordinal_days(df['date']), 2)[idx],
+        'win': np.r_[home_win, 1 - home_win][idx],
+        'runs': np.concatenate([df['home_score'].to_numpy(), df['away_score'].to_numpy()]).astype(np.int64)[idx],
+    }
+
+
+def lagged_window_sum(values, start, window=None):
+    """Sum of the previous `window` values (all previous if None) within each group, excluding the current row."""
+    cs = np.r_[0, np.cumsum(values)]
+    i = np.arange(len(values))
+    lo = start if window is None else np.maximum(start, i - window)
+    return cs[i] - cs[lo]
+
+
+def _to_home_away(long, values, name, index):
+    """Scatters a long-table column back to home_<name>/away_<name> columns aligned with the games frame."""
+    n = len(index)
+    home = np.empty(n, dtype=values.dtype)
+    away = np.empty(n, dtype=values.dtype)
+    home[long['row'][long['is_home']]] = values[long['is_home']]
+    away[long['row'][~long['is_home']]] = values[~long['is_home']]
+    return {f'home_{name}': pd.Series(home, index=index), f'away_{name}': pd.Series(away, index=index)}
+
+
+# --- FEATURES ---
+
+def momentum_features(df):
+    """home/away_wins_last_10 and _last_5, carried across seasons."""
+    order = np.lexsort((df['game_id'].to_numpy(), _ordinal_days(df['date'])))
+    long = team_game_table(df, order)
+    out = {}
+    for window in (10, 5):
+        wins = lagged_window_sum(long['win'], long['start'], window)
+        out.update(_to_home_away(long, wins, f'wins_last_{window}', df.index))
+    return pd.DataFrame(out)[['home_wins_last_10', 'home_wins_last_5', 'away_wins_last_10', 'away_wins_last_5']]
+
+
+def fatigue_features(df):
+    """home/away_rest and home/away_games_last_7, reset every season."""
+    order = np.lexsort((np.arange(len(df)), _ordinal_days(df['date'])))
+    long = team_game_table(df, order, by_season=True)
+    date, start, group = long['date'], long['start'], long['group']
+    i = np.arange(len(date))
+
+    # days of rest since the team's previous game this season
+    prev_date = np.where(i > start, date[np.maximum(i - 1, 0)], date)
+    rest = np.where(i > start, np.maximum(0, date - prev_date - 1), NO_HISTORY_REST)
+
+    # games in the previous 7 days, among the last 10 games remembered by the tracker
+    key = group * 1_000_000 + date
+    first_in_window = np.searchsorted(key, key - FATIGUE_WINDOW, side='left')
+    first_today = np.searchsorted(key, key, side='left')
+    lo = np.maximum(first_in_window, np.maximum(start, i - FATIGUE_HISTORY))
+    games_last_7 = np.maximum(0, np.minimum(first_today, i) - lo)
+
+    out = {}
+    out.update(_to_home_away(long, rest, 'rest', df.index))
+    out.update(_to_home_away(long, games_last_7, 'games_last_7', df.index))
+    return pd.DataFrame(out)[['home_rest', 'away_rest', 'home_games_last_7', 'away_games_last_7']]
+
+
+def avg_runs_coming_in(df):
+    """home/away_avg_runs_coming_in: runs per game before this one, reset every season."""
+    order = np.lexsort((np.arange(len(df)), _ordinal_days(df['date']), df['year'].to_numpy()))
+    long = team_game_table(df, order, by_season=True)
+    runs = lagged_window_sum(long['runs'], long['start'])
+    games = np.arange(len(runs)) - long['start']
+    avg = runs / np.maximum(1, games)
+    return pd.DataFrame(_to_home_away(long, avg, 'avg_runs_coming_in', df.index))
+
+
+def rolling_features(df):
+    """Every rolling team feature for a games frame, aligned with df.index."""
+    return pd.concat([fatigue_features(df), momentum_features(df), avg_runs_coming_in(df)], axis=1)
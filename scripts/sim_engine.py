@@ -0,0 +1,368 @@
+"""
+Vectorized Monte Carlo engine for season win-total simulations.
+
+Games are drawn in chunks as an (n_sims x n_games) Bernoulli matrix and turned into per-team win counts with a
+signed home/away incidence matrix, so a whole chunk of seasons is scored with one matrix multiply. Win totals are
+folded into per-team integer histograms as they are produced, which keeps memory flat no matter how many seasons
+are simulated.
+
+Large runs are split into fixed-size shards, each drawing from its own np.random.SeedSequence child stream. Shards
+only return WinTotals (win histograms plus pairwise and ranking counts), which add exactly, so a seed gives
+bit-identical results for any worker count. A WinTotals saves to one small .npz that the app reads directly.
+
+Path-dependent seasons (SeasonPath, simulate_path_dependent) let simulated results feed back into the model:
+every sim carries each team's last-10 results as a bit ring, and each day's games are re-scored for all sims at
+once from those bits before they are drawn.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_SEED = 42
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_SHARD_SIZE = 50000
+
+
+# --- SCHEDULE ENCODING ---
+
+def encode_schedule(home_teams, away_teams):
+    """Maps team ids to dense 0..n_teams-1 indexes. Returns (team_ids, home_idx, away_idx)."""
+    home_teams = np.asarray(home_teams)
+    away_teams = np.asarray(away_teams)
+    team_ids, codes = np.unique(np.concatenate([home_teams, away_teams]), return_inverse=True)
+    n_games = len(home_teams)
+    return team_ids, codes[:n_games], codes[n_games:]
+
+
+def incidence_matrix(home_idx, away_idx, n_teams):
+    """
+    Returns (signed, away_games) where signed is a float32 (n_games x n_teams) matrix holding +1 for the home team
+    and -1 for the away team. For a 0/1 home-win matrix W, team wins are W @ signed + away_games.
+    """
+    n_games = len(home_idx)
+    signed = np.zeros((n_games, n_teams), dtype=np.float32)
+    rows = np.arange(n_games)
+    signed[rows, home_idx] = 1.0
+    signed[rows, away_idx] = -1.0
+    away_games = np.bincount(away_idx, minlength=n_teams).astype(np.float32)
+    return signed, away_games
+
+
+def games_per_team(home_idx, away_idx, n_teams):
+    return np.bincount(home_idx, minlength=n_teams) + np.bincount(away_idx, minlength=n_teams)
+
+
+# --- STREAMING SUMMARY ---
+
+class WinTotals:
+    """
+    Streaming summary of simulated seasons, exact and mergeable across shards, in O(n_teams^2 + n_teams * max_wins)
+    memory however many seasons are added:
+
+    counts[t, w]: seasons in which team t won w games
+    ahead[i, j]: seasons in which team i won more games than team j
+    rank_counts[t, r]: seasons in which exactly r teams won more games than team t
+    """
+
+    def __init__(self, n_teams, max_wins):
+        self.n_teams = n_teams
+        self.max_wins = max_wins
+        self.counts = np.zeros((n_teams, max_wins + 1), dtype=np.int64)
+        self.ahead = np.zeros((n_teams, n_teams), dtype=np.int64)
+        self.rank_counts = np.zeros((n_teams, n_teams), dtype=np.int64)
+        self._offsets = np.arange(n_teams) * (max_wins + 1)
+
+    @property
+    def n_sims(self):
+        return int(self.counts[0].sum()) if self.n_teams else 0
+
+    def update(self, wins):
+        """Adds a (n_sims x n_teams) integer matrix of win totals."""
+        wins = np.asarray(wins, dtype=np.int64)
+        flat = (wins + self._offsets).ravel()
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+
+        ahead = wins[:, :, None] > wins[:, None, :]
+        self.ahead += ahead.sum(axis=0)
+        rank = ahead.sum(axis=1)  # teams with more wins, per season and team
+        flat = (rank + np.arange(self.n_teams) * self.n_teams).ravel()
+        self.rank_counts += np.bincount(flat, minlength=self.rank_counts.size).reshape(self.rank_counts.shape)
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.ahead += other.ahead
+        self.rank_counts += other.rank_counts
+        return self
+
+    # --- SUMMARIES ---
+
+    def distribution(self):
+        """(n_teams x max_wins+1) probability of each win total."""
+        return self.counts / self.n_sims
+
+    def mean(self):
+        return (self.counts @ np.arange(self.max_wins + 1)) / self.n_sims
+
+    def variance(self):
+        deviation = np.arange(self.max_wins + 1) - self.mean()[:, None]
+        return (self.counts * deviation ** 2).sum(axis=1) / self.n_sims
+
+    def prob_at_least(self, wins):
+        """P(team wins >= `wins`), for a scalar or one threshold per team."""
+        wins = np.broadcast_to(np.asarray(wins), (self.n_teams,))
+        tail = np.cumsum(self.counts[:, ::-1], axis=1)[:, ::-1]  # tail[t, w]: seasons with at least w wins
+        at_least = np.where(wins <= 0, self.n_sims,
+                            tail[np.arange(self.n_teams), np.clip(wins, 0, self.max_wins)])
+        return np.where(wins > self.max_wins, 0, at_least) / self.n_sims
+
+    def prob_ahead(self):
+        """(n_teams x n_teams) P(team i wins more games than team j)."""
+        return self.ahead / self.n_sims
+
+    def quantile(self, q):
+        """Same result as pandas' default (linear) quantile over the raw samples."""
+        n = self.n_sims
+        pos = (n - 1) * q
+        lo = int(np.floor(pos))
+        hi = min(lo + 1, n - 1)
+        frac = pos - lo
+
+        cum = np.cumsum(self.counts, axis=1)
+        out = np.empty(self.n_teams)
+        for t in range(self.n_teams):
+            v_lo, v_hi = np.searchsorted(cum[t], [lo, hi], side='right')
+            out[t] = v_lo + frac * (v_hi - v_lo)
+        return out
+
+    # --- PERSISTENCE ---
+
+    def save(self, path, team_ids):
+        """Writes the summary and the team id of each row to one compressed .npz."""
+        np.savez_compressed(path, team_ids=np.asarray(team_ids), counts=self.counts, ahead=self.ahead,
+                            rank_counts=self.rank_counts)
+
+    @classmethod
+    def load(cls, path):
+        """(WinTotals, team_ids) from a file written by save()."""
+        with np.load(path) as data:
+            n_teams, n_totals = data['counts'].shape
+            totals = cls(n_teams, n_totals - 1)
+            totals.counts = data['counts']
+            totals.ahead = data['ahead']
+            totals.rank_counts = data['rank_counts']
+            return totals, data['team_ids']
+
+
+# --- SIMULATION ---
+
+def iter_win_chunks(home_win_prob, home_idx, away_idx, n_teams, n_sims, chunk_size=DEFAULT_CHUNK_SIZE, rng=None):
+    """Yields (chunk x n_teams) int32 win-total matrices until n_sims seasons have been simulated."""
+    if rng is None:
+        rng = np.random.default_rng(DEFAULT_SEED)
+
+    probs = np.asarray(home_win_prob, dtype=np.float32)
+    signed, away_games = incidence_matrix(home_idx, away_idx, n_teams)
+
+    done = 0
+    while done < n_sims:
+        size = min(chunk_size, n_sims - done)
+        home_wins = (rng.random((size, len(probs)), dtype=np.float32) < probs).astype(np.float32)
+        wins = home_wins @ signed + away_games
+        yield wins.astype(np.int32)
+        done += size
+
+
+def simulate_win_totals(home_win_prob, home_idx, away_idx, n_teams, n_sims, chunk_size=DEFAULT_CHUNK_SIZE,
+                        seed=DEFAULT_SEED):
+    """Runs n_sims seasons from a single random stream and returns their WinTotals. seed may be a SeedSequence."""
+    totals = WinTotals(n_teams, int(games_per_team(home_idx, away_idx, n_teams).max()))
+    rng = np.random.default_rng(seed)
+    for wins in iter_win_chunks(home_win_prob, home_idx, away_idx, n_teams, n_sims, chunk_size, rng):
+        totals.update(wins)
+    return totals
+
+
+# --- SHARDED SIMULATION ---
+
+def _simulate_shard(task):
+    home_win_prob, home_idx, away_idx, n_teams, n_sims, chunk_size, seed_seq = task
+    return simulate_win_totals(home_win_prob, home_idx, away_idx, n_teams, n_sims, chunk_size, seed_seq)
+
+
+def shard_sizes(n_sims, shard_size=DEFAULT_SHARD_SIZE):
+    return [min(shard_size, n_sims - start) for start in range(0, n_sims, shard_size)]
+
+
+def iter_shard_totals(home_win_prob, home_idx, away_idx, n_teams, n_sims, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+                      chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED):
+    """
+    Yields one WinTotals per shard. The shard layout and the seed stream of each shard depend only on n_sims,
+    shard_size and seed, never on workers.
+    """
+    sizes = shard_sizes(n_sims, shard_size)
+    children = np.random.SeedSequence(seed).spawn(len(sizes))
+    home_win_prob = np.asarray(home_win_prob, dtype=np.float32)
+    tasks = [(home_win_prob, home_idx, away_idx, n_teams, size, chunk_size, child)
+             for size, child in zip(sizes, children)]
+
+    yield from _map_shards(_simulate_shard, tasks, workers)
+
+
+def _map_shards(fn, tasks, workers):
+    if workers == 1:
+        for task in tasks:
+            yield fn(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(fn, tasks)
+
+
+def simulate_sharded(home_win_prob, home_idx, away_idx, n_teams, n_sims, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+                     chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED):
+    """Runs n_sims seasons across a process pool (workers=None uses every core) and merges the shard summaries."""
+    totals = WinTotals(n_teams, int(games_per_team(home_idx, away_idx, n_teams).max()))
+    for shard in iter_shard_totals(home_win_prob, home_idx, away_idx, n_teams, n_sims, workers, shard_size,
+                                   chunk_size, seed):
+        totals.merge(shard)
+    return totals
+
+
+# --- PATH-DEPENDENT SIMULATION ---
+
+RECENT_GAMES = 10  # results remembered per team for wins_last_10
+FATIGUE_WINDOW = 7  # days counted by games_last_7
+MOMENTUM_VALUES = np.arange(-RECENT_GAMES, RECENT_GAMES + 1)  # every possible diff_wins_last_10
+_POPCOUNT = np.array([bin(b).count('1') for b in range(1 << RECENT_GAMES)], dtype=np.int8)
+_RECENT_MASK = (1 << RECENT_GAMES) - 1
+
+
+class SeasonPath:
+    """
+    A schedule in simulation order. Games are grouped into batches by day; a team playing twice on one day
+    (doubleheaders) has its second game in a later batch of that day, so within a batch every team appears at most
+    once and each team's games keep their schedule order.
+
+    order: schedule positions in simulation order; home_idx/away_idx/day are already in that order.
+    bounds: batch b covers games bounds[b]:bounds[b + 1].
+    home_games_last_7/away_games_last_7: games each side played in the previous 7 days (among its last 10 this
+    season), the TeamTracker definition. The schedule alone fixes them, so they are replayed once, not per sim.
+    """
+
+    def __init__(self, days, home_idx, away_idx, n_teams):
+        days = np.asarray(days, dtype=np.int64)
+        home_idx = np.asarray(home_idx)
+        away_idx = np.asarray(away_idx)
+        self.n_teams = n_teams
+
+        by_day = np.argsort(days, kind='stable')
+        rounds = np.zeros(len(days), dtype=np.int64)
+        next_round = {}  # (day, team) -> first round the team is free in
+        for g in by_day:
+            d, h, a = days[g], home_idx[g], away_idx[g]
+            r = max(next_round.get((d, h), 0), next_round.get((d, a), 0))
+            rounds[g] = r
+            next_round[d, h] = next_round[d, a] = r + 1
+
+        self.order = np.lexsort((np.arange(len(days)), rounds, days))
+        self.day = days[self.order]
+        self.home_idx = home_idx[self.order]
+        self.away_idx = away_idx[self.order]
+        r = rounds[self.order]
+        self.bounds = np.flatnonzero(np.r_[True, (self.day[1:] != self.day[:-1]) | (r[1:] != r[:-1]), True])
+        self.home_games_last_7, self.away_games_last_7 = self._fatigue()
+
+    def batches(self):
+        return zip(self.bounds[:-1], self.bounds[1:])
+
+    def start_batch(self, day):
+        """Index of the first batch played on or after ordinal `day`."""
+        return int(np.searchsorted(self.day[self.bounds[:-1]], day, side='left'))
+
+    def _fatigue(self):
+        recent = np.full((self.n_teams, RECENT_GAMES), -1, dtype=np.int64)  # last game dates per team, newest last
+        out = np.zeros((2, len(self.day)), dtype=np.int64)
+        for lo, hi in self.batches():
+            day = self.day[lo]
+            for side, teams in enumerate((self.home_idx[lo:hi], self.away_idx[lo:hi])):
+                age = day - recent[teams]
+                out[side, lo:hi] = ((recent[teams] >= 0) & (age > 0) & (age <= FATIGUE_WINDOW)).sum(axis=1)
+            for teams in (self.home_idx[lo:hi], self.away_idx[lo:hi]):
+                recent[teams, :-1] = recent[teams, 1:]
+                recent[teams, -1] = day
+        return np.minimum(out[0], 7), np.minimum(out[1], 7)
+
+
+def wins_last_10(win_bits):
+    """Wins among the last 10 results held in a win-bit field (newest result in bit 0)."""
+    return _POPCOUNT[np.asarray(win_bits) & _RECENT_MASK]
+
+
+def iter_path_batches(response, path, bits, rng, start=0):
+    """
+    Plays the batches of one chunk of path-dependent seasons from batch `start` on, yielding (lo, hi, home_win) per
+    batch: home_win is the (chunk x hi - lo) bool outcome matrix of games lo:hi. `bits` is the (chunk x n_teams)
+    uint16 last-10 ring of each sim and is updated in place. Every batch is scored for all sims at once: the
+    diff_wins_last_10 of each (sim, game) pair indexes that game's response row.
+    """
+    size = len(bits)
+    for lo, hi in zip(path.bounds[start:-1], path.bounds[start + 1:]):
+        home, away = path.home_idx[lo:hi], path.away_idx[lo:hi]
+        momentum = _POPCOUNT[bits[:, home]] - _POPCOUNT[bits[:, away]]
+        probs = response[np.arange(lo, hi), momentum + RECENT_GAMES]
+        home_win = rng.random((size, hi - lo), dtype=np.float32) < probs
+
+        bits[:, home] = ((bits[:, home] << 1) | home_win) & _RECENT_MASK
+        bits[:, away] = ((bits[:, away] << 1) | ~home_win) & _RECENT_MASK
+        yield lo, hi, home_win
+
+
+def iter_path_win_chunks(response, path, initial_bits, n_sims, chunk_size=DEFAULT_CHUNK_SIZE, rng=None):
+    """
+    Yields (chunk x n_teams) int32 win-total matrices of path-dependent seasons until n_sims have been simulated.
+
+    response: (n_games x len(MOMENTUM_VALUES)) home-win probabilities in path order, one column per value of
+    diff_wins_last_10 with every other feature fixed. initial_bits: each team's win bits entering the season.
+    Each chunk keeps its own (chunk x n_teams) state, so memory grows with chunk_size, not n_sims.
+    """
+    if rng is None:
+        rng = np.random.default_rng(DEFAULT_SEED)
+    response = np.asarray(response, dtype=np.float32)
+    initial_bits = np.asarray(initial_bits, dtype=np.uint16) & _RECENT_MASK
+
+    done = 0
+    while done < n_sims:
+        size = min(chunk_size, n_sims - done)
+        bits = np.tile(initial_bits, (size, 1))
+        wins = np.zeros((size, path.n_teams), dtype=np.int32)
+        for lo, hi, home_win in iter_path_batches(response, path, bits, rng):
+            wins[:, path.home_idx[lo:hi]] += home_win
+            wins[:, path.away_idx[lo:hi]] += ~home_win
+        yield wins
+        done += size
+
+
+def simulate_path_dependent(response, path, initial_bits, n_sims, chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED):
+    """Runs n_sims path-dependent seasons from a single random stream and returns their WinTotals."""
+    n_teams = path.n_teams
+    totals = WinTotals(n_teams, int(games_per_team(path.home_idx, path.away_idx, n_teams).max()))
+    rng = np.random.default_rng(seed)
+    for wins in iter_path_win_chunks(response, path, initial_bits, n_sims, chunk_size, rng):
+        totals.update(wins)
+    return totals
+
+
+def _simulate_path_shard(task):
+    response, path, initial_bits, n_sims, chunk_size, seed_seq = task
+    return simulate_path_dependent(response, path, initial_bits, n_sims, chunk_size, seed_seq)
+
+
+def iter_path_shard_totals(response, path, initial_bits, n_sims, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+                           chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED):
+    """iter_shard_totals for path-dependent seasons: one WinTotals per shard, independent of workers."""
+    sizes = shard_sizes(n_sims, shard_size)
+    children = np.random.SeedSequence(seed).spawn(len(sizes))
+    response = np.asarray(response, dtype=np.float32)
+    tasks = [(response, path, initial_bits, size, chunk_size, child) for size, child in zip(sizes, children)]
+    yield from _map_shards(_simulate_path_shard, tasks, workers)
@@ -1,8 +1,20 @@
-import pandas as pd
+import argparse
+import os
+
 import numpy as np
-import joblib
+import pandas as pd
 from tqdm import tqdm
 
+from dataset_store import load_games
+from feature_store import FeatureStore
+from features import (FEATURES, TeamTable, check_feature_order, feature_response, matchup_feature_matrix,
+                      predict_home_win)
+from model_artifact import load_model
+from sim_engine import (DEFAULT_SHARD_SIZE, MOMENTUM_VALUES, SeasonPath, WinTotals, encode_schedule, games_per_team,
+                        iter_path_shard_totals, iter_shard_totals, shard_sizes)
+
+SEED = 42  # fixed seed so projections are reproducible
+
 TEAM_ID_MAP = {     # map team id to team name
     108: 'Los Angeles Angels', 109: 'Arizona Diamondbacks', 110: 'Baltimore Orioles',
     111: 'Boston Red Sox', 112: 'Chicago Cubs', 113: 'Cincinnati Reds',
@@ -16,71 +28,117 @@ TEAM_ID_MAP = {     # map team id to team name
     146: 'Miami Marlins', 147: 'New York Yankees', 158: 'Milwaukee Brewers'
 }
 
-print("Loading model and statistics...")
-model = joblib.load('../data/random_forest.pkl')
-team_stats = pd.read_csv('../data/team_stats.csv')
-
-df = pd.read_csv('../data/mlb_2015_2025_dataset.csv')      # grab only 2025 stats
-df['date'] = pd.to_datetime(df['date'])
-schedule_2025 = df[df['date'].dt.year == 2025].copy()
-
-if len(schedule_2025) == 0:
-    print("Error: No games found for 2025 in the dataset.")
-    exit()
-
-print("Preparing 2025 schedule features...")
-schedule_2025 = schedule_2025.merge(
-    team_stats, left_on='home_team', right_on='team_name', suffixes=('', '_h')
-)
-
-schedule_2025 = schedule_2025.merge(
-    team_stats, left_on='away_team', right_on='team_name', suffixes=('_h', '_a')
-)
-
-# differential stats
-schedule_2025['diff_run_diff'] = schedule_2025['run_diff_h'] - schedule_2025['run_diff_a']
-schedule_2025['diff_ops'] = schedule_2025['ops_h'] - schedule_2025['ops_a']
-schedule_2025['diff_whip'] = schedule_2025['whip_h'] - schedule_2025['whip_a']
-schedule_2025['diff_wins_last_10'] = schedule_2025['wins_last_10_h'] - schedule_2025['wins_last_10_a']
-schedule_2025['diff_games_last_7'] = schedule_2025['games_last_7_h'] - schedule_2025['games_last_7_a']
-schedule_2025['park_factor'] = schedule_2025['park_factor_h']
-
-features = [
-    'temp', 'wind_speed', 'diff_run_diff', 'diff_ops',
-    'diff_whip', 'diff_wins_last_10', 'diff_games_last_7', 'park_factor'
-]
-
-X = schedule_2025[features].fillna(0)
-schedule_2025['home_win_prob'] = model.predict_proba(X)[:, 1]
-
-# Monte Carlo Simulation
-n_simulations = 100000
-sim_results = []
-
-print(f"Simulating the 2025 season {n_simulations} times...")
-for i in tqdm(range(n_simulations)):
-    draws = np.random.rand(len(schedule_2025))
-    schedule_2025['sim_win'] = (schedule_2025['home_win_prob'] > draws).astype(int)
-
-    h_wins = schedule_2025.groupby('home_team')['sim_win'].sum()
-    a_wins = schedule_2025.groupby('away_team')['sim_win'].apply(lambda x: (x == 0).sum())
-
-    total_wins = h_wins.add(a_wins, fill_value=0)
-    sim_results.append(total_wins)
-
-results_df = pd.concat(sim_results, axis=1)
-
-summary = pd.DataFrame({
-    'Avg_Wins': results_df.mean(axis=1),
-    'P10_Wins': results_df.quantile(0.1, axis=1),
-    'P90_Wins': results_df.quantile(0.9, axis=1),
-})
-
-summary.index = summary.index.map(TEAM_ID_MAP)
-summary = summary.sort_values('Avg_Wins', ascending=False)
-
-print("\n--- 2025 MONTE CARLO PROJECTIONS ---")
-print(summary.round(1))
 
-summary.to_csv('../data/projections_2025.csv')
-print("\nResults saved to 'projections_2025.csv'")
\ No newline at end of file
+def prepare_schedule(point_in_time=False):
+    print("Loading model and statistics...")
+    model = load_model('../data/models/random_forest')
+
+    # grab only the 2025 schedule and the columns the model needs
+    schedule_2025 = load_games(['date', 'home_team', 'away_team', 'temp', 'wind_speed'], years=[2025],
+                               categorical=False)
+
+    if len(schedule_2025) == 0:
+        print("Error: No games found for 2025 in the dataset.")
+        exit()
+
+    print("Preparing 2025 schedule features...")
+    check_feature_order(model)
+    if point_in_time:
+        # each game scored with both teams' stats entering its date (games past the newest result use the latest)
+        X = FeatureStore.load().matchup_feature_matrix(schedule_2025['home_team'], schedule_2025['away_team'],
+                                                       schedule_2025['date'], schedule_2025['temp'],
+                                                       schedule_2025['wind_speed'])
+    else:
+        team_stats = pd.read_csv('../data/team_stats.csv')
+        X = matchup_feature_matrix(schedule_2025['home_team'], schedule_2025['away_team'], schedule_2025['temp'],
+                                   schedule_2025['wind_speed'], TeamTable(team_stats))
+    X = np.nan_to_num(X, nan=0.0)
+    schedule_2025['home_win_prob'] = predict_home_win(model, X)
+    return schedule_2025, X, model
+
+
+def summarize(totals, team_ids):
+    return pd.DataFrame({
+        'Avg_Wins': totals.mean(),
+        'P10_Wins': totals.quantile(0.1),
+        'P90_Wins': totals.quantile(0.9),
+    }, index=pd.Index(team_ids, name='home_team'))
+
+
+def simulate_season(schedule_2025, n_simulations, workers=1, seed=SEED):
+    """
+    Monte Carlo simulation, sharded across `workers` processes. Returns (WinTotals, team_ids); results only depend
+    on the seed.
+    """
+    team_ids, home_idx, away_idx = encode_schedule(schedule_2025['home_team'], schedule_2025['away_team'])
+    n_teams = len(team_ids)
+    totals = WinTotals(n_teams, int(games_per_team(home_idx, away_idx, n_teams).max()))
+    shards = iter_shard_totals(schedule_2025['home_win_prob'].to_numpy(), home_idx, away_idx, n_teams,
+                               n_simulations, workers=workers, seed=seed)
+
+    print(f"Simulating the 2025 season {n_simulations} times on {workers or os.cpu_count()} worker(s)...")
+    for shard in tqdm(shards, total=len(shard_sizes(n_simulations, DEFAULT_SHARD_SIZE))):
+        totals.merge(shard)
+    return totals, team_ids
+
+
+def simulate_dynamic_season(schedule_2025, X, model, n_simulations, workers=1, seed=SEED):
+    """
+    Path-dependent Monte Carlo: simulated results update each team's wins_last_10 and every day's games are re-scored
+    with it. games_last_7 comes from the 2025 schedule itself; the other features stay at their snapshot values.
+    Returns (WinTotals, team_ids).
+    """
+    team_ids, home_idx, away_idx = encode_schedule(schedule_2025['home_team'], schedule_2025['away_team'])
+    n_teams = len(team_ids)
+    days = pd.to_datetime(schedule_2025['date']).to_numpy().astype('datetime64[D]').astype(np.int64)
+    path = SeasonPath(days, home_idx, away_idx, n_teams)
+
+    # every game scored once for each possible diff_wins_last_10; the sims then only index this table
+    X = X[path.order]
+    X[:, FEATURES.index('diff_games_last_7')] = path.home_games_last_7 - path.away_games_last_7
+    response = feature_response(model, X, 'diff_wins_last_10', MOMENTUM_VALUES)
+    opening_day = np.datetime64(int(path.day[0]), 'D')
+    initial_bits = FeatureStore.load().win_bits(team_ids, np.full(n_teams, opening_day))
+
+    totals = WinTotals(n_teams, int(games_per_team(home_idx, away_idx, n_teams).max()))
+    shards = iter_path_shard_totals(response, path, initial_bits, n_simulations, workers=workers, seed=seed)
+
+    print(f"Simulating the 2025 season {n_simulations} times (path-dependent) on {workers or os.cpu_count()} "
+          f"worker(s)...")
+    for shard in tqdm(shards, total=len(shard_sizes(n_simulations, DEFAULT_SHARD_SIZE))):
+        totals.merge(shard)
+    return totals, team_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo projections of 2025 win totals.")
+    parser.add_argument('--sims', type=int, default=100000, help="number of simulated seasons")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes (0 = all cores)")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--point-in-time', action='store_true',
+                        help="score each game with the teams' stats entering its date instead of team_stats.csv")
+    parser.add_argument('--dynamic', action='store_true',
+                        help="let simulated results feed back into wins_last_10 (games_last_7 comes from the schedule)")
+    args = parser.parse_args()
+
+    schedule_2025, X, model = prepare_schedule(args.point_in_time)
+    if args.dynamic:
+        totals, team_ids = simulate_dynamic_season(schedule_2025, X, model, args.sims, workers=args.workers or None,
+                                                   seed=args.seed)
+    else:
+        totals, team_ids = simulate_season(schedule_2025, args.sims, workers=args.workers or None, seed=args.seed)
+
+    summary = summarize(totals, team_ids)
+    summary.index = summary.index.map(TEAM_ID_MAP)
+    summary = summary.sort_values('Avg_Wins', ascending=False)
+
+    print("\n--- 2025 MONTE CARLO PROJECTIONS ---")
+    print(summary.round(1))
+
+    summary.to_csv('../data/projections_2025.csv')
+    totals.save('../data/projections_2025.npz', team_ids)
+    print("\nResults saved to 'projections_2025.csv' (full win distributions in 'projections_2025.npz')")
+
+
+if __name__ == "__main__":
+    main()
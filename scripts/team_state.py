@@ -0,0 +1,287 @@
+"""
+Incremental per-team state, updated one final game at a time, with point-in-time queries.
+
+Every applied game appends one state row per team to a columnar log: season-to-date games, runs scored and
+allowed, the last ten results as a bit field, the last ten game dates, and the team's OPS and starter WHIP. Every
+column describes the team after the row's game: the miner records OPS and WHIP before each game, so a row takes
+them from the team's next game of the season once that is applied, and until then keeps its own game's values, the
+newest known. A per-team index of log rows and their days (NumPy arrays grown by doubling, in date order because
+games are applied in date order) answers as_of(date) with one binary search per team, so the app and the simulator
+get current stats without rescanning the history. Aggregates follow the dataset's conventions: run differential and
+game dates reset every season (TeamTracker), the last-10 record carries across seasons (add_momentum.py).
+
+    python team_state.py build      # replay the dataset into ../data/team_state.npz
+    python team_state.py update     # apply only games newer than the stored state
+    python team_state.py snapshot   # write ../data/team_stats.csv as of the newest game (or --date)
+
+Outside the regular season (fewer than half the teams played in the last FATIGUE_WINDOW days, as after the World
+Series) no fatigue is carried: games_last_7 is 0 for every team.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import load_games
+from features import NEUTRAL_PARK_FACTOR
+
+# --- CONFIGURATION ---
+STATE_FILE = "../data/team_state.npz"
+TEAM_STATS_FILE = "../data/team_stats.csv"
+PARK_FACTORS_FILE = "../data/venue_park_factors.csv"
+RECENT_GAMES = 10  # results and dates remembered per team
+FATIGUE_WINDOW = 7  # days counted by games_last_7
+INITIAL_CAPACITY = 4096
+TEAM_CAPACITY = 256  # initial per-team index length; a season is 162 games
+
+GAME_COLUMNS = ['game_id', 'year', 'date', 'home_team', 'away_team', 'venue_id', 'home_score', 'away_score',
+                'home_ops', 'away_ops', 'home_starter_whip', 'away_starter_whip']
+
+# log column -> dtype; `recent_days` holds RECENT_GAMES ordinal dates per row, newest last, -1 when empty
+LOG_COLUMNS = {
+    'team': np.int32,
+    'day': np.int64,
+    'season': np.int16,
+    'games': np.int16,
+    'runs_for': np.int32,
+    'runs_against': np.int32,
+    'win_bits': np.uint16,
+    'ops': np.float32,
+    'whip': np.float32,
+    'park_factor': np.float32,
+}
+
+
+def _day(date):
+    return int(np.datetime64(pd.Timestamp(date).date(), 'D').astype(np.int64))
+
+
+def state_columns(log, recent_days, rows, day, season):
+    """
+    team_stats.csv columns for log rows, entering ordinal `day` of `season` (scalars, or arrays aligned with rows).
+    """
+    day = np.broadcast_to(np.asarray(day, dtype=np.int64), rows.shape)
+    season = np.broadcast_to(np.asarray(season), rows.shape)
+
+    bits = log['win_bits'][rows].astype(np.int64)
+    wins_last_10 = sum((bits >> k) & 1 for k in range(RECENT_GAMES))
+    recent = recent_days[rows]
+    age = day[:, None] - recent
+    games_last_7 = ((recent >= 0) & (age > 0) & (age <= FATIGUE_WINDOW)).sum(axis=1)
+    run_diff = (log['runs_for'][rows] - log['runs_against'][rows]) / np.maximum(1, log['games'][rows])
+    run_diff = np.where(log['season'][rows] == season, run_diff, 0.0)  # the season has not started yet
+
+    return {
+        'run_diff': np.round(run_diff, 2),
+        'ops': np.round(log['ops'][rows].astype(np.float64), 3),
+        'whip': np.round(log['whip'][rows].astype(np.float64), 2),
+        'wins_last_10': wins_last_10,
+        'games_last_7': np.minimum(games_last_7, 7),
+        'park_factor': np.round(log['park_factor'][rows].astype(np.float64), 2),
+    }
+
+
+class TeamStateStore:
+    def __init__(self, park_factors=None, capacity=INITIAL_CAPACITY):
+        self.size = 0
+        self.log = {col: np.zeros(capacity, dtype=dtype) for col, dtype in LOG_COLUMNS.items()}
+        self.recent_days = np.full((capacity, RECENT_GAMES), -1, dtype=np.int64)
+        self.rows_of = {}  # team id -> log rows, oldest first; the first team_size[team] entries are used
+        self.days_of = {}  # team id -> ordinal day of each of those rows
+        self.team_size = {}
+        self.home_park = {}  # team id -> park factor of its latest home venue
+        self.last_key = (-1, -1)  # (day, game_id) of the newest applied game
+        self.park_lookup = {} if park_factors is None else dict(
+            zip(park_factors['venue_id'].astype(int), park_factors['park_factor'] / 100))
+
+    # --- UPDATES ---
+
+    def _grow(self):
+        capacity = 2 * len(self.log['team'])
+        for col, values in self.log.items():
+            self.log[col] = np.resize(values, capacity)
+        grown = np.full((capacity, RECENT_GAMES), -1, dtype=np.int64)
+        grown[:self.size] = self.recent_days[:self.size]
+        self.recent_days = grown
+
+    def _index(self, team, row, day):
+        """Adds a log row to the team's index, doubling its arrays when full."""
+        n = self.team_size.get(team, 0)
+        if team not in self.rows_of:
+            self.rows_of[team] = np.empty(TEAM_CAPACITY, dtype=np.int64)
+            self.days_of[team] = np.empty(TEAM_CAPACITY, dtype=np.int64)
+        elif n == len(self.rows_of[team]):
+            self.rows_of[team] = np.resize(self.rows_of[team], 2 * n)
+            self.days_of[team] = np.resize(self.days_of[team], 2 * n)
+        self.rows_of[team][n] = row
+        self.days_of[team][n] = day
+        self.team_size[team] = n + 1
+
+    def _append(self, team, day, season, runs_for, runs_against, ops, whip):
+        if self.size == len(self.log['team']):
+            self._grow()
+        n = self.team_size.get(team, 0)
+        i = self.size
+        log = self.log
+
+        if n:
+            prev = self.rows_of[team][n - 1]
+            same_season = log['season'][prev] == season
+            if same_season:
+                # this game's pre-game OPS and WHIP are the previous game's post-game values
+                log['ops'][prev] = ops
+                log['whip'][prev] = whip
+            games = log['games'][prev] + 1 if same_season else 1
+            total_for = log['runs_for'][prev] + runs_for if same_season else runs_for
+            total_against = log['runs_against'][prev] + runs_against if same_season else runs_against
+            bits = int(log['win_bits'][prev])
+            recent = self.recent_days[prev] if same_season else np.full(RECENT_GAMES, -1)
+        else:
+            games, total_for, total_against, bits = 1, runs_for, runs_against, 0
+            recent = np.full(RECENT_GAMES, -1)
+
+        log['team'][i] = team
+        log['day'][i] = day
+        log['season'][i] = season
+        log['games'][i] = games
+        log['runs_for'][i] = total_for
+        log['runs_against'][i] = total_against
+        log['win_bits'][i] = ((bits << 1) | (runs_for > runs_against)) & ((1 << RECENT_GAMES) - 1)
+        log['ops'][i] = ops
+        log['whip'][i] = whip
+        log['park_factor'][i] = self.home_park.get(team, NEUTRAL_PARK_FACTOR / 100)
+        self.recent_days[i, :-1] = recent[1:]
+        self.recent_days[i, -1] = day
+
+        self._index(team, i, day)
+        self.size += 1
+
+    def apply_game(self, game):
+        """
+        Applies one final game: a mapping with the dataset's columns (see GAME_COLUMNS). OPS and starter WHIP are the
+        pre-game values the miner recorded; they also complete each team's previous row (see the module docstring).
+        """
+        day = _day(game['date'])
+        key = (day, int(game['game_id']))
+        if key <= self.last_key:
+            raise ValueError(f"Game {key[1]} on {game['date']} is not newer than the stored state")
+
+        home, away = int(game['home_team']), int(game['away_team'])
+        self.home_park[home] = self.park_lookup.get(int(game['venue_id']), NEUTRAL_PARK_FACTOR / 100)
+        season = int(game['year'])
+        home_score, away_score = int(game['home_score']), int(game['away_score'])
+        self._append(home, day, season, home_score, away_score, game['home_ops'], game['home_starter_whip'])
+        self._append(away, day, season, away_score, home_score, game['away_ops'], game['away_starter_whip'])
+        self.last_key = key
+
+    def apply_games(self, games):
+        """Applies every game of a frame newer than the stored state, in (date, game_id) order; returns the count."""
+        games = games.sort_values(['date', 'game_id'], kind='stable')
+        day = games['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        newer = (day > self.last_key[0]) | ((day == self.last_key[0]) & (games['game_id'] > self.last_key[1]))
+        applied = 0
+        for game in games[newer].to_dict('records'):
+            self.apply_game(game)
+            applied += 1
+        return applied
+
+    # --- QUERIES ---
+
+    @property
+    def teams(self):
+        return sorted(self.rows_of)
+
+    def latest_rows(self, date):
+        """Per team, the log row of its last game strictly before `date` (-1 if none)."""
+        day = _day(date)
+        out = {}
+        for team, rows in self.rows_of.items():
+            n = self.team_size[team]
+            k = np.searchsorted(self.days_of[team][:n], day, side='left')
+            out[team] = int(rows[k - 1]) if k > 0 else -1
+        return out
+
+    def as_of(self, date):
+        """
+        team_stats.csv-shaped frame of every team's state entering `date`, after its last game: season run
+        differential per game, OPS and starter WHIP, wins in the last 10, games in the previous 7 days (0 for every
+        team outside the regular season) and home park factor.
+        """
+        day = _day(date)
+        latest = {team: row for team, row in self.latest_rows(date).items() if row >= 0}
+        teams = np.array(sorted(latest), dtype=np.int64)
+        rows = np.array([latest[t] for t in teams], dtype=np.int64)
+        stats = state_columns(self.log, self.recent_days, rows, day, pd.Timestamp(date).year)
+        if 2 * (stats['games_last_7'] > 0).sum() < len(teams):
+            # most teams are done: the postseason or the off-season, which nobody enters fatigued
+            stats['games_last_7'] = np.zeros_like(stats['games_last_7'])
+        return pd.DataFrame(dict(team_name=teams, **stats))
+
+    def current(self):
+        """as_of the day after the newest applied game."""
+        return self.as_of(str(np.datetime64(self.last_key[0] + 1, 'D')))
+
+    # --- PERSISTENCE ---
+
+    def save(self, path=STATE_FILE):
+        arrays = {f"log_{col}": values[:self.size] for col, values in self.log.items()}
+        np.savez(path, **arrays, recent_days=self.recent_days[:self.size],
+                 home_park=np.array(sorted(self.home_park.items()), dtype=np.float64).reshape(-1, 2),
+                 park_lookup=np.array(sorted(self.park_lookup.items()), dtype=np.float64).reshape(-1, 2),
+                 last_key=np.array(self.last_key, dtype=np.int64))
+
+    @classmethod
+    def load(cls, path=STATE_FILE):
+        store = cls()
+        with np.load(path) as data:
+            store.size = len(data['log_team'])
+            store.log = {col: data[f"log_{col}"].copy() for col in LOG_COLUMNS}
+            store.recent_days = data['recent_days'].copy()
+            store.home_park = {int(t): float(p) for t, p in data['home_park']}
+            store.park_lookup = {int(v): float(p) for v, p in data['park_lookup']}
+            store.last_key = tuple(int(k) for k in data['last_key'])
+        # per-team indexes in one pass: rows grouped by team, in log (date) order within each team
+        team = store.log['team'][:store.size]
+        order = np.argsort(team, kind='stable')
+        teams, first, count = np.unique(team[order], return_index=True, return_counts=True)
+        for t, lo, n in zip(teams.tolist(), first.tolist(), count.tolist()):
+            rows = order[lo:lo + n].astype(np.int64)
+            store.rows_of[t] = np.resize(rows, max(TEAM_CAPACITY, 2 * n))
+            store.days_of[t] = np.resize(store.log['day'][rows], max(TEAM_CAPACITY, 2 * n))
+            store.team_size[t] = n
+        return store
+
+
+def load_final_games():
+    """The dataset's final games, less those without a weather report, as get_latest_team_stats.py always dropped."""
+    df = load_games(GAME_COLUMNS + ['condition'], categorical=False)
+    df = df[df['condition'] != 'Unknown'].drop(columns='condition')
+    return df.dropna(subset=['home_score', 'away_score'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental team state and point-in-time team stats.")
+    parser.add_argument('command', choices=['build', 'update', 'snapshot'])
+    parser.add_argument('--state', default=STATE_FILE)
+    parser.add_argument('--date', default=None, help="snapshot date (default: the day after the newest game)")
+    parser.add_argument('-o', '--output', default=TEAM_STATS_FILE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'build':
+        store = TeamStateStore(pd.read_csv(PARK_FACTORS_FILE))
+        applied = store.apply_games(load_final_games())
+        store.save(args.state)
+        print(f"Applied {applied} games ({store.size} team states) in {time.perf_counter() - start:.2f}s")
+    elif args.command == 'update':
+        store = TeamStateStore.load(args.state)
+        applied = store.apply_games(load_final_games())
+        store.save(args.state)
+        print(f"Applied {applied} new games in {time.perf_counter() - start:.2f}s")
+    else:
+        store = TeamStateStore.load(args.state)
+        stats = store.as_of(args.date) if args.date else store.current()
+        stats.to_csv(args.output, index=False)
+        print(f"Wrote team stats for {len(stats)} teams to {args.output}")